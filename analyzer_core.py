@@ -4,13 +4,28 @@
 import os
 import re
 import csv
+import json
+import hashlib
+import sqlite3
+import argparse
 import cv2
 import numpy as np 
 import subprocess
+import shutil
 import sys
+import threading
+import queue
+import time
+import itertools
+import functools
+import signal
+import multiprocessing
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 from datetime import timedelta
+from numpy.lib.stride_tricks import sliding_window_view
 from scipy.fft import rfft, rfftfreq
-from scipy.io import wavfile
 
 # tqdm: als het niet in het systeem zit , werken we zonder voortgang
 try:
@@ -19,6 +34,13 @@ except Exception:  # ImportError
     def tqdm(iterable=None, **kwargs):
         return iterable if iterable is not None else range(0)
 
+# inotify voor de hot folder (--watch): optioneel (pip install inotify_simple, alleen Linux,
+# staat in requirements.txt), anders pollen we de map elke WATCH_POLL_SEC
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except Exception:  # ImportError, of geen Linux
+    INotify = None
+
 # zodat de uitvoer direct verschijnt (zonder buffering)
 try:
     sys.stdout.reconfigure(line_buffering=True)
@@ -32,13 +54,19 @@ VIDEO_FOLDER = "./videos"
 
 OUTPUT_CSV_EVENTS = "report_black_glitch_tone2.csv"   # gedetailleerde CSV over gebeurtenissen 
 OUTPUT_CSV_SUMMARY = "report_summary.csv"             # samenvatting per video
+OUTPUT_CSV_METRICS = "report_metrics.csv"             # tijd/CPU/frames/bytes/geheugen per detector en video
+METRICS_RSS_SAMPLE_SEC = 0.1      # piek-RSS per gemeten aanroep: zo vaak /proc/<pid>/status lezen
 
-TEMP_AUDIO = "temp_audio.wav"
+# Hot folder (--watch): nieuwe bestanden in VIDEO_FOLDER analyseren zodra ze stabiel zijn
+WATCH_POLL_SEC = 5                # zo vaak de map opnieuw bekijken (ook met inotify, voor netwerkshares)
+WATCH_STABLE_SEC = 30             # grootte en mtime zo lang ongewijzigd → het kopiëren is klaar
+WATCH_LEDGER = "watch_ledger.jsonl"   # verwerkte bestanden; een herstart slaat die over
 
 # Drempels/parameters
 MIN_GLITCH_DURATION = 10          # sec (for GLITCH и RUIS/STRIPES)
 BLACKDETECT_MIN_DURATION = 10     # sec
 FREEZE_MIN_DURATION = 5           # sec
+FREEZE_NOISE = 0.003              # freezedetect n= (ruistolerantie)
 TONE_MIN_DURATION = 5             # sec
 
 # blackdetect — gevoeliger voor bijna-zwart
@@ -48,6 +76,12 @@ BLACKDETECT_PIC_TH = 0.98
 # 1 kHz
 TONE_HZ = 1000
 HZ_TOLERANCE = 50
+TONE_SAMPLE_RATE = 8000           # mono PCM uit ffmpeg; 4 kHz Nyquist is ruim genoeg voor 1 kHz
+AUDIO_CHUNK_SEC = 30              # audio wordt in blokken van zoveel seconden gelezen
+TONE_FRAME_SEC = 0.1              # spectrale vensters van 100 ms (halve overlap) → ±50 ms nauwkeurig
+TONE_BAND_RATIO_MIN = 0.6         # aandeel van de energie in TONE_HZ ± HZ_TOLERANCE
+TONE_MIN_RMS = 100.0              # (16-bit schaal, ≈ -50 dBFS) stilte telt niet als toon
+TONE_GAP_MAX = 0.5                # sec; kortere onderbrekingen binnen een toon overbruggen
 
 
 
@@ -56,10 +90,82 @@ RUIS_SAT_MAX = 40.0               # average saturation (S) in HSV <= 40 → cons
 RUIS_LAP_VAR_MIN = 120.0          # frame "noisiness" based on Laplacian variance
 RUIS_STRIPE_STD_MIN = 10.0        # "stripiness" based on std of column-wise means
 RUIS_FPS_SAMPLE = 1               # sample approximately 1 frame per second for speed
-
+# adaptief: zolang de toestand gelijk blijft maar één sample per zoveel seconden; waar hij
+# omslaat zoekt een korte extra decode het exacte frame (0 = vast RUIS_FPS_SAMPLE, ±1 sample)
+RUIS_COARSE_SEC = 5.0
+
+# GLITCH (kleurzweem): de gemiddelde kleur heeft geen 720×576 pixels nodig
+GLITCH_ANALYSIS_HEIGHT = 72       # analyse op een thumbnail van deze hoogte (None = native)
+# Framehoogte uit ffmpeg voor de gedeelde video-pass: de ruis-kenmerken op deze hoogte; glitch
+# verkleint zelf verder (INTER_AREA). ffmpeg rechtstreeks naar ~72 px verschuift de chroma tot ~2 niveaus.
+PASS_FRAME_HEIGHT = 480
+GLITCH_SAMPLE_FPS = 0             # 0 = elk frame; anders decimatie naar zoveel frames/sec
+GLITCH_HOLD_SEC = 0.0             # hysterese: kortere 'schone' gaten binnen een glitch overbruggen
+GLITCH_GREEN_MIN = 180            # groen: gemiddelde G boven deze waarde (en boven R en B)
+GLITCH_PINK_MIN = 180             # roze: gemiddelde R en B boven deze waarde…
+GLITCH_PINK_GREEN_MAX = 130       # …en G eronder
+GLITCH_OVERSAT_MIN = 230          # overbelicht: één kanaal gemiddeld boven deze waarde
+
+# Kenmerken (kleur, verzadiging, Laplaciaan, strepen) per batch frames i.p.v. per frame (zie FeatureEngine)
+FEATURE_BATCH = 64                # hooguit zoveel frames per batch
+FEATURE_BATCH_BYTES = 8 * 1024 * 1024   # en hooguit zoveel bytes aan frames (grote frames → kleinere batch)
+
+
+# Decode-opties: gelden voor elke ffmpeg-/OpenCV-decode (zie benchmarks/decode_options.py)
+DECODE_THREADS = 0                # ffmpeg -threads vóór -i (0 = ffmpeg kiest zelf)
+DECODE_SCALER = "area"            # sws-flags van het scale-filter: area (= cv2.INTER_AREA, waarop de RUIS_*-drempels
+                                  # gezet zijn), bicubic (ffmpeg-standaard, ~25% hogere lapVar), bilinear, fast_bilinear
+DECODE_KEYFRAMES_ONLY = False     # -skip_frame nokey: alleen keyframes, snelle maar grove triage (geen winst bij DV: elk frame is een keyframe)
+DECODE_SEEK_MARGIN_SEC = 1.0      # een tijdsbereik zoveel eerder openen: zonder index (MPEG-PS/-TS) decodeert ffmpeg na een seek pas vanaf het volgende keyframe
+OPENCV_THREADS = 0                # cv2.setNumThreads + CAP_PROP_N_THREADS (0 = OpenCV kiest zelf)
+
+# ffmpeg-processen na zoveel seconden stoppen (0 = geen limiet)
+FFMPEG_TIMEOUT_SEC = 0
+
+# Eén lange video over meerdere processen verdelen (tijdsbereiken)
+RANGE_WORKERS = 1                 # 1 = niet splitsen; 0 = alle cores
+RANGE_MIN_SEC = 120               # kortere stukken loont niet (ffmpeg-opstart, seek naar keyframe)
+
+# Triage: grove scan over de hele band, precieze detectors alleen rond verdachte stukken
+TRIAGE_KEYFRAMES = True           # grove scan op alleen keyframes (zie DECODE_KEYFRAMES_ONLY)
+TRIAGE_FPS = 1                    # grove scan: hooguit zoveel beoordeelde frames/sec
+TRIAGE_MARGIN_SEC = 12            # marge rond een verdacht stuk; groter houden dan de GOP-afstand
+
+# Progressief: analyseren terwijl de upload nog binnenkomt (alleen streambare containers)
+PROGRESSIVE_EXTS = (".ts", ".mts", ".m2ts")   # MPEG-TS; fragmented MP4 wordt aan de kop herkend
+PROGRESSIVE_MIN_BYTES = 8 * 1024 * 1024       # pas starten (en de kop proben) als er zoveel binnen is
+PROGRESSIVE_BLOCK = 1024 * 1024               # blokgrootte van de staart naar ffmpeg-stdin
+PROGRESSIVE_STALL_SEC = 3600                  # zo lang geen nieuwe bytes → upload als afgebroken beschouwen
 
 # Welke extensies beschouwen we als video
-VIDEO_EXTS = (".mp4", ".mov", ".mkv", ".avi", ".m4v")
+VIDEO_EXTS = (".mp4", ".mov", ".mkv", ".avi", ".m4v", ".ts", ".mts", ".m2ts")
+
+# Resultaten-cache (sleutel: inhoud-hash van de video + vingerafdruk van de instellingen)
+RESULT_CACHE_DIR = "./result_cache"
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024   # LRU: oudste resultaten eruit boven deze grootte
+RESULT_CACHE_VERSION = 6                     # ophogen als de detectors inhoudelijk veranderen
+
+# Resultaten-opslag van de web-app (SQLite): elke analyse met zijn events, blijft na een herstart
+RESULT_DB = "./results.sqlite3"
+
+# Kenmerken-tijdlijn per video (--features): met andere drempels opnieuw beoordelen
+# zonder de video te decoderen (--reevaluate, zie FeatureTimeline), en vragen
+# over het hele archief via de SQLite-index (--query, zie FeatureStore)
+FEATURE_DIR = "./features"
+FEATURE_INDEX = "index.sqlite3"   # in FEATURE_DIR
+FEATURE_TIMELINE_VERSION = 1
+
+# instellingen die het resultaat bepalen → gaan mee in de cache-vingerafdruk
+DETECTOR_SETTINGS = (
+    "MIN_GLITCH_DURATION", "BLACKDETECT_MIN_DURATION", "FREEZE_MIN_DURATION", "FREEZE_NOISE",
+    "TONE_MIN_DURATION", "BLACKDETECT_PIX_TH", "BLACKDETECT_PIC_TH", "TONE_HZ", "HZ_TOLERANCE",
+    "TONE_SAMPLE_RATE", "TONE_FRAME_SEC", "TONE_BAND_RATIO_MIN", "TONE_MIN_RMS", "TONE_GAP_MAX",
+    "RUIS_SAT_MAX", "RUIS_LAP_VAR_MIN", "RUIS_STRIPE_STD_MIN", "RUIS_FPS_SAMPLE",
+    "RUIS_COARSE_SEC", "GLITCH_ANALYSIS_HEIGHT", "GLITCH_SAMPLE_FPS", "GLITCH_HOLD_SEC",
+    "GLITCH_GREEN_MIN", "GLITCH_PINK_MIN", "GLITCH_PINK_GREEN_MAX", "GLITCH_OVERSAT_MIN",
+    "DECODE_SCALER", "DECODE_KEYFRAMES_ONLY",
+    "RESULT_CACHE_VERSION",
+)
 
 
 # =======================
@@ -103,12 +209,31 @@ def get_video_duration_seconds(filepath: str) -> float:
     except Exception:
         pass
 
-    cap = cv2.VideoCapture(filepath)
+    cap = open_capture(filepath)
     fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
     frames = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0.0
     cap.release()
     return float(frames / fps) if fps > 0 else 0.0
 
+def make_progress(progress, stage, total, min_interval=0.25):
+    """
+    Voortgangs-API voor de detectors: ``progress(stage, done, total)``.
+
+    Geeft een ``report(done, force=False)`` terug die de callback hooguit
+    elke ``min_interval`` seconden aanroept (``force`` altijd), zodat een
+    trage UI-callback de decode-lus niet afremt. Zonder callback een no-op.
+    """
+    if progress is None:
+        return lambda done, force=False: None
+    last = [0.0]
+
+    def report(done, force=False):
+        now = time.monotonic()
+        if force or now - last[0] >= min_interval:
+            last[0] = now
+            progress(stage, done, total)
+    return report
+
 def merge_intervals(intervals):
     """Voegt overlappende intervallen samen ✅ [(start_sec, end_sec), ...]."""
     if not intervals:
@@ -125,196 +250,2039 @@ def merge_intervals(intervals):
 
 
 # =======================
-#     DETECTORS
+#        EVENTS
 # =======================
-def detect_black_segments(filepath):
-    print("   ⏳ blackdetect…", flush=True)
-    results = []
-    ffmpeg_cmd = [
-        "ffmpeg", "-hide_banner", "-i", filepath,
-        "-vf", f"blackdetect=d={BLACKDETECT_MIN_DURATION}:pix_th={BLACKDETECT_PIX_TH}:pic_th={BLACKDETECT_PIC_TH}",
-        "-an", "-f", "null", "-"
-    ]
-    result = subprocess.run(ffmpeg_cmd, stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True)
-    for line in result.stderr.splitlines():
+class Event:
+    """
+    Eén gevonden fout: type, begin en eind in seconden (float) en, waar de
+    fps bekend is, de framenummers. Tijden blijven tot aan de rand exact;
+    pas de CSV en de HTML maken er HH:MM:SS van (``to_hms``).
+    """
+    __slots__ = ("type", "start", "end", "details", "start_frame", "end_frame")
+
+    def __init__(self, type, start, end, details="", fps=None):
+        self.type = type
+        self.start = float(start)
+        self.end = float(end)
+        self.details = details
+        if fps:
+            self.start_frame = int(round(self.start * fps))
+            self.end_frame = int(round(self.end * fps))
+        else:
+            self.start_frame = self.end_frame = None
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def to_json(self) -> dict:
+        """Voor de web-app/JSON: tijden in seconden, framenummers waar bekend."""
+        return {
+            "type": self.type,
+            "start": self.start,
+            "end": self.end,
+            "duration": self.duration,
+            "details": self.details,
+            "start_frame": self.start_frame,
+            "end_frame": self.end_frame,
+        }
+
+    def __getstate__(self):
+        return tuple(getattr(self, k) for k in self.__slots__)
+
+    def __setstate__(self, state):
+        for k, v in zip(self.__slots__, state):
+            setattr(self, k, v)
+
+    def __eq__(self, other):
+        if not isinstance(other, Event):
+            return NotImplemented
+        return self.__getstate__() == other.__getstate__()
+
+    def __repr__(self):
+        return f"Event({self.type!r}, {self.start:.3f}, {self.end:.3f}, {self.details!r})"
+
+
+# =======================
+#     DECODE-OPTIES
+# =======================
+# Eén plek voor hoe er gedecodeerd wordt; de detectors bouwen hun ffmpeg-
+# commando's en OpenCV-captures hiermee op.
+if OPENCV_THREADS > 0:
+    cv2.setNumThreads(OPENCV_THREADS)
+
+def ffmpeg_input_args(filepath, seek=0.0, keyframes_only=None):
+    """ffmpeg-argumenten vóór en met ``-i``: decoder-threads, keyframes-only, snelle seek."""
+    if keyframes_only is None:
+        keyframes_only = DECODE_KEYFRAMES_ONLY
+    args = []
+    if DECODE_THREADS > 0:
+        args += ["-threads", str(DECODE_THREADS)]
+    if keyframes_only:
+        args += ["-skip_frame", "nokey"]
+    if seek > 0:
+        args += ["-ss", f"{seek:.6f}"]
+    return args + ["-i", filepath]
+
+def scale_filter(w, h, scaler=None):
+    """Scale-filter met de ingestelde scaler (standaard DECODE_SCALER)."""
+    return f"scale={w}:{h}:flags={scaler or DECODE_SCALER}"
+
+def open_capture(filepath):
+    """cv2.VideoCapture met de thread-hint (CAP_PROP_N_THREADS, alleen als OpenCV die kent)."""
+    prop = getattr(cv2, "CAP_PROP_N_THREADS", None)
+    if OPENCV_THREADS > 0 and prop is not None:
+        return cv2.VideoCapture(filepath, cv2.CAP_ANY, [prop, OPENCV_THREADS])
+    return cv2.VideoCapture(filepath)
+
+
+# =======================
+#        METRICS
+# =======================
+# Per detector-aanroep: wandtijd, CPU-tijd, frames, gelezen bytes en piek-RSS.
+# Alleen binnen ``with collect_metrics()``; de meting hoort bij de thread
+# (web-jobs lopen in threads). Een gemeten functie die een andere aanroept
+# (parallelle video-pass → sequentiële) telt één keer, bij de buitenste.
+#
+# CPU = de meetthread, de stderr-thread van de pass en precies de eigen
+# ffmpeg-processen (os.wait4 per proces), dus niet die van gelijktijdige jobs.
+# Piek-RSS wordt tijdens de aanroep bemonsterd: dit proces plus de eigen
+# ffmpeg-processen. Het Python-proces zelf is gedeeld: lopen er analyses
+# tegelijk (web-app, JOB_WORKERS), dan telt hun geheugen daarin mee.
+# bytes_read = wat de eigen ffmpeg-processen aan invoer lazen (rchar uit
+# /proc/<pid>/io: het bestand, of de pipe bij een groeiende upload); niet de
+# gedecodeerde frames/PCM. Zonder /proc (macOS) blijft het 0.
+_METRICS = threading.local()
+
+def _rss_mb(pid="self") -> float:
+    """Huidige RSS (VmRSS) van een proces in MB; 0 zonder /proc of als het proces weg is."""
+    try:
+        with open(f"/proc/{pid}/status", "rb") as fh:
+            for line in fh:
+                if line.startswith(b"VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0.0
+
+def _rchar(pid) -> int:
+    """Door een proces gelezen bytes (rchar in /proc/<pid>/io); 0 zonder /proc."""
+    try:
+        with open(f"/proc/{pid}/io", "rb") as fh:
+            for line in fh:
+                if line.startswith(b"rchar:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+class _RssSampler:
+    """Piek van RSS(dit proces) + RSS(geregistreerde kindprocessen), elke ``interval`` seconden."""
+
+    def __init__(self, interval=METRICS_RSS_SAMPLE_SEC):
+        self.pids = set()
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._sample()
+        self._thread = threading.Thread(target=self._run, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def _sample(self):
+        rss = _rss_mb() + sum(_rss_mb(pid) for pid in list(self.pids))
+        self.peak = max(self.peak, rss)
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            self._sample()
+
+    def close(self) -> float:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return self.peak
+
+def _track_child(proc):
+    """Een net gestart ffmpeg-proces meenemen in de RSS-meting van deze thread (zie _reap)."""
+    sampler = getattr(_METRICS, "sampler", None)
+    if sampler is not None:
+        sampler.pids.add(proc.pid)
+
+def _reap(proc, record=None):
+    """proc.wait(), maar met os.wait4: de CPU-tijd, piek-RSS en gelezen bytes van
+    precies dit kindproces gaan naar de meting (``record``, standaard die van deze thread)."""
+    record = record if record is not None else _current_metrics()
+    if record is None or proc.returncode is not None or not hasattr(os, "wait4"):
+        return proc.wait()
+    nbytes = 0
+    try:
+        if hasattr(os, "waitid"):
+            # wachten zonder op te ruimen: /proc/<pid>/io is dan nog leesbaar
+            os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+            nbytes = _rchar(proc.pid)
+        _, status, usage = os.wait4(proc.pid, 0)
+    except ChildProcessError:        # al door proc.poll()/wait() opgehaald
+        return proc.wait()
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # Linux geeft ru_maxrss in KiB, macOS in bytes
+    peak = usage.ru_maxrss / (1024.0 * 1024.0) if sys.platform == "darwin" else usage.ru_maxrss / 1024.0
+    _add_metrics(nbytes=nbytes, record=record, cpu_sec=usage.ru_utime + usage.ru_stime, peak_rss_mb=peak)
+    sampler = getattr(_METRICS, "sampler", None)
+    if sampler is not None:
+        sampler.pids.discard(proc.pid)
+    return proc.returncode
+
+def _new_metrics_record(stage):
+    return {"stage": stage, "wall_sec": 0.0, "cpu_sec": 0.0, "frames": 0,
+            "bytes_read": 0, "peak_rss_mb": 0.0, "frame_sec": {}}
+
+def _current_metrics():
+    """Lopende meting van deze thread (of None)."""
+    return getattr(_METRICS, "record", None)
+
+def _add_metrics(frames=0, nbytes=0, frame_sec=None, record=None, cpu_sec=0.0, peak_rss_mb=0.0):
+    """Telt frames/bytes (en Python-tijd per frame-detector) bij de lopende meting;
+    ``cpu_sec``/``peak_rss_mb`` van kindprocessen, hulpthreads en range-workers."""
+    record = record if record is not None else _current_metrics()
+    if record is None:
+        return
+    record["frames"] += int(frames)
+    record["bytes_read"] += int(nbytes)
+    record["cpu_sec"] += cpu_sec
+    record["peak_rss_mb"] = max(record["peak_rss_mb"], peak_rss_mb)
+    for name, sec in (frame_sec or {}).items():
+        record["frame_sec"][name] = record["frame_sec"].get(name, 0.0) + sec
+
+@contextmanager
+def collect_metrics():
+    """``with collect_metrics() as metrics:`` → één dict per gemeten detector-aanroep."""
+    previous = getattr(_METRICS, "sink", None)
+    _METRICS.sink = sink = []
+    try:
+        yield sink
+    finally:
+        _METRICS.sink = previous
+
+@contextmanager
+def _measuring(record):
+    """Meet het blok in ``record``: CPU van deze thread en piek-RSS (zie _RssSampler)."""
+    _METRICS.record = record
+    _METRICS.sampler = sampler = _RssSampler()
+    cpu0 = time.thread_time()
+    try:
+        yield record
+    finally:
+        _METRICS.record = None
+        _METRICS.sampler = None
+        record["cpu_sec"] += time.thread_time() - cpu0
+        record["peak_rss_mb"] = max(record["peak_rss_mb"], sampler.close())
+
+def metered(stage):
+    """Decorator: meet de functie als ``stage`` als er een collect_metrics() loopt."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            sink = getattr(_METRICS, "sink", None)
+            if sink is None or _current_metrics() is not None:
+                return func(*args, **kwargs)
+            record = _new_metrics_record(stage)
+            wall0 = time.perf_counter()
+            try:
+                with _measuring(record):
+                    return func(*args, **kwargs)
+            finally:
+                record["wall_sec"] = round(time.perf_counter() - wall0, 3)
+                record["cpu_sec"] = round(record["cpu_sec"], 3)
+                record["peak_rss_mb"] = round(record["peak_rss_mb"], 1)
+                record["frame_sec"] = {k: round(v, 3) for k, v in record["frame_sec"].items()}
+                sink.append(record)
+        return wrapper
+    return decorate
+
+def _frame_feeder(frame_dets, record):
+    """Geeft elk frame aan alle frame-detectors; tijdens een meting ook de tijd per detector."""
+    if record is None:
+        def feed(idx, t, frame):
+            for d in frame_dets:
+                d.on_frame(idx, t, frame)
+        return feed, {}
+    clock = time.perf_counter
+    spent = {d.name: 0.0 for d in frame_dets}
+    def feed(idx, t, frame):
+        for d in frame_dets:
+            t0 = clock()
+            d.on_frame(idx, t, frame)
+            spent[d.name] += clock() - t0
+    return feed, spent
+
+
+# =======================
+#   PROGRESSIEVE INVOER
+# =======================
+# Een upload die nog binnenkomt: ffmpeg leest van stdin, een thread voedt die
+# met de staart van het groeiende bestand tot de upload klaar is. Dat kan
+# alleen bij containers die zonder index aan het einde te lezen zijn.
+
+class GrowingFile:
+    """
+    Een bestand dat nog geschreven wordt (upload). De lezers gebruiken één
+    open descriptor met pread, dus de schrijver mag het bestand intussen
+    hernoemen. ``finish(path, content_hash)`` of ``abort()`` als de upload
+    stopt; ``complete`` is dan gezet.
+    """
+
+    def __init__(self, path, name=None):
+        self.path = path
+        self.name = name or os.path.basename(path)
+        self.fd = os.open(path, os.O_RDONLY)
+        self.complete = threading.Event()
+        self.failed = False
+        self.content_hash = None
+
+    def finish(self, path=None, content_hash=None):
+        self.path = path or self.path
+        self.content_hash = content_hash
+        self.complete.set()
+
+    def abort(self):
+        self.failed = True
+        self.complete.set()
+
+    def close(self):
         try:
-            match = re.search(r'black_start:(\d+\.?\d*)\s+black_end:(\d+\.?\d*)\s+black_duration:(\d+\.?\d*)', line)
-            if match:
-                start = float(match.group(1))
-                end = float(match.group(2))
-                duration = float(match.group(3))
-                results.append({
-                    "type": "BLACK",
-                    "start": to_hms(start),
-                    "end": to_hms(end),
-                    "duration": duration,
-                    "details": "black screen"
-                })
-        except Exception:
-            continue
-    print("   ✅ blackdetect done", flush=True)
-    return results
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+def _is_fragmented_mp4(head: bytes) -> bool:
+    """Top-level boxen aflopen: moov met mvex vóór de eerste mdat = fragmented MP4."""
+    pos = 0
+    while pos + 8 <= len(head):
+        size = int.from_bytes(head[pos:pos + 4], "big")
+        kind = head[pos + 4:pos + 8]
+        if size == 1 and pos + 16 <= len(head):
+            size = int.from_bytes(head[pos + 8:pos + 16], "big")
+        if kind == b"moov":
+            return b"mvex" in head[pos:pos + size]
+        if kind == b"mdat" or size < 8:
+            return False
+        pos += size
+    return False
+
+
+def is_streamable(path, name=None) -> bool:
+    """Kan ffmpeg dit lezen terwijl het nog groeit? MPEG-TS altijd, MP4/MOV alleen gefragmenteerd."""
+    ext = os.path.splitext(name or path)[1].lower()
+    if ext in PROGRESSIVE_EXTS:
+        return True
+    if ext in (".mp4", ".m4v", ".mov"):
+        try:
+            with open(path, "rb") as fh:
+                return _is_fragmented_mp4(fh.read(PROGRESSIVE_MIN_BYTES))
+        except OSError:
+            return False
+    return False
+
+
+def _tail_into(growing, pipe, stop=None):
+    """Schrijft het groeiende bestand naar ``pipe`` tot de upload klaar is (of ``stop`` gezet)."""
+    pos = 0
+    final = False
+    last_growth = time.monotonic()
+    try:
+        while True:
+            data = os.pread(growing.fd, PROGRESSIVE_BLOCK, pos)
+            if data:
+                pipe.write(data)
+                pos += len(data)
+                last_growth = time.monotonic()
+                continue
+            if final or (stop is not None and stop.is_set()):
+                break
+            if time.monotonic() - last_growth > PROGRESSIVE_STALL_SEC:
+                growing.abort()
+                break
+            # complete wordt pas ná het laatste blok gezet: nog één keer lezen
+            final = growing.complete.wait(0.2)
+    except (BrokenPipeError, OSError):
+        pass                        # ffmpeg is gestopt
+    finally:
+        try:
+            pipe.close()
+        except OSError:
+            pass
 
 
-def detect_glitches(filepath, crop_top_ratio=0.0):
-    """Eenvoudige kleurafwijkingen: groen/roze/overbelichting."""
-    results = []
-    cap = cv2.VideoCapture(filepath)
-    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
-    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
-    if fps <= 0 or frame_count <= 0:
+def _start_tail(growing, proc, cancel=None):
+    thread = threading.Thread(target=_tail_into, args=(growing, proc.stdin, cancel), daemon=True)
+    thread.start()
+    return thread
+
+
+def probe_growing(growing) -> dict:
+    """probe_video op de kop van een groeiend bestand; lengte en duur zijn nog onbekend."""
+    info = probe_video(growing.path)
+    info["frames"] = 0
+    info["duration"] = 0.0
+    return info
+
+
+# =======================
+#   GEDEELDE DECODE-PASS
+# =======================
+# Eén ffmpeg-decode per video: blackdetect/freezedetect draaien als filter in
+# dezelfde filtergraph, en de ruwe BGR-frames gaan via een pipe naar de
+# Python-detectors (glitch, ruis). Elke detector is een plug-in op de pass.
+
+def _parse_rate(rate) -> float:
+    """'30000/1001' → 29.97 (ffprobe-notatie)."""
+    try:
+        num, _, den = str(rate).partition("/")
+        num, den = float(num), float(den or 1)
+        return num / den if den > 0 else 0.0
+    except Exception:
+        return 0.0
+
+def probe_video(filepath: str) -> dict:
+    """Breedte, hoogte, fps, aantal frames en duur — ffprobe, anders OpenCV."""
+    info = {"width": 0, "height": 0, "fps": 0.0, "frames": 0, "duration": 0.0}
+    try:
+        cmd = [
+            "ffprobe", "-v", "error", "-select_streams", "v:0",
+            "-show_entries", "stream=width,height,avg_frame_rate,r_frame_rate,nb_frames:format=duration",
+            "-of", "json", filepath
+        ]
+        data = json.loads(subprocess.check_output(cmd, stderr=subprocess.DEVNULL, text=True))
+        stream = (data.get("streams") or [{}])[0]
+        info["width"] = int(stream.get("width") or 0)
+        info["height"] = int(stream.get("height") or 0)
+        info["fps"] = _parse_rate(stream.get("avg_frame_rate")) or _parse_rate(stream.get("r_frame_rate"))
+        info["duration"] = float((data.get("format") or {}).get("duration") or 0.0)
+        nb = str(stream.get("nb_frames") or "")
+        info["frames"] = int(nb) if nb.isdigit() else int(round(info["duration"] * info["fps"]))
+    except Exception:
+        pass
+
+    if info["width"] <= 0 or info["fps"] <= 0:
+        cap = open_capture(filepath)
+        info["width"] = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
+        info["height"] = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
+        info["fps"] = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+        info["frames"] = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
         cap.release()
-        return results
+        if info["duration"] <= 0 and info["fps"] > 0:
+            info["duration"] = info["frames"] / info["fps"]
+    return info
+
+
+class _SegmentTracker:
+    """
+    Houdt aaneengesloten 'aan'-stukken bij op de tijdlijn → [(start, end, at_end)].
+
+    ``hold``: hysterese — een 'uit'-gat korter dan hold seconden sluit het
+    segment niet. Het is genoeg om alleen de overgangen door te geven.
+    ``on_close(segment)`` wordt aangeroepen zodra een segment vastligt.
+    """
+
+    def __init__(self, min_duration, hold=0.0, on_close=None):
+        self.min_duration = min_duration
+        self.hold = hold
+        self.on_close = on_close
+        self.start = None
+        self.off = None              # tijdstip van de eerste 'uit' binnen een segment
+        self.segments = []
+
+    def _close(self, end, at_end=False):
+        if end - self.start >= self.min_duration:
+            self.segments.append((self.start, end, at_end))
+            if self.on_close is not None:
+                self.on_close(self.segments[-1])
+        self.start = None
+        self.off = None
+
+    def update(self, flag, t):
+        if flag:
+            if self.start is not None and self.off is not None and t - self.off >= self.hold:
+                self._close(self.off)
+            if self.start is None:
+                self.start = t
+            self.off = None
+        elif self.start is not None:
+            if self.off is None:
+                self.off = t
+            if t - self.off >= self.hold:
+                self._close(self.off)
+
+    def finish(self, end_t):
+        # als het segment tot het einde doorloopt
+        if self.start is not None:
+            if self.off is not None:
+                self._close(self.off)
+            else:
+                self._close(end_t, at_end=True)
+        return self.segments
+
+
+_EPS = 1e-6
+
+def _snap(t, fps):
+    """Filter-tijdstempel terug op het framegrid (alleen als hij er al op ligt, CFR)."""
+    if fps > 0:
+        k = round(t * fps)
+        if abs(k / fps - t) < 1e-3:
+            return k / fps
+    return t
+
+
+# blackdetect en freezedetect loggen in dezelfde filtergraph naar stderr;
+# één parser haalt de tijdstempels van beide uit de regels
+_FILTER_LOG_RE = re.compile(r'\b(black_start|black_end|freeze_start|freeze_end):\s*(\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)')
+
+def parse_filter_log(line):
+    """Log-regel van blackdetect/freezedetect → {"black_start": 1.2, ...} (leeg als er niets in staat)."""
+    return {key: float(value) for key, value in _FILTER_LOG_RE.findall(line)}
+
 
-    in_glitch = False
-    glitch_start = None
+# =======================
+#     FEATURE-ENGINE
+# =======================
+# De frame-detectors beoordelen hun samples niet meer één voor één: ze
+# verzamelen ze in een stapel en rekenen de kenmerken per batch uit. De
+# omzettingen per pixel (cvtColor, Laplaciaan, absdiff) draaien in één
+# aanroep over de hele stapel als één hoog beeld; bij de Laplaciaan worden
+# alleen de rijen op de framegrenzen daarna opnieuw berekend. Gemiddelden
+# per frame blijven cv2.mean/meanStdDev op views in de stapel: sneller dan
+# elke gemeten NumPy-/cv2.reduce-variant over de batch (zie _frame_means).
+
+def _frame_means(stack, n):
+    """(n, 4) gemiddelden per kanaal voor n frames in een (n·h, w[, c])-stapel."""
+    return np.array([cv2.mean(frame) for frame in np.split(stack, n)])
+
+
+def _neighbour_sum(rows):
+    """rows[:, j-1] + rows[:, j+1] met BORDER_REFLECT_101 (zoals cv2.Laplacian), als int32."""
+    r = rows.astype(np.int32)
+    out = np.empty_like(r)
+    out[:, 1:-1] = r[:, :-2] + r[:, 2:]
+    out[:, 0] = 2 * r[:, 1]
+    out[:, -1] = 2 * r[:, -2]
+    return out
+
+
+class FeatureEngine:
+    """
+    Kenmerken per frame voor een batch frames: gemiddelde BGR, gemiddelde
+    HSV-verzadiging, variantie van de Laplaciaan (ksize=3) en de std van de
+    kolomgemiddelden van het grijsbeeld, het aandeel zwarte pixels en het
+    verschil met het vorige frame.
+
+    ``push(t, frame)`` kopieert een frame in een vooraf gereserveerde stapel
+    (``size`` = (w, h): eerst verkleinen met INTER_AREA); ``full`` zegt of de
+    batch vol is. De kenmerk-methodes geven een array met één waarde per
+    frame in de batch en worden per batch hooguit één keer berekend;
+    ``clear()`` begint de volgende batch. Buffers worden bij het eerste frame
+    aangemaakt en daarna hergebruikt.
+    """
+
+    def __init__(self, max_frames=FEATURE_BATCH, max_bytes=FEATURE_BATCH_BYTES):
+        self.max_frames = max(1, int(max_frames))
+        self.max_bytes = max_bytes
+        self.frames = None
+        self.n = 0
+        self._buffers = {}
+        self._cache = {}
+        self._prev_gray = None      # laatste grijsbeeld van de vorige batch (voor frame_diff)
+
+    def _allocate(self, h, w):
+        size = max(1, min(self.max_frames, self.max_bytes // (h * w * 3)))
+        self.frames = np.empty((size, h, w, 3), np.uint8)
+        self.times = np.empty(size, np.float64)
+        self._buffers.clear()
+        self._prev_gray = None
+
+    def _buffer(self, name, shape, dtype=np.uint8):
+        buf = self._buffers.get(name)
+        if buf is None:
+            buf = self._buffers[name] = np.empty(shape, dtype)
+        return buf
+
+    @property
+    def full(self) -> bool:
+        return self.frames is not None and self.n == len(self.frames)
+
+    def push(self, t, frame, size=None):
+        w, h = size or (frame.shape[1], frame.shape[0])
+        if self.frames is None or self.frames.shape[1:3] != (h, w):
+            if self.n:
+                raise ValueError("framegrootte veranderd midden in een batch")
+            self._allocate(h, w)
+        slot = self.frames[self.n]
+        if size is not None and (w, h) != (frame.shape[1], frame.shape[0]):
+            np.copyto(slot, cv2.resize(frame, (w, h), interpolation=cv2.INTER_AREA))
+        else:
+            np.copyto(slot, frame)
+        self.times[self.n] = t
+        self.n += 1
+        return self.full
+
+    def clear(self):
+        gray = self._cache.get("gray")
+        if gray is not None:
+            self._prev_gray = self._buffer("prev_gray", gray.shape[1:])
+            np.copyto(self._prev_gray, gray[-1])
+        else:
+            self._prev_gray = None
+        self.n = 0
+        self._cache.clear()
+
+    def _stack(self, buf=None):
+        """De batch (of een buffer met dezelfde vorm) als één hoog beeld: (n·h, w[, 3])."""
+        frames = self.frames if buf is None else buf
+        return frames.reshape((-1,) + frames.shape[2:])[:self.n * frames.shape[1]]
+
+    def _cached(self, name, compute):
+        value = self._cache.get(name)
+        if value is None:
+            value = self._cache[name] = compute()
+        return value
+
+    def mean_bgr(self):
+        """(n, 3) gemiddelde B, G, R."""
+        return self._cached("mean_bgr", lambda: _frame_means(self._stack(), self.n)[:, :3])
+
+    def saturation(self):
+        def compute():
+            hsv = self._stack(self._buffer("hsv", self.frames.shape))
+            hsv = cv2.cvtColor(self._stack(), cv2.COLOR_BGR2HSV, dst=hsv)
+            return _frame_means(hsv, self.n)[:, 1]
+        return self._cached("saturation", compute)
+
+    def gray(self):
+        """(n, h, w) uint8, zoals cv2.COLOR_BGR2GRAY."""
+        def compute():
+            n, h, w = self.n, self.frames.shape[1], self.frames.shape[2]
+            gray = self._stack(self._buffer("gray", self.frames.shape[:3]))
+            gray = cv2.cvtColor(self._stack(), cv2.COLOR_BGR2GRAY, dst=gray)
+            return gray.reshape(n, h, w)
+        return self._cached("gray", compute)
+
+    def lap_var(self):
+        def compute():
+            gray = self.gray()
+            n, h, w = gray.shape
+            lap = self._stack(self._buffer("lap", self.frames.shape[:3], np.float32))
+            lap = cv2.Laplacian(gray.reshape(n * h, w), cv2.CV_32F, dst=lap, ksize=3)
+            # rij 0 en h-1 zagen in de stapel het buurframe: opnieuw met reflect-101 binnen het frame
+            lap = lap.reshape(n, h, w)
+            lap[:, 0] = 4 * _neighbour_sum(gray[:, min(1, h - 1)]) - 8 * gray[:, 0].astype(np.int32)
+            lap[:, -1] = 4 * _neighbour_sum(gray[:, max(h - 2, 0)]) - 8 * gray[:, -1].astype(np.int32)
+            return np.array([cv2.meanStdDev(frame)[1][0, 0] for frame in lap]) ** 2
+        return self._cached("lap_var", compute)
+
+    def stripe_std(self):
+        def compute():
+            gray = self.gray()
+            col_mean = gray.sum(axis=1, dtype=np.uint32) / gray.shape[1]
+            return col_mean.std(axis=1)
+        return self._cached("stripe_std", compute)
+
+    def black_ratio(self, pix_max):
+        """Aandeel pixels met grijswaarde ≤ pix_max (0..255), cf. blackdetect pix_th."""
+        def compute():
+            gray = self.gray()
+            n, h, w = gray.shape
+            mask = self._buffer("mask", self.frames.shape[:3])
+            mask = cv2.compare(gray.reshape(-1, w), float(pix_max), cv2.CMP_LE,
+                               dst=mask[:n].reshape(-1, w))
+            return _frame_means(mask, n)[:, 0] / 255.0
+        return self._cached(f"black_ratio:{pix_max}", compute)
+
+    def frame_diff(self):
+        """Gemiddeld absoluut verschil (0..255) van het grijsbeeld met het vorige frame; NaN voor het eerste."""
+        def compute():
+            gray = self.gray()
+            n, h, w = gray.shape
+            diff = np.full(n, np.nan)
+            absdiff = self._buffer("absdiff", self.frames.shape[:3])
+            if n > 1:
+                d = cv2.absdiff(gray[1:].reshape(-1, w), gray[:-1].reshape(-1, w),
+                                dst=absdiff[:n - 1].reshape(-1, w))
+                diff[1:] = _frame_means(d, n - 1)[:, 0]
+            if self._prev_gray is not None:
+                diff[0] = cv2.mean(cv2.absdiff(gray[0], self._prev_gray))[0]
+            return diff
+        return self._cached("frame_diff", compute)
+
+
+class FrameDetector:
+    """Basis voor een detector in de gedeelde decode-pass.
+
+    Een detector draagt een ffmpeg-filter bij (``vf``, de log-regels komen
+    terug via ``on_log``) en/of krijgt ruwe BGR-frames via ``on_frame``.
+
+    Segment-detectors geven eerst ruwe runs terug (``runs``: start, end,
+    open_end, nog zonder minimumduur) en zetten die pas in ``to_events`` om;
+    ``refine`` kan ze daarvoor nog bijstellen (RuisDetector: op het frame).
+    Zo kunnen runs uit tijdsbereiken die parallel liepen eerst samengevoegd
+    worden (``splittable``). ``first_sample_t`` is het eerste beoordeelde frame.
+    """
+    name = "frame"
+    vf = None                  # ffmpeg-filter in de gedeelde filtergraph
+    wants_frames = False       # ontvangt ruwe frames via de pipe
+    analysis_height = None     # maximale framehoogte die nodig is (None = native)
+    sample_fps = None          # frames/sec die nodig zijn (None = elk frame)
+    splittable = False         # kan per tijdsbereik draaien (zie detect_video_events_parallel)
+    hold = 0.0                 # hysterese van de runs (voor het samenvoegen over grenzen)
+    keyframes_ok = True        # zinvol op alleen keyframes (DECODE_KEYFRAMES_ONLY)
+    on_event = None            # callback(event) zodra een segment afgesloten is (gezet door de pipeline)
+    on_run = None              # callback(run) per afgesloten ruwe run, ook met raw=True (zie _range_task)
+    source = None              # pad voor een gerichte extra decode (zie refine), gezet door de pipeline
+    cancel = None              # threading.Event van de pass, ook voor die extra decode
+    info = {}                  # video-info (fps, duur, …), gezet in start()
+
+    def start(self, info):
+        self.info = info
+        self.first_sample_t = None
+
+    def _emit(self, run):
+        # tussentijds melden; kan vanuit de stderr-thread komen (black/freeze)
+        if self.on_run is not None:
+            self.on_run(run)
+        if self.on_event is not None:
+            for event in self.to_events(self.refine([run])):
+                self.on_event(event)
+
+    def _event(self, type, start, end, details):
+        return Event(type, start, end, details, self.info.get("fps"))
+
+    def on_log(self, line):
+        pass
 
-    for i in tqdm(range(frame_count),
-                  desc=f"   🎛 GLITCH {os.path.basename(filepath)}",
-                  unit="f",
-                  leave=False):
-        ret, frame = cap.read()
-        if not ret:
-            break
+    def on_frame(self, idx, t, frame):
+        pass
 
-        if crop_top_ratio > 0.0:
+    def runs(self, end_t):
+        return []
+
+    def refine(self, runs):
+        """Samengevoegde runs nauwkeuriger maken vóór to_events (standaard: ongewijzigd)."""
+        return runs
+
+    def to_events(self, runs):
+        return []
+
+    def finish(self, end_t):
+        return self.to_events(self.refine(self.runs(end_t)))
+
+
+class BlackDetector(FrameDetector):
+    """Zwart beeld via ffmpeg blackdetect."""
+    name = "black"
+    splittable = True
+
+    def __init__(self, split=False, pix_th=None, pic_th=None):
+        # per tijdsbereik: alle zwarte runs (d=0), de minimumduur komt na het samenvoegen
+        d = 0 if split else BLACKDETECT_MIN_DURATION
+        pix_th = BLACKDETECT_PIX_TH if pix_th is None else pix_th
+        pic_th = BLACKDETECT_PIC_TH if pic_th is None else pic_th
+        self.vf = f"blackdetect=d={d}:pix_th={pix_th}:pic_th={pic_th}"
+        self.spans = []
+
+    def start(self, info):
+        super().start(info)
+        fps = info["fps"]
+        self.first_sample_t = info.get("first_frame", 0) / fps if fps > 0 else 0.0
+
+    def on_log(self, line):
+        values = parse_filter_log(line)
+        if "black_start" in values and "black_end" in values:
+            offset = self.info.get("seek", 0.0)
+            fps = self.info["fps"]
+            start = _snap(values["black_start"] + offset, fps)
+            end = _snap(values["black_end"] + offset, fps)
+            self.spans.append((start, end))
+            self._emit((start, end, False))
+
+    def runs(self, end_t):
+        fps = self.info["fps"]
+        if self.info.get("lookahead"):
+            # één frame voorbij het bereik gedecodeerd: een run die daar nog
+            # loopt is open, een run die daar pas begint hoort bij het volgende bereik
+            return [(start, min(end, end_t), end >= end_t - _EPS)
+                    for start, end in self.spans if start < end_t - _EPS]
+        # blackdetect sluit een run aan het einde af op het láátste frame
+        last_t = end_t - 1.0 / fps if fps > 0 else end_t
+        return [(start, end, abs(end - last_t) < 0.5 / fps if fps > 0 else False)
+                for start, end in self.spans]
+
+    def to_events(self, runs):
+        return [self._event("BLACK", start, end, "black screen")
+                for start, end, _ in runs if end - start >= BLACKDETECT_MIN_DURATION - _EPS]
+
+
+class FreezeDetector(FrameDetector):
+    """Bevroren beeld via ffmpeg freezedetect."""
+    name = "freeze"
+    splittable = True
+    keyframes_ok = False       # keyframes liggen seconden uit elkaar: 'bevroren' zegt dan niets
+
+    def __init__(self, split=False, noise=None):
+        # per tijdsbereik: alle runs (d=0), de minimumduur komt na het samenvoegen
+        self.split = split
+        d = 0 if split else FREEZE_MIN_DURATION
+        self.vf = f"freezedetect=n={FREEZE_NOISE if noise is None else noise}:d={d}"
+        self.spans = []
+        self.freeze_start = None
+
+    def start(self, info):
+        super().start(info)
+        fps = info["fps"]
+        self.first_sample_t = info.get("first_frame", 0) / fps if fps > 0 else 0.0
+
+    def on_log(self, line):
+        values = parse_filter_log(line)
+        offset = self.info.get("seek", 0.0)
+        fps = self.info["fps"]
+        if "freeze_start" in values:
+            self.freeze_start = _snap(values["freeze_start"] + offset, fps)
+        elif "freeze_end" in values and self.freeze_start is not None:
+            self.spans.append((self.freeze_start, _snap(values["freeze_end"] + offset, fps)))
+            self.freeze_start = None
+            self._emit((*self.spans[-1], False))
+
+    def runs(self, end_t):
+        if not self.split:
+            # een freeze die tot het einde doorloopt meldt freezedetect niet
+            return [(start, end, False) for start, end in self.spans]
+        fps = self.info["fps"]
+        spans = list(self.spans)
+        if self.freeze_start is not None:
+            spans.append((self.freeze_start, float("inf")))
+        # met d=0 is elk frame dat van het vorige verschilt een 'freeze' van één
+        # frame; alleen op het eerste sample telt die: een freeze uit het vorige
+        # bereik eindigt daar één frame later
+        spans = [(start, end) for start, end in spans
+                 if end - start > 1.5 / fps or abs(start - self.first_sample_t) < _EPS]
+        if self.info.get("lookahead"):
+            # zoals BlackDetector: wat over de grens loopt is open
+            return [(start, min(end, end_t), end >= end_t - _EPS)
+                    for start, end in spans if start < end_t - _EPS]
+        return [(start, end, False) for start, end in spans if end != float("inf")]
+
+    def to_events(self, runs):
+        return [self._event("FREEZE", start, end, "frozen frame")
+                for start, end, _ in runs if end - start >= FREEZE_MIN_DURATION - _EPS]
+
+
+def glitch_flags(mean_bgr, green_min=None, pink_min=None, pink_green_max=None, oversat_min=None):
+    """Gemiddelde B, G, R per frame (n, 3) → kleurglitch (groen/roze/overbelicht) per frame;
+    zonder drempels de GLITCH_*-instellingen."""
+    green_min = GLITCH_GREEN_MIN if green_min is None else green_min
+    pink_min = GLITCH_PINK_MIN if pink_min is None else pink_min
+    pink_green_max = GLITCH_PINK_GREEN_MAX if pink_green_max is None else pink_green_max
+    oversat_min = GLITCH_OVERSAT_MIN if oversat_min is None else oversat_min
+    b, g, r = np.asarray(mean_bgr, dtype=np.float64).T
+    green_glitch = (g > green_min) & (g > r) & (g > b)
+    pink_glitch = (r > pink_min) & (b > pink_min) & (g < pink_green_max)
+    oversaturated = (r > oversat_min) | (g > oversat_min) | (b > oversat_min)
+    return green_glitch | pink_glitch | oversaturated
+
+
+def freeze_flags(diff):
+    """Gemiddeld absoluut verschil met het vorige frame (0..255) → bevroren per frame,
+    zoals freezedetect n=: verschil / 2^bitdiepte ≤ FREEZE_NOISE. NaN (geen vorig frame) → False."""
+    return np.asarray(diff, dtype=np.float64) / 256.0 <= FREEZE_NOISE
+
+
+def ruis_flags(s_mean, lap_var, stripe_std, sat_max=None, lap_var_min=None, stripe_std_min=None):
+    """Grijs (lage verzadiging) én ruis of strepen, per frame; zonder drempels de RUIS_*-instellingen."""
+    sat_max = RUIS_SAT_MAX if sat_max is None else sat_max
+    lap_var_min = RUIS_LAP_VAR_MIN if lap_var_min is None else lap_var_min
+    stripe_std_min = RUIS_STRIPE_STD_MIN if stripe_std_min is None else stripe_std_min
+    return (np.asarray(s_mean) <= sat_max) & ((np.asarray(lap_var) >= lap_var_min)
+                                              | (np.asarray(stripe_std) >= stripe_std_min))
+
+
+class BatchedFrameDetector(FrameDetector):
+    """
+    Frame-detector die zijn samples per batch beoordeelt (zie FeatureEngine).
+
+    ``sample`` beslist per frame of het meetelt (en geeft eventueel een
+    uitsnede terug), het frame gaat dan de batch in; ``on_batch(engine)``
+    verwerkt steeds een volle batch op volgorde. ``runs`` verwerkt eerst de
+    rest. Frames hoger dan ``max_height`` worden eerst verkleind (INTER_AREA).
+    Binnen collect_features() legt ``on_batch`` de kenmerken vast onder
+    ``timeline_kind`` (zie FeatureTimeline).
+    """
+    wants_frames = True
+    max_height = None
+    timeline_kind = None
+
+    def start(self, info):
+        super().start(info)
+        self.engine = FeatureEngine()
+
+    def sample(self, idx, t, frame):
+        return frame
+
+    def on_frame(self, idx, t, frame):
+        frame = self.sample(idx, t, frame)
+        if frame is None:
+            return
+        if self.first_sample_t is None:
+            self.first_sample_t = t
+        size = None
+        h0, w0 = frame.shape[:2]
+        if self.max_height and h0 > self.max_height:
+            scale = self.max_height / h0
+            size = (int(w0 * scale), int(h0 * scale))
+        if self.engine.push(t, frame, size):
+            self.flush()
+
+    def flush(self):
+        if self.engine.n:
+            self.on_batch(self.engine)
+            self.engine.clear()
+
+    def on_batch(self, engine):
+        pass
+
+    def runs(self, end_t):
+        self.flush()
+        timeline = _current_timeline()
+        if timeline is not None and self.timeline_kind:
+            timeline.set_end(self.timeline_kind, end_t)
+            timeline.meta.setdefault("fps", self.info.get("fps"))
+        return self.track.finish(end_t)
+
+
+class FreezeSuspectDetector(BatchedFrameDetector):
+    """
+    Grove freeze-verdenking voor de triage-scan: twee opeenvolgende samples
+    (bv. keyframes) die nauwelijks verschillen. freezedetect zelf is op zulke
+    dunne samples onbruikbaar; dit geeft alleen vensters, geen events.
+    """
+    name = "freeze_suspect"
+    analysis_height = GLITCH_ANALYSIS_HEIGHT
+
+    def __init__(self, sample_fps=TRIAGE_FPS):
+        self.sample_fps = sample_fps
+
+    def start(self, info):
+        super().start(info)
+        self.track = _SegmentTracker(0.0)
+        self.last_bucket = None
+        self.prev_t = None
+
+    def sample(self, idx, t, frame):
+        bucket = int(t * self.sample_fps + _EPS)
+        if bucket == self.last_bucket:
+            return None
+        self.last_bucket = bucket
+        return frame
+
+    def on_batch(self, engine):
+        diff = engine.frame_diff()
+        for t, valid, same in zip(engine.times[:engine.n].tolist(), (diff == diff).tolist(),
+                                  freeze_flags(diff).tolist()):
+            if valid:                        # NaN: eerste sample, niets om mee te vergelijken
+                # 'bevroren' vanaf het vorige sample: dat beeld stond er al
+                self.track.update(same, self.prev_t if same and self.track.start is None else t)
+            self.prev_t = t
+
+
+class GlitchDetector(BatchedFrameDetector):
+    """
+    Eenvoudige kleurafwijkingen: groen/roze/overbelichting.
+    Werkt op een thumbnail (analysis_height) en eventueel op sample_fps frames/sec;
+    segmenten blijven in seconden gemeten, dus MIN_GLITCH_DURATION blijft gelden.
+    In de gedeelde pass (detect_video_events) komen de frames op
+    PASS_FRAME_HEIGHT binnen en maakt de detector zelf de thumbnail (INTER_AREA);
+    alleen (detect_glitches) schaalt ffmpeg meteen naar de thumbnail (zie
+    _pipe_size). De gemiddelden verschillen dan hooguit ~1 grijswaarde.
+    """
+    name = "glitch"
+    splittable = True
+    timeline_kind = "glitch"
+
+    def __init__(self, crop_top_ratio=0.0,
+                 analysis_height=GLITCH_ANALYSIS_HEIGHT,
+                 sample_fps=GLITCH_SAMPLE_FPS,
+                 hold=GLITCH_HOLD_SEC,
+                 thresholds=None):
+        self.crop_top_ratio = crop_top_ratio
+        self.thresholds = thresholds or {}   # glitch_flags-drempels; leeg = GLITCH_*
+        self.max_height = analysis_height or None                 # thumbnail
+        self.analysis_height = None if self.max_height is None else max(self.max_height, PASS_FRAME_HEIGHT)
+        self.sample_fps = sample_fps or None
+        self.hold = hold
+
+    def start(self, info):
+        super().start(info)
+        self.track = _SegmentTracker(0.0, hold=self.hold, on_close=self._emit)
+        # decimatie op een vast tijdgrid: het eerste frame per 1/sample_fps telt
+        first = info.get("first_frame", 0)
+        self.last_bucket = None
+        if self.sample_fps and first > 0:
+            self.last_bucket = self._bucket((first - 1) / info["fps"])
+
+    def _bucket(self, t):
+        return int(t * self.sample_fps + _EPS)
+
+    def sample(self, idx, t, frame):
+        if self.sample_fps:
+            bucket = self._bucket(t)
+            if bucket == self.last_bucket:
+                return None
+            self.last_bucket = bucket
+        if self.crop_top_ratio > 0.0:
             h = frame.shape[0]
-            cut = int(h * crop_top_ratio)
+            cut = int(h * self.crop_top_ratio)
             if cut < h:
                 frame = frame[cut:, :]
+        return frame
+
+    def on_batch(self, engine):
+        means = engine.mean_bgr()
+        flags = glitch_flags(means, **self.thresholds)
+        timeline = _current_timeline()
+        if timeline is not None:
+            # zwart en bevroren komen in de pass uit ffmpeg; voor de tijdlijn per frame benaderd
+            timeline.add("glitch", t=engine.times[:engine.n], b=means[:, 0], g=means[:, 1], r=means[:, 2],
+                         black=engine.black_ratio(BLACKDETECT_PIX_TH * 255), diff=engine.frame_diff())
+        for t, flag in zip(engine.times[:engine.n].tolist(), flags.tolist()):
+            self.track.update(flag, t)
+
+    def to_events(self, runs):
+        return [self._event("GLITCH", start, end,
+                            "green/pink/oversaturated anomaly" + (" (end)" if at_end else ""))
+                for start, end, at_end in runs if end - start >= MIN_GLITCH_DURATION - _EPS]
+
+
+class RuisDetector(BatchedFrameDetector):
+    """
+    Grijs scherm met ruis/strepen (VHS-ruis/strepen):
+    Lage verzadiging (grijsheid)
+    Ruis-/streepvorming op basis van de Laplaciaan of de standaardafwijking per kolom (std)
 
-        avg_color = frame.mean(axis=0).mean(axis=0)
-        r, g, b = float(avg_color[2]), float(avg_color[1]), float(avg_color[0])
-
-        green_glitch = g > 180 and g > r and g > b
-        pink_glitch = r > 180 and b > 180 and g < 130
-        oversaturated = (r > 230 or g > 230 or b > 230)
-
-        is_glitch = green_glitch or pink_glitch or oversaturated
-
-        if is_glitch and not in_glitch:
-            in_glitch = True
-            glitch_start = i
-        elif not is_glitch and in_glitch:
-            glitch_end = i
-            glitch_duration = (glitch_end - glitch_start) / fps
-            if glitch_duration >= MIN_GLITCH_DURATION:
-                results.append({
-                    "type": "GLITCH",
-                    "start": to_hms(glitch_start / fps),
-                    "end": to_hms(glitch_end / fps),
-                    "duration": glitch_duration,
-                    "details": "green/pink/oversaturated anomaly"
-                })
-            in_glitch = False
-
-    if in_glitch:
-        glitch_end = frame_count
-        glitch_duration = (glitch_end - glitch_start) / fps
-        if glitch_duration >= MIN_GLITCH_DURATION:
-            results.append({
-                "type": "GLITCH",
-                "start": to_hms(glitch_start / fps),
-                "end": to_hms(glitch_end / fps),
-                "duration": glitch_duration,
-                "details": "green/pink/oversaturated anomaly (end)"
-            })
+    Adaptief (``coarse_sec``, standaard RUIS_COARSE_SEC): de pass beoordeelt maar
+    één frame per coarse_sec; ``refine`` zet daarna elke omslag op het exacte
+    frame. Een schoon gat korter dan coarse_sec binnen een ruis-segment kan zo
+    wegvallen. Binnen collect_features() altijd vast op fps_sample: de
+    tijdlijn moet regelmatige samples hebben om later opnieuw te beoordelen.
+    """
+    name = "ruis"
+    splittable = True
+    timeline_kind = "ruis"
+    analysis_height = PASS_FRAME_HEIGHT      # de kenmerken worden op hoogte ~480 berekend
+    max_height = PASS_FRAME_HEIGHT
+    _score_engine = None       # voor frame_score
+
+    def __init__(self,
+                 fps_sample=RUIS_FPS_SAMPLE,
+                 sat_max=RUIS_SAT_MAX,
+                 lap_var_min=RUIS_LAP_VAR_MIN,
+                 stripe_std_min=RUIS_STRIPE_STD_MIN,
+                 min_duration=MIN_GLITCH_DURATION,
+                 coarse_sec=RUIS_COARSE_SEC):
+        if coarse_sec and _current_timeline() is None:
+            if min_duration > 0:
+                # een segment van min_duration bevat dan zeker twee grove samples
+                coarse_sec = min(coarse_sec, min_duration / 2.0)
+            fps_sample = 1.0 / coarse_sec
+        else:
+            coarse_sec = None
+        self.coarse_sec = coarse_sec
+        self._edges = {}           # (t, was_on) → verfijnde grens, zie refine
+        self.fps_sample = fps_sample
+        # alleen zoveel frames/sec nodig: alleen of met andere samplende
+        # detectors laat de pass ffmpeg decimeren (fps-filter, sequentieel, geen seeks)
+        self.sample_fps = max(0.1, fps_sample)
+        self.sat_max = sat_max
+        self.lap_var_min = lap_var_min
+        self.stripe_std_min = stripe_std_min
+        self.min_duration = min_duration
+
+    def start(self, info):
+        super().start(info)
+        self.step = max(1, int(round(info["analysis_fps"] / max(0.1, self.fps_sample))))
+        # alleen keyframes: de indexen zijn onregelmatig, dan per tijdvak van 1/fps_sample
+        self.last_bucket = None if info.get("keyframes_only") else False
+        self.track = _SegmentTracker(0.0, on_close=self._emit)
+
+    def classify(self, engine):
+        """Per frame in de batch: (vlag, S-gemiddelde, Laplaciaan-variantie, streep-std)."""
+        s_mean, lap_var, stripe_std = engine.saturation(), engine.lap_var(), engine.stripe_std()
+        flags = ruis_flags(s_mean, lap_var, stripe_std, self.sat_max, self.lap_var_min, self.stripe_std_min)
+        return flags, s_mean, lap_var, stripe_std
+
+    def frame_score(self, img_bgr):
+        """Eén los frame beoordelen (zelfde kenmerken als in de batch) → (vlag, S, lapVar, stripeSTD)."""
+        engine = self._score_engine
+        if engine is None:
+            # één engine per detector: de buffers blijven zolang de framegrootte gelijk is
+            engine = self._score_engine = FeatureEngine(max_frames=1)
+        engine.clear()
+        h0, w0 = img_bgr.shape[:2]
+        scale = self.max_height / max(1, h0)
+        engine.push(0.0, img_bgr, (int(w0 * scale), int(h0 * scale)) if scale < 1.0 else None)
+        flag, s_mean, lap_var, stripe_std = self.classify(engine)
+        return bool(flag[0]), float(s_mean[0]), float(lap_var[0]), float(stripe_std[0])
+
+    def sample(self, idx, t, frame):
+        if self.last_bucket is False:
+            if idx % self.step:
+                return None
+        else:
+            bucket = int(t * max(0.1, self.fps_sample) + _EPS)
+            if bucket == self.last_bucket:
+                return None
+            self.last_bucket = bucket
+        return frame
+
+    def on_batch(self, engine):
+        flags, s_mean, lap_var, stripe_std = self.classify(engine)
+        timeline = _current_timeline()
+        if timeline is not None:
+            timeline.add("ruis", t=engine.times[:engine.n], sat=s_mean, lap_var=lap_var, stripe_std=stripe_std)
+        for t, flag in zip(engine.times[:engine.n].tolist(), flags.tolist()):
+            self.track.update(flag, t)
+
+    def _emit(self, run):
+        if self.coarse_sec and self.source is None:
+            # groeiend bestand: pas verfijnen als het compleet is (finish), tot dan niet melden
+            if self.on_run is not None:
+                self.on_run(run)
+            return
+        super()._emit(run)
+
+    def refine(self, runs):
+        """
+        Adaptief: een grens uit de grove pass ligt ergens tussen twee samples.
+        Per grens één korte decode van dat stuk (ffmpeg -ss, zelfde framegrootte
+        als de pass) en daarin grof-naar-fijn het exacte frame (_RuisEdgeFinder).
+        Runs die ook verfijnd korter blijven dan min_duration en een open einde
+        blijven zoals ze zijn.
+        """
+        if not self.coarse_sec or not self.source or self.info.get("fps", 0) <= 0:
+            return runs
+        refined = []
+        for start, end, at_end in runs:
+            if end - start + self.coarse_sec >= self.min_duration - _EPS:
+                start = self._edge(start, False)
+                if not at_end:
+                    end = self._edge(end, True)
+            refined.append((start, end, at_end))
+        return refined
+
+    def _edge(self, t, was_on):
+        # onthouden: een gestreamde run komt in finish of na het samenvoegen nog eens langs
+        key = (round(t, 6), was_on)
+        if key not in self._edges:
+            fps, frames = self.info["fps"], self.info.get("frames", 0)
+            # van net vóór het vorige grove sample tot net na dit (marge voor afronding)
+            first = max(0, int(np.floor((t - self.coarse_sec) * fps)) - 1)
+            last = int(round(t * fps)) + 1
+            if frames > 0:
+                last = min(last, frames - 1)
+            finder = _RuisEdgeFinder(self, was_on, first, last)
+            if last > first:
+                run_frame_pipeline(self.source, [finder], stage="ruis", first_frame=first,
+                                   max_frames=last - first + 1, raw=True, info=self.info,
+                                   cancel=self.cancel)
+            self._edges[key] = t if finder.edge is None else finder.edge / fps
+        return self._edges[key]
+
+    def to_events(self, runs):
+        results = []
+        for start, end, at_end in runs:
+            if end - start < self.min_duration - _EPS:
+                continue
+            details = (
+                "gray+noisy/striped (end)" if at_end else
+                f"gray+noisy/striped (S≤{self.sat_max}, lapVar≥{self.lap_var_min} or stripeSTD≥{self.stripe_std_min})"
+            )
+            results.append(self._event("RUIS/STRIPES", start, end, details))
+        return results
 
-    cap.release()
+
+class _RuisEdgeFinder(FrameDetector):
+    """
+    Voor RuisDetector.refine: in het venster [first, last] het laatste frame
+    met de oude toestand (``was_on``); ``edge`` wordt het frame erna, of None
+    als het venster geen omslag laat zien. Grof-naar-fijn: elk k-de frame
+    (k ≈ √n) wordt beoordeeld, daarna alleen de frames tussen de laatste oude
+    en de eerste nieuwe stap; ~2√n keer frame_score en hooguit 2k frames in
+    het geheugen.
+    """
+    name = "ruis"
+    wants_frames = True
+    analysis_height = PASS_FRAME_HEIGHT      # dezelfde frames als RuisDetector in de pass
+    max_height = PASS_FRAME_HEIGHT
+
+    def __init__(self, ruis, was_on, first, last):
+        self.ruis = ruis
+        self.was_on = was_on
+        self.first, self.last = first, last
+        self.step = max(1, int(np.sqrt(last - first + 1)))
+        self.pending = []          # frames sinds de vorige stap
+        self.bracket = None        # frames tussen de laatste oude en de eerste nieuwe stap
+        self.last_old = None
+        self.edge = None
+
+    def on_frame(self, idx, t, frame):
+        if (idx - self.first) % self.step and idx < self.last:
+            self.pending.append((idx, frame.copy()))
+            return
+        if self.ruis.frame_score(frame)[0] == self.was_on:
+            self.last_old, self.bracket = idx, None
+        elif self.bracket is None:
+            self.bracket = self.pending
+        self.pending = []
+
+    def runs(self, end_t):
+        if self.bracket is not None and self.last_old is not None:
+            self.edge = self.last_old + 1
+            for idx, frame in reversed(self.bracket):
+                if self.ruis.frame_score(frame)[0] == self.was_on:
+                    self.edge = idx + 1
+                    break
+        return []
+
+
+def _analysis_size(info, frame_detectors):
+    """Kleinste framegrootte die alle frame-detectors nog bedient (even breedte/hoogte)."""
+    w, h = info["width"], info["height"]
+    wanted = [d.analysis_height for d in frame_detectors]
+    if any(x is None for x in wanted) or not wanted:
+        target = h
+    else:
+        target = min(h, max(wanted))
+    if target < h:
+        w = max(2, int(round(w * target / h / 2.0)) * 2)
+        h = max(2, int(target) // 2 * 2)
+    return w, h
+
+def _pipe_size(w, h, frame_detectors):
+    """
+    Framegrootte in de pipe. Verkleint elke frame-detector zelf tot onder
+    (w, h) (max_height, bv. GlitchDetector alleen), dan schaalt ffmpeg meteen
+    naar die grootte (zelfde afmetingen als in on_frame): de detector hoeft
+    niets meer te verkleinen en er gaan veel minder bytes door de pipe.
+    """
+    wanted = [d.max_height for d in frame_detectors]
+    if not wanted or any(x is None for x in wanted) or max(wanted) >= h:
+        return w, h
+    scale = max(wanted) / h
+    return max(2, int(w * scale)), max(2, int(h * scale))
+
+def _read_exact(stream, view) -> bool:
+    """Vult de buffer volledig vanuit de pipe; False bij EOF."""
+    got, size = 0, len(view)
+    while got < size:
+        n = stream.readinto(view[got:])
+        if not n:
+            return False
+        got += n
+    return True
+
+class AnalysisCancelled(Exception):
+    """De analyse werd afgebroken via het ``cancel``-event."""
+
+
+class _Watchdog:
+    """Stopt een ffmpeg-proces bij annuleren (threading.Event) of na ``timeout`` seconden."""
+
+    def __init__(self, proc, cancel=None, timeout=None):
+        self.proc = proc
+        self.cancel = cancel
+        self.timeout = timeout
+        self.reason = None
+        self._stop = threading.Event()
+        if cancel is not None or timeout:
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        while True:
+            if self.cancel is not None and self.cancel.is_set():
+                self.reason = "cancel"
+            elif deadline is not None and time.monotonic() >= deadline:
+                self.reason = "timeout"
+            elif not self._stop.wait(0.2):
+                continue
+            else:
+                return
+            self.proc.kill()
+            return
+
+    def close(self):
+        """Na proc.wait(): gooit een fout als het proces door ons gestopt werd."""
+        self._stop.set()
+        if self.reason == "cancel":
+            raise AnalysisCancelled(os.path.basename(self.proc.args[self.proc.args.index("-i") + 1]))
+        if self.reason == "timeout":
+            raise subprocess.TimeoutExpired(self.proc.args, self.timeout)
+
+
+_PROGRESS_TIME_RE = re.compile(r'^out_time_us=(\d+)\s*$')
+_PROGRESS_FRAME_RE = re.compile(r'^frame=(\d+)\s*$')
+_SHOWINFO_PTS_RE = re.compile(r'\bn:\s*\d+\s+pts:\s*-?\d+\s+pts_time:(-?\d+(?:\.\d*)?)')
+_LOOKAHEAD = 2
+
+def run_frame_pipeline(filepath, detectors, progress=None, stage="video",
+                       first_frame=0, max_frames=None, raw=False, info=None,
+                       on_event=None, cancel=None, timeout=FFMPEG_TIMEOUT_SEC,
+                       keyframes_only=None, growing=None, scaler=None):
+    """
+    Decodeert de video één keer en voedt elk frame aan alle detectors.
+    ``progress(stage, frames_done, frames_total)`` volgt de decode (zie make_progress);
+    zonder frame-detectors komt die uit ``-progress pipe:2``.
+
+    ``keyframes_only`` (standaard DECODE_KEYFRAMES_ONLY): alleen keyframes
+    decoderen (-skip_frame nokey); de frames krijgen hun echte tijdstempel
+    via showinfo. Grof, bedoeld voor een snelle eerste scan; niet per bereik.
+    ``scaler``: sws-flags van het scale-filter (standaard DECODE_SCALER).
+
+    ``growing`` (GrowingFile): lezen terwijl de upload binnenkomt, via stdin;
+    geen tijdsbereik of keyframes-only, het aantal frames is vooraf onbekend.
+
+    Binnen een meting (zie metered) telt de pass frames, bytes uit de pipe
+    en de Python-tijd per frame-detector mee.
+
+    Alles wordt gestreamd: stderr regel per regel, frames één voor één.
+    ``on_event(event)`` krijgt elk event zodra het segment afgesloten is (ook
+    vanuit de stderr-thread). ``cancel`` (threading.Event) of ``timeout``
+    (seconden, 0 = geen) stoppen ffmpeg → AnalysisCancelled / TimeoutExpired.
+
+    Tijdsbereik: ``first_frame``/``max_frames`` decoderen alleen dat stuk
+    (ffmpeg -ss DECODE_SEEK_MARGIN_SEC eerder vóór -i, trim, -frames:v), met
+    tijden op de globale tijdlijn uit de tijdstempels van de frames. Er
+    worden _LOOKAHEAD frames extra gedecodeerd zodat blackdetect ziet of een
+    zwarte run over de grens heen loopt; de frame-detectors krijgen ze niet.
+    ``raw=True`` geeft ([(runs, first_sample_t) per detector], end_t) terug
+    in plaats van events, om bereiken later samen te voegen.
+    """
+    if growing is not None and (first_frame > 0 or max_frames is not None):
+        raise ValueError("een groeiend bestand kan niet per tijdsbereik")
+    info = dict(info or (probe_growing(growing) if growing is not None else probe_video(filepath)))
+    ranged = first_frame > 0 or max_frames is not None
+    keyframes = ((DECODE_KEYFRAMES_ONLY if keyframes_only is None else keyframes_only)
+                 and not ranged and growing is None)
+    active = [d for d in detectors if d.keyframes_ok or not keyframes]
+    filters = [d.vf for d in active if d.vf]
+    log_dets = [d for d in active if d.vf]
+    frame_dets = [d for d in active if d.wants_frames]
+    if (frame_dets or ranged) and (info["fps"] <= 0 or info["width"] <= 0 or info["height"] <= 0):
+        print("   ⚠️ geen bruikbare videostream voor frame-detectors", flush=True)
+        frame_dets = []
+        if ranged:
+            return ([([], None) for _ in detectors], 0.0) if raw else []
+
+    # decimatie: alleen als geen enkele frame-detector elk frame nodig heeft;
+    # het fps-filter staat ná blackdetect/freezedetect, die zien dus alles.
+    # Bij een tijdsbereik nooit: dan moeten de frame-indexen globaal blijven.
+    info["analysis_fps"] = info["fps"]
+    rates = [d.sample_fps for d in frame_dets]
+    if not ranged and not keyframes and rates and all(rates) and max(rates) < info["fps"]:
+        info["analysis_fps"] = float(max(rates))
+    info["keyframes_only"] = keyframes
+    info["first_frame"] = first_frame
+    info["seek"] = 0.0
+    info["lookahead"] = False
+    if first_frame > 0:
+        # ruim vóór het doelframe openen; trim knipt daarna een half frame vóór first_frame
+        info["seek"] = max(0.0, (first_frame - 0.5) / info["fps"] - DECODE_SEEK_MARGIN_SEC)
+
+    total_frames = info["frames"] - first_frame
+    if max_frames is not None:
+        total_frames = min(total_frames, max_frames)
+    if frame_dets and not keyframes:
+        total_frames = int(round(total_frames * info["analysis_fps"] / info["fps"]))
+    total_frames = max(0, total_frames)
+    report = make_progress(progress, stage, total_frames)
+    for d in detectors:
+        d.on_event = None if raw else on_event
+        # gerichte extra decodes (RuisDetector.refine) lezen het bestand zelf,
+        # een groeiend bestand pas als de upload compleet is
+        d.source = filepath if growing is None else None
+        d.cancel = cancel
+        d.start(info)
+
+    def done(end_t):
+        if growing is not None:
+            for d in detectors:
+                d.source = growing.path
+        if raw:
+            return [(d.runs(end_t), d.first_sample_t) for d in detectors], end_t
+        return [ev for d in detectors for ev in d.finish(end_t)]
+
+    if not filters and not frame_dets:
+        return done(0.0)
+
+    # frames met hun echte tijdstempel (showinfo) i.p.v. geteld: bij keyframes-only
+    # en na een seek, want wat de decoder daar overslaat zou alles verschuiven
+    timed = keyframes or first_frame > 0
+    if first_frame > 0:
+        # alle filters (ook blackdetect/freezedetect) beginnen exact bij first_frame
+        filters.insert(0, f"trim=start={(first_frame - 0.5) / info['fps'] - info['seek']:.6f}")
+
+    cmd = ["ffmpeg", "-hide_banner", "-nostats"]
+    cmd += ffmpeg_input_args("pipe:0" if growing is not None else filepath, info["seek"], keyframes)
+    cmd += ["-an", "-sn", "-dn"]
+    if max_frames is not None:
+        cmd += ["-frames:v", str(int(max_frames) + _LOOKAHEAD)]
+    if frame_dets:
+        w, h = _analysis_size(info, frame_dets)
+        if info["analysis_fps"] != info["fps"]:
+            # round=up: sample n is het frame óp n / analysis_fps ('near' neemt
+            # het frame een half interval later, dan klopt t niet met het beeld)
+            filters.append(f"fps={info['analysis_fps']}:round=up")
+        w, h = _pipe_size(w, h, frame_dets)
+        filters.append(scale_filter(w, h, scaler))
+        if timed:
+            # geen CFR-opvulling met duplicaten; tijdstempels komen uit showinfo
+            filters.append("showinfo=checksum=0")
+            cmd += ["-fps_mode", "passthrough"]
+        cmd += ["-vf", ",".join(filters), "-pix_fmt", "bgr24", "-f", "rawvideo", "pipe:1"]
+    else:
+        # zonder frames via de pipe: voortgang uit ffmpeg zelf (out_time_us op stderr)
+        cmd += ["-vf", ",".join(filters), "-progress", "pipe:2", "-f", "null", "-"]
+
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE if growing is not None else None,
+        stdout=subprocess.PIPE if frame_dets else subprocess.DEVNULL,
+        stderr=subprocess.PIPE
+    )
+    _track_child(proc)
+    if growing is not None:
+        _start_tail(growing, proc, cancel)
+    watchdog = _Watchdog(proc, cancel, timeout)
+    pts_queue = queue.Queue()
+    record = _current_metrics()
+    log_frames = [0]
+    pump_cpu = [0.0]
+
+    # stderr (filter-logs) parallel lezen, anders loopt de pipe vol
+    def pump_stderr():
+        for raw_line in proc.stderr:
+            line = raw_line.decode("utf-8", "replace")
+            if not frame_dets:
+                match = _PROGRESS_TIME_RE.match(line)
+                if match:
+                    report(min(total_frames, int(int(match.group(1)) * info["fps"] / 1e6)))
+                    continue
+                match = _PROGRESS_FRAME_RE.match(line)
+                if match:
+                    log_frames[0] = int(match.group(1))
+                    continue
+            elif timed:
+                match = _SHOWINFO_PTS_RE.search(line)
+                if match:
+                    pts_queue.put(float(match.group(1)))
+                    continue
+            for d in log_dets:
+                d.on_log(line)
+        pump_cpu[0] = time.thread_time()
+    reader = threading.Thread(target=pump_stderr, daemon=True)
+    reader.start()
+    report(0, force=True)
+
+    end_t = info["duration"]
+    if ranged:
+        end_t = (first_frame + total_frames) / info["fps"]
+    frames_read = 0
+    pipe_frames = 0
+    end_idx = first_frame
+    if frame_dets:
+        feed, frame_sec = _frame_feeder(frame_dets, record)
+        buf = bytearray(w * h * 3)
+        view = memoryview(buf)
+        frame = np.frombuffer(buf, dtype=np.uint8).reshape(h, w, 3)
+        fps = info["analysis_fps"]
+        try:
+            for n in tqdm(itertools.count(first_frame),
+                            total=total_frames or None,
+                            desc=f"   🎞 VIDEO {os.path.basename(filepath)}",
+                            unit="f",
+                            leave=False):
+                if not _read_exact(proc.stdout, view):
+                    break
+                pipe_frames += 1
+                idx = n
+                if timed:
+                    # showinfo logt het frame vóór het de pipe in gaat
+                    t = pts_queue.get(timeout=60) + info["seek"]
+                    idx = int(round(t * info["fps"]))
+                    if keyframes:
+                        feed(idx, t, frame)
+                        frames_read += 1
+                        report(idx)
+                        continue
+                if max_frames is not None and idx - first_frame >= max_frames:
+                    # met -frames:v verwerkt blackdetect het allerlaatste frame niet altijd,
+                    # daarom twee frames vooruit: het grensframe zelf komt dan zeker door
+                    info["lookahead"] = idx - first_frame + 1 >= max_frames + _LOOKAHEAD
+                    continue
+                t = idx / fps
+                feed(idx, t, frame)
+                frames_read += 1
+                end_idx = idx + 1
+                report(frames_read)
+        except BaseException:
+            # fout in een detector of Ctrl+C: ffmpeg niet laten doorlopen
+            proc.kill()
+            raise
+        proc.stdout.close()
+        end_t = info["duration"] if keyframes else end_idx / fps
+
+    _reap(proc, record)
+    reader.join()
+    watchdog.close()
+    _add_metrics(cpu_sec=pump_cpu[0], record=record)
+    if not frame_dets and max_frames is not None:
+        info["lookahead"] = first_frame + max_frames + _LOOKAHEAD <= info["frames"]
+    if frame_dets:
+        _add_metrics(pipe_frames, frame_sec=frame_sec, record=record)
+    else:
+        _add_metrics(log_frames[0], record=record)
+    report(frames_read if frame_dets and not keyframes else total_frames, force=True)
+    return done(end_t)
+
+
+def _join_range_runs(parts, hold=0.0):
+    """
+    Voegt de ruwe runs van opeenvolgende tijdsbereiken samen tot runs over de
+    hele tijdlijn, precies zoals één sequentiële pass ze had gevonden.
+
+    parts: [(runs, first_sample_t)] per bereik, op volgorde. Een run die tot
+    het einde van een bereik doorloopt (open_end) gaat verder in de eerste run
+    van het volgende bereik als die op diens eerste sample begint; anders
+    eindigt hij op dat eerste sample (daar zag de sequentiële pass 'uit').
+    """
+    out = []
+    pending = None
+    parts = [p for p in parts if p[1] is not None]      # lege bereiken overslaan
+    for i, (runs, first_t) in enumerate(parts):
+        last = i == len(parts) - 1
+        runs = list(runs)
+        if pending is not None:
+            if runs and abs(runs[0][0] - first_t) < _EPS:
+                _, end, open_end = runs[0]
+                runs[0] = (pending[0], end, open_end)
+            else:
+                out.append((pending[0], first_t, False))
+            pending = None
+        for j, (start, end, open_end) in enumerate(runs):
+            if open_end and j == len(runs) - 1 and not last:
+                pending = (start, end, open_end)
+            else:
+                out.append((start, end, open_end and last))
+    if pending is not None:
+        out.append(pending)
+
+    # hysterese over de grenzen: korte gaten alsnog overbruggen
+    if hold > 0 and out:
+        merged = [out[0]]
+        for start, end, open_end in out[1:]:
+            if start - merged[-1][1] < hold:
+                merged[-1] = (merged[-1][0], end, open_end)
+            else:
+                merged.append((start, end, open_end))
+        out = merged
+    return out
+
+
+# =======================
+#     DETECTORS
+# =======================
+@metered("video")
+def detect_video_events(filepath, crop_top_ratio=0.0, progress=None,
+                        on_event=None, cancel=None, timeout=FFMPEG_TIMEOUT_SEC, keyframes_only=None,
+                        growing=None):
+    """Zwart, glitch, freeze en ruis in één decode-pass (on_event/cancel/timeout/growing: zie run_frame_pipeline)."""
+    print("   ⏳ video-pass (black, glitch, freeze, ruis)…", flush=True)
+    results = run_frame_pipeline(filepath, [
+        BlackDetector(),
+        GlitchDetector(crop_top_ratio=crop_top_ratio),
+        FreezeDetector(),
+        RuisDetector(),
+    ], progress=progress, on_event=on_event, cancel=cancel, timeout=timeout,
+       keyframes_only=keyframes_only, growing=growing)
+    print("   ✅ video-pass done", flush=True)
     return results
 
 
-def detect_freezes(filepath):
-    print("   ⏳ freezedetect…", flush=True)
-    results = []
-    ffmpeg_cmd = [
-        "ffmpeg", "-hide_banner", "-i", filepath,
-        "-vf", f"freezedetect=n=0.003:d={FREEZE_MIN_DURATION}",
-        "-an", "-f", "null", "-"
+def _range_detectors(crop_top_ratio=0.0, settings=None):
+    """De splitsbare detectors van de video-pass (volgorde zoals detect_video_events),
+    met de drempels uit ``settings`` (detector_settings(), standaard de huidige)."""
+    s = settings or detector_settings()
+    return [
+        BlackDetector(split=True, pix_th=s["BLACKDETECT_PIX_TH"], pic_th=s["BLACKDETECT_PIC_TH"]),
+        GlitchDetector(crop_top_ratio=crop_top_ratio,
+                       analysis_height=s["GLITCH_ANALYSIS_HEIGHT"],
+                       sample_fps=s["GLITCH_SAMPLE_FPS"],
+                       hold=s["GLITCH_HOLD_SEC"],
+                       thresholds={"green_min": s["GLITCH_GREEN_MIN"], "pink_min": s["GLITCH_PINK_MIN"],
+                                   "pink_green_max": s["GLITCH_PINK_GREEN_MAX"],
+                                   "oversat_min": s["GLITCH_OVERSAT_MIN"]}),
+        FreezeDetector(split=True, noise=s["FREEZE_NOISE"]),
+        RuisDetector(fps_sample=s["RUIS_FPS_SAMPLE"],
+                     sat_max=s["RUIS_SAT_MAX"],
+                     lap_var_min=s["RUIS_LAP_VAR_MIN"],
+                     stripe_std_min=s["RUIS_STRIPE_STD_MIN"],
+                     min_duration=s["MIN_GLITCH_DURATION"],
+                     coarse_sec=s["RUIS_COARSE_SEC"]),
     ]
-    result = subprocess.run(ffmpeg_cmd, stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True)
-    freeze_start = None
 
-    for line in result.stderr.splitlines():
-        line = line.strip()
-        if "freeze_start:" in line:
-            try:
-                freeze_start = float(line.split("freeze_start:")[1])
-            except Exception:
-                freeze_start = None
-        elif "freeze_end:" in line and freeze_start is not None:
-            try:
-                freeze_end = float(line.split("freeze_end:")[1])
-                duration = freeze_end - freeze_start
-                results.append({
-                    "type": "FREEZE",
-                    "start": to_hms(freeze_start),
-                    "end": to_hms(freeze_end),
-                    "duration": duration,
-                    "details": "frozen frame"
-                })
-            except Exception:
-                pass
-            freeze_start = None
 
+def _range_run_is_final(run, first_sample_t, hold, range_end, is_first, is_last):
+    """
+    Verandert _join_range_runs deze afgesloten run van een bereik niet meer?
+    Niet als hij op het eerste sample begint of binnen ``hold`` erna (hij kan
+    dan een run uit het vorige bereik voortzetten), en niet als hij binnen
+    ``hold`` voor het einde van het bereik stopt (het volgende bereik kan hem
+    verlengen). Zulke runs kan een worker al melden vóór het samenvoegen.
+    """
+    start, end, open_end = run
+    if open_end:
+        return False
+    if not is_first and (first_sample_t is None or start - first_sample_t < max(hold, _EPS)):
+        return False
+    return is_last or end + hold < range_end - _EPS
+
+
+def _range_task(filepath, info, first_frame, n_frames, crop_top_ratio, features=False, settings=None,
+                updates=None, stop=None, index=0):
+    """Worker: één tijdsbereik → (ruwe runs per splitsbare detector, tellers voor de metrics,
+    kenmerken-tijdlijn van dit bereik of None). ``settings``: detector_settings() van
+    de aanroeper; een forkserver-worker kent zelf alleen de standaardwaarden, dus
+    gaan ze expliciet naar de detectors en de pipeline.
+
+    ``updates`` (Manager-queue) krijgt onderweg ("progress", index, frames) en
+    ("run", index, k, (start, end)) voor elke run van detector k die al vastligt
+    (zie _range_run_is_final), nog onverfijnd: refine doet de aanroeper.
+    ``stop`` (Manager-event) annuleert, de watchdog stopt dan ffmpeg."""
+    settings = settings or detector_settings()
+    with _measuring(_new_metrics_record("range")) as counts, \
+            (collect_features() if features else nullcontext()) as timeline:
+        # binnen collect_features(): dan sampelt ruis vast, zoals in de aanroeper
+        detectors = _range_detectors(crop_top_ratio, settings)
+        progress = None
+        if updates is not None:
+            fps = info["fps"]
+            range_end = (first_frame + n_frames) / fps
+            is_first, is_last = first_frame == 0, first_frame + n_frames >= info["frames"]
+
+            def progress(stage, done, total):
+                updates.put(("progress", index, done))
+
+            for k, det in enumerate(detectors):
+                def on_run(run, k=k, det=det):
+                    if _range_run_is_final(run, det.first_sample_t, det.hold, range_end, is_first, is_last):
+                        updates.put(("run", index, k, (run[0], run[1])))
+                det.on_run = on_run
+        parts, _ = run_frame_pipeline(filepath, detectors, progress=progress,
+                                      first_frame=first_frame, max_frames=n_frames,
+                                      raw=True, info=info, cancel=stop, scaler=settings["DECODE_SCALER"])
+    return parts, counts, timeline
+
+
+def _add_worker_metrics(counts):
+    # CPU en piek-RSS meet de worker zelf (met zijn ffmpeg); de piek van de
+    # video-pass is die van het zwaarste bereik, niet de som over de workers
+    _add_metrics(counts["frames"], counts["bytes_read"], counts["frame_sec"],
+                 cpu_sec=counts["cpu_sec"], peak_rss_mb=counts["peak_rss_mb"])
+
+
+@metered("video")
+def detect_video_events_parallel(filepath, crop_top_ratio=0.0, progress=None, workers=None,
+                                 on_event=None, cancel=None):
+    """
+    Als detect_video_events, maar één lange video verdeeld over ``workers``
+    processen: elk proces decodeert een eigen tijdsbereik (ffmpeg -ss), de
+    runs worden daarna over de grenzen heen samengevoegd. Zelfde events als
+    sequentieel; alleen freezedetect vergelijkt na een grens met een nieuw
+    referentieframe (bij echt stilstaand beeld maakt dat niets uit).
+
+    De workers melden via een Manager-queue hun voortgang per frame en elke
+    run die het samenvoegen niet meer verandert: ``on_event`` krijgt die
+    events meteen, de rest na het samenvoegen. ``cancel`` gaat via een
+    Manager-event naar de workers; hun watchdog stopt dan ffmpeg.
+    """
+    workers = RANGE_WORKERS if workers is None else workers
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    info = probe_video(filepath)
+    fps, frames = info["fps"], info["frames"]
+    if workers <= 1 or fps <= 0 or info["width"] <= 0 or frames < 2 * RANGE_MIN_SEC * fps:
+        return detect_video_events(filepath, crop_top_ratio=crop_top_ratio, progress=progress,
+                                   on_event=on_event, cancel=cancel)
+
+    timeline = _current_timeline()
+    settings = detector_settings()
+    detectors = _range_detectors(crop_top_ratio, settings)
+    for det in detectors:
+        # ruis-grenzen verfijnt deze kant, na het samenvoegen (refine)
+        det.info, det.source, det.cancel = info, filepath, cancel
+    # grenzen op een veelvoud van de ruis-stap, dan vallen de samples als sequentieel
+    step = max(1, int(round(fps / max(0.1, detectors[3].fps_sample))))
+    chunk = max(int(RANGE_MIN_SEC * fps), -(-frames // workers))
+    chunk = -(-chunk // step) * step
+    ranges = [(first, min(chunk, frames - first)) for first in range(0, frames, chunk)]
+    if len(ranges) > 1 and ranges[-1][1] < chunk // 2:
+        # een kort staartstuk bij het vorige voegen
+        tail = ranges.pop()
+        ranges[-1] = (ranges[-1][0], ranges[-1][1] + tail[1])
+
+    print(f"   ⏳ video-pass (black, glitch, freeze, ruis) in {len(ranges)} stukken…", flush=True)
+    report = make_progress(progress, "video", frames)
+    report(0, force=True)
+    parts = [None] * len(ranges)
+    range_done = [0] * len(ranges)
+    sent = set()                  # (type, start, end) van events die on_event al kreeg
+
+    def handle(msg):
+        if msg[0] == "progress":
+            range_done[msg[1]] = msg[2]
+        elif on_event is not None:
+            _, _, k, (start, end) = msg
+            for event in detectors[k].to_events(detectors[k].refine([(start, end, False)])):
+                sent.add((event.type, event.start, event.end))
+                on_event(event)
+
+    # forkserver: de web-app heeft threads (Flask, jobs); fork zou hun locks meekopiëren
+    ctx = multiprocessing.get_context("forkserver")
+    with ctx.Manager() as manager, \
+            ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=ctx) as pool:
+        updates, stop = manager.Queue(), manager.Event()
+        futures = {pool.submit(_range_task, filepath, info, first, n, crop_top_ratio,
+                               timeline is not None, settings, updates, stop, i): i
+                   for i, (first, n) in enumerate(ranges)}
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                if cancel is not None and cancel.is_set():
+                    raise AnalysisCancelled(os.path.basename(filepath))
+                while True:
+                    try:
+                        handle(updates.get_nowait())
+                    except queue.Empty:
+                        break
+                for fut in done:
+                    i = futures[fut]
+                    parts[i], counts, range_timeline = fut.result()
+                    _add_worker_metrics(counts)
+                    if timeline is not None:
+                        timeline.merge(range_timeline)
+                    range_done[i] = ranges[i][1]
+                report(sum(range_done))
+        except BaseException:
+            # lopende bereiken stoppen hun ffmpeg (watchdog), de rest start niet meer
+            stop.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+    report(frames, force=True)
+
+    results = {}
+    for k, det in enumerate(detectors):
+        runs = _join_range_runs([p[k] for p in parts], hold=det.hold)
+        results[det.name] = det.to_events(det.refine(runs))
+    print("   ✅ video-pass done", flush=True)
+    events = results["black"] + results["glitch"] + results["freeze"] + results["ruis"]
+    if on_event is not None:
+        for event in events:
+            if (event.type, event.start, event.end) not in sent:
+                on_event(event)
+    return events
+
+
+def _suspect_windows(filepath, info, crop_top_ratio=0.0, progress=None, cancel=None):
+    """Grove scan (keyframes, TRIAGE_FPS, thumbnail) → samengevoegde verdachte vensters in seconden."""
+    detectors = [
+        BlackDetector(split=True),
+        GlitchDetector(crop_top_ratio=crop_top_ratio, sample_fps=TRIAGE_FPS),
+        FreezeSuspectDetector(),
+        RuisDetector(fps_sample=TRIAGE_FPS, coarse_sec=0),
+    ]
+    parts, _ = run_frame_pipeline(filepath, detectors, progress=progress, stage="triage",
+                                  raw=True, info=info, cancel=cancel,
+                                  keyframes_only=TRIAGE_KEYFRAMES)
+    duration = info["duration"]
+    windows = [(max(0.0, start - TRIAGE_MARGIN_SEC), min(duration, end + TRIAGE_MARGIN_SEC))
+               for runs, _ in parts for start, end, _ in runs]
+    return merge_intervals(windows)
+
+
+@metered("video")
+def triage_video_events(filepath, crop_top_ratio=0.0, progress=None, cancel=None):
+    """
+    Twee trappen voor archief-brede sweeps: eerst een goedkope grove scan
+    (_suspect_windows), dan de precieze video-pass alleen op de verdachte
+    vensters (plus TRIAGE_MARGIN_SEC). Schone stukken worden overgeslagen.
+
+    → (events, stats) met stats = {"duration", "scanned_sec", "skipped_fraction", "windows"};
+    binnen collect_metrics() komen scanned_sec/skipped_fraction ook in de metrics-record.
+    Wat de grove scan mist, mist de triage ook; voor een volledige analyse
+    blijft detect_video_events de referentie.
+    """
+    info = probe_video(filepath)
+    fps, duration = info["fps"], info["duration"]
+    print("   ⏳ triage: grove scan…", flush=True)
+    windows = _suspect_windows(filepath, info, crop_top_ratio, progress, cancel)
+
+    def precise_detectors():
+        # black/freeze per bereik (d=0): ook een segment dat bij het venstereinde
+        # nog loopt komt terug, de minimumduur volgt in to_events
+        return [BlackDetector(split=True), GlitchDetector(crop_top_ratio=crop_top_ratio),
+                FreezeDetector(split=True), RuisDetector()]
+
+    detectors = precise_detectors()
+    # vensters in frames; het begin op de ruis-stap, dan vallen de samples als bij een volledige pass
+    step = max(1, int(round(fps / max(0.1, detectors[3].fps_sample)))) if fps > 0 else 1
+    spans = []
+    for start, end in windows:
+        first = int(start * fps) // step * step
+        last = min(info["frames"], int(np.ceil(end * fps)))
+        if spans and first <= spans[-1][0] + spans[-1][1]:
+            # raakt of overlapt (na het afronden) het vorige venster: één stuk,
+            # dan loopt een segment over die grens gewoon door
+            prev_first, prev_n = spans[-1]
+            spans[-1] = (prev_first, max(prev_first + prev_n, last) - prev_first)
+        elif last > first:
+            spans.append((first, last - first))
+    total = sum(n for _, n in spans)
+    runs = {d.name: [] for d in detectors}
+    done = 0
+    for first, n in spans:
+        def window_progress(stage, frames_done, frames_total, base=done):
+            progress("video", base + frames_done, total)
+        detectors = precise_detectors()
+        parts, _ = run_frame_pipeline(filepath, detectors, first_frame=first, max_frames=n,
+                                      raw=True, info=info, cancel=cancel,
+                                      progress=window_progress if progress else None)
+        at_video_end = first + n >= info["frames"]
+        for d, (window_runs, _) in zip(detectors, parts):
+            # open aan het einde van een venster: daar afsluiten (erna is niets
+            # gezien); dat is niet het einde van de video
+            runs[d.name] += [(s, e, o and at_video_end) for s, e, o in window_runs]
+        done += n
+
+    # ruis: de grenzen op het frame, ook als de omslag net vóór een venster ligt
+    events = [ev for d in detectors for ev in d.to_events(d.refine(runs[d.name]))]
+    scanned = total / fps if fps > 0 else duration
+    stats = {
+        "duration": duration,
+        "scanned_sec": scanned,
+        "skipped_fraction": max(0.0, 1.0 - scanned / duration) if duration > 0 else 0.0,
+        "windows": [(first / fps, (first + n) / fps) for first, n in spans],
+    }
+    record = _current_metrics()
+    if record is not None:
+        # in de metrics (CSV en web-resultaat): hoeveel van de tijdlijn precies bekeken is
+        record["scanned_sec"] = round(scanned, 3)
+        record["skipped_fraction"] = round(stats["skipped_fraction"], 4)
+    print(f"   ✅ triage done: {len(spans)} verdachte vensters, "
+          f"{stats['skipped_fraction'] * 100:.0f}% van de tijdlijn overgeslagen", flush=True)
+    return events, stats
+
+
+@metered("black")
+def detect_black_segments(filepath, progress=None, on_event=None, cancel=None):
+    """Alleen blackdetect (los, bv. voor benchmarks). De analyse zelf draait blackdetect
+    en freezedetect samen in de filtergraph van de video-pass (detect_video_events)."""
+    print("   ⏳ blackdetect…", flush=True)
+    results = run_frame_pipeline(filepath, [BlackDetector()], progress=progress, stage="black",
+                                 on_event=on_event, cancel=cancel)
+    print("   ✅ blackdetect done", flush=True)
+    return results
+
+
+@metered("glitch")
+def detect_glitches(filepath, crop_top_ratio=0.0, progress=None,
+                    analysis_height=GLITCH_ANALYSIS_HEIGHT, sample_fps=GLITCH_SAMPLE_FPS):
+    """Eenvoudige kleurafwijkingen: groen/roze/overbelichting (op thumbnail-resolutie)."""
+    detector = GlitchDetector(crop_top_ratio=crop_top_ratio,
+                              analysis_height=analysis_height,
+                              sample_fps=sample_fps)
+    return run_frame_pipeline(filepath, [detector], progress=progress, stage="glitch")
+
+
+@metered("freeze")
+def detect_freezes(filepath, progress=None, on_event=None, cancel=None):
+    """Alleen freezedetect (los); zie detect_black_segments."""
+    print("   ⏳ freezedetect…", flush=True)
+    results = run_frame_pipeline(filepath, [FreezeDetector()], progress=progress, stage="freeze",
+                                 on_event=on_event, cancel=cancel)
     print("   ✅ freezedetect done", flush=True)
     return results
 
 
-def detect_1khz_tone(filepath):
-    print("   ⏳ 1kHz tone detect…", flush=True)
-    results = []
-    extract_cmd = [
-        "ffmpeg", "-y", "-i", filepath, "-vn", "-ac", "1", "-ar", "44100", "-f", "wav", TEMP_AUDIO
-    ]
-    subprocess.run(extract_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+def iter_audio_chunks(filepath, samplerate=TONE_SAMPLE_RATE, chunk_sec=AUDIO_CHUNK_SEC,
+                      cancel=None, timeout=FFMPEG_TIMEOUT_SEC, growing=None):
+    """
+    Mono 16-bit PCM rechtstreeks uit ffmpeg-stdout, in blokken van chunk_sec.
+    Geen tijdelijk WAV-bestand: geheugen blijft begrensd en gelijktijdige
+    analyses zitten elkaar niet in de weg. ``cancel``/``timeout``/``growing``
+    zoals bij run_frame_pipeline.
+    """
+    cmd = (["ffmpeg", "-hide_banner", "-nostats", "-loglevel", "error"]
+           + ffmpeg_input_args("pipe:0" if growing is not None else filepath, keyframes_only=False)
+           + ["-vn", "-sn", "-dn", "-ac", "1", "-ar", str(samplerate), "-f", "s16le", "pipe:1"])
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE if growing is not None else None,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    _track_child(proc)
+    if growing is not None:
+        _start_tail(growing, proc, cancel)
+    watchdog = _Watchdog(proc, cancel, timeout)
+    record = _current_metrics()
+    nbytes = max(2, int(samplerate * chunk_sec) * 2)
+    try:
+        while True:
+            data = proc.stdout.read(nbytes)
+            if not data:
+                break
+            yield np.frombuffer(data[:len(data) // 2 * 2], dtype="<i2")
+        _reap(proc, record)
+        watchdog.close()
+    finally:
+        # ook bij vroegtijdig stoppen (generator.close) ffmpeg opruimen
+        proc.stdout.close()
+        if proc.returncode is None:
+            proc.kill()
+        _reap(proc, record)
+
+
+def _iter_frame_blocks(chunks, frame_len, hop):
+    """
+    Per binnenkomend audioblok alle volledige vensters als één strided view:
+    (start_sample van het eerste venster, frames[n, frame_len]). Geen kopie per venster.
+    """
+    buf = np.empty(0, dtype=np.int16)
+    offset = 0                       # sample-index van buf[0]
+    next_start = 0
+    for chunk in chunks:
+        buf = np.concatenate([buf, chunk]) if buf.size else chunk
+        i0 = next_start - offset
+        avail = buf.size - i0
+        if avail >= frame_len:
+            n = (avail - frame_len) // hop + 1
+            span = buf[i0:i0 + (n - 1) * hop + frame_len]
+            yield next_start, sliding_window_view(span, frame_len)[::hop]
+            next_start += n * hop
+        cut = min(next_start - offset, buf.size)
+        buf = buf[cut:]
+        offset += cut
+
+
+_TONE_BANDS = {}
+
+def _tone_band(frame_len, samplerate):
+    """Hann-venster en bin-maskers, één keer per (frame_len, samplerate) berekend."""
+    key = (frame_len, samplerate, TONE_HZ, HZ_TOLERANCE)
+    if key not in _TONE_BANDS:
+        freqs = rfftfreq(frame_len, 1 / samplerate)
+        band = (freqs >= TONE_HZ - HZ_TOLERANCE) & (freqs <= TONE_HZ + HZ_TOLERANCE)
+        _TONE_BANDS[key] = (np.hanning(frame_len).astype(np.float32), band, freqs > 0)
+    return _TONE_BANDS[key]
+
+def tone_band_scores(frames, samplerate=TONE_SAMPLE_RATE):
+    """
+    Voor alle vensters tegelijk (één rfft over de hele batch):
+    aandeel van de energie in de doelband en RMS-niveau per venster.
+    """
+    window, band, nonzero = _tone_band(frames.shape[1], samplerate)
+    x = frames.astype(np.float32)
+    rms = np.sqrt(np.mean(x * x, axis=1))
+    x *= window
+    spec = rfft(x, axis=1, workers=-1)
+    power = spec.real ** 2 + spec.imag ** 2
+    band_energy = power[:, band].sum(axis=1)
+    total = power[:, nonzero].sum(axis=1)
+    return band_energy / np.maximum(total, 1e-12), rms
 
-    if not os.path.exists(TEMP_AUDIO):
-        print("   ⚠️ no audio extracted", flush=True)
-        return results
 
-    samplerate, data = wavfile.read(TEMP_AUDIO)
-    if data.ndim > 1:
-        data = data[:, 0]
-
-    window_size = int(samplerate * TONE_MIN_DURATION)
-    step = int(window_size / 2)
-
-    for start in tqdm(range(0, len(data) - window_size, step),
-                      desc="   🎚 audio windows",
-                      unit="win",
-                      leave=False):
-        window = data[start:start+window_size]
-        yf = np.abs(rfft(window))
-        xf = rfftfreq(len(window), 1 / samplerate)
-        idx = int(np.argmax(yf))
-        peak_freq = xf[idx]
-        if TONE_HZ - HZ_TOLERANCE <= peak_freq <= TONE_HZ + HZ_TOLERANCE:
-            start_sec = start / samplerate
-            end_sec = (start + window_size) / samplerate
-            results.append({
-                "type": "1KHZ_TONE",
-                "start": to_hms(start_sec),
-                "end": to_hms(end_sec),
-                "duration": round(end_sec - start_sec, 2),
-                "details": "1kHz audio tone"
-            })
-            break
+def tone_flags(band_ratio, rms):
+    """Per audiovenster: genoeg energie rond TONE_HZ en niet stil."""
+    return (np.asarray(band_ratio) >= TONE_BAND_RATIO_MIN) & (np.asarray(rms) >= TONE_MIN_RMS)
 
+
+def _tone_event(segment):
+    start_sec, end_sec, _ = segment
+    return Event("1KHZ_TONE", start_sec, end_sec, "1kHz audio tone")
+
+
+@metered("tone")
+def detect_1khz_tone(filepath, progress=None, on_event=None, cancel=None, growing=None):
+    """
+    Alle 1 kHz-testtonen op de tijdlijn: band-energie per venster van
+    TONE_FRAME_SEC, samengevoegd tot intervallen van minstens TONE_MIN_DURATION.
+    ``on_event`` krijgt elke toon zodra hij afgelopen is; ``growing``: zie
+    run_frame_pipeline (de duur en dus de voortgang zijn dan onbekend).
+    """
+    print("   ⏳ 1kHz tone detect…", flush=True)
+    results = []
+    samplerate = TONE_SAMPLE_RATE
+    frame_len = max(16, int(round(samplerate * TONE_FRAME_SEC)))
+    hop = max(1, frame_len // 2)
+
+    # aantal vensters vooraf schatten voor de voortgang
+    duration = get_video_duration_seconds(filepath) if growing is None else 0.0
+    est_frames = max(0, int((duration * samplerate - frame_len) // hop) + 1)
+    report = make_progress(progress, "tone", est_frames)
+
+    on_close = (lambda seg: on_event(_tone_event(seg))) if on_event is not None else None
+    track = _SegmentTracker(TONE_MIN_DURATION, hold=TONE_GAP_MAX, on_close=on_close)
+    timeline = _current_timeline()
+    prev_flag = False
+    done = 0
+    end_t = 0.0
+    chunks = iter_audio_chunks(filepath, samplerate, cancel=cancel, growing=growing)
     try:
-        os.remove(TEMP_AUDIO)
-    except Exception:
-        pass
+        for first, frames in tqdm(_iter_frame_blocks(chunks, frame_len, hop),
+                                  total=int(duration // AUDIO_CHUNK_SEC) + 1 if duration > 0 else None,
+                                  desc="   🎚 audio",
+                                  unit="blk",
+                                  leave=False):
+            ratio, rms = tone_band_scores(frames, samplerate)
+            flags = tone_flags(ratio, rms)
+            centers = (first + np.arange(flags.size) * hop + frame_len / 2.0) / samplerate
+            if timeline is not None:
+                timeline.add("tone", t=centers, band_ratio=ratio, rms=rms)
+
+            # alleen de overgangen gaan naar de tracker, geen Python-lus per venster
+            changes = np.flatnonzero(np.diff(np.concatenate(([prev_flag], flags)).astype(np.int8)))
+            for i in changes:
+                track.update(bool(flags[i]), float(centers[i]))
+            prev_flag = bool(flags[-1])
+
+            done += flags.size
+            end_t = float(centers[-1]) + frame_len / 2.0 / samplerate
+            report(done)
+    finally:
+        chunks.close()
+
+    if done == 0:
+        print("   ⚠️ no audio extracted", flush=True)
+    if timeline is not None:
+        timeline.set_end("tone", end_t)
+    for segment in track.finish(end_t):
+        results.append(_tone_event(segment))
+    report(done, force=True)
     print("   ✅ 1kHz tone detect done", flush=True)
     return results
 
 
+@metered("ruis")
 def detect_ruis_gray_stripes(filepath,
                              fps_sample=RUIS_FPS_SAMPLE,
                              sat_max=RUIS_SAT_MAX,
                              lap_var_min=RUIS_LAP_VAR_MIN,
                              stripe_std_min=RUIS_STRIPE_STD_MIN,
-                             min_duration=MIN_GLITCH_DURATION):
+                             min_duration=MIN_GLITCH_DURATION,
+                             coarse_sec=RUIS_COARSE_SEC,
+                             progress=None):
     """
     Серый экран с шумом/полосами (VHS-ruis/strepen):
     - Низкая насыщенность (серость)
@@ -322,98 +2290,1231 @@ def detect_ruis_gray_stripes(filepath,
      Grijs scherm met ruis/strepen (VHS-ruis/strepen):
     Lage verzadiging (grijsheid)
     Ruis-/streepvorming op basis van de Laplaciaan of de standaardafwijking per kolom (std)
+    Adaptief met coarse_sec (0 = vast fps_sample), zie RuisDetector.
     """
-    results = []
-    cap = cv2.VideoCapture(filepath)
-    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
-    frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
-    if fps <= 0 or frames <= 0:
-        cap.release()
-        return results
+    return run_frame_pipeline(filepath, [RuisDetector(
+        fps_sample=fps_sample,
+        sat_max=sat_max,
+        lap_var_min=lap_var_min,
+        stripe_std_min=stripe_std_min,
+        min_duration=min_duration,
+        coarse_sec=coarse_sec,
+    )], progress=progress, stage="ruis")
 
-    step = max(1, int(round(fps / max(0.1, fps_sample))))
-    in_ruis = False
-    seg_start_t = 0.0
 
-    def frame_score(img_bgr):
-        # # downscale naar hoogte ~480 voor snelheid
-        h0, w0 = img_bgr.shape[:2]
-        scale = 480.0 / max(1, h0)
-        if scale < 1.0:
-            img_bgr = cv2.resize(img_bgr, (int(w0*scale), int(h0*scale)), interpolation=cv2.INTER_AREA)
-
-        hsv = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2HSV)
-        s_mean = float(hsv[..., 1].mean())
-
-        gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-        lap = cv2.Laplacian(gray, cv2.CV_64F, ksize=3)
-        lap_var = float(lap.var())
-
-        col_mean = gray.mean(axis=0)
-        stripe_std = float(col_mean.std())
-
-        is_gray = s_mean <= sat_max
-        noisy_or_striped = (lap_var >= lap_var_min) or (stripe_std >= stripe_std_min)
-        return is_gray and noisy_or_striped, s_mean, lap_var, stripe_std
-
-    for i in tqdm(range(0, frames, step),
-                  desc=f"   📺 RUIS/STRIPES {os.path.basename(filepath)}",
-                  unit="smp",
-                  leave=False):
-        cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-        ok, frame = cap.read()
-        if not ok:
-            break
-        t = i / fps
-
-        flag, _, _, _ = frame_score(frame)
-
-        if flag and not in_ruis:
-            in_ruis = True
-            seg_start_t = t
-        elif not flag and in_ruis:
-            dur = t - seg_start_t
-            if dur >= min_duration:
-                results.append({
-                    "type": "RUIS/STRIPES",
-                    "start": to_hms(seg_start_t),
-                    "end": to_hms(t),
-                    "duration": dur,
-                    "details": f"gray+noisy/striped (S≤{sat_max}, lapVar≥{lap_var_min} or stripeSTD≥{stripe_std_min})"
-                })
-            in_ruis = False
-
-# als het segment tot het einde doorloopt
-    if in_ruis:
-        t = frames / fps
-        dur = t - seg_start_t
-        if dur >= min_duration:
-            results.append({
-                "type": "RUIS/STRIPES",
-                "start": to_hms(seg_start_t),
-                "end": to_hms(t),
-                "duration": dur,
-                "details": "gray+noisy/striped (end)"
-            })
+# =======================
+#  KENMERKEN-TIJDLIJN
+# =======================
+# Met --features legt de analyse per video de kenmerken van elk beoordeeld
+# sample vast (FEATURE_DIR/<video>.features/). --reevaluate past daarna
+# andere drempels toe op die tijdlijn, zonder de video te openen.
+# GLITCH, RUIS/STRIPES en 1KHZ_TONE komen dan precies zo uit als bij een
+# volledige analyse met dezelfde drempels. BLACK en FREEZE komen in de
+# analyse uit ffmpeg (blackdetect/freezedetect, geen waarden per frame) en
+# worden hier benaderd met het aandeel zwarte pixels en het frameverschil
+# op de glitch-frames.
+
+# soort → kolommen (t in seconden; de rest per sample)
+FEATURE_COLUMNS = {
+    "glitch": ("t", "b", "g", "r", "black", "diff"),
+    "ruis": ("t", "sat", "lap_var", "stripe_std"),
+    "tone": ("t", "band_ratio", "rms"),
+}
+
+# instellingen die --reevaluate kan overschrijven (--set NAAM=WAARDE)
+REEVALUATE_SETTINGS = (
+    "RUIS_SAT_MAX", "RUIS_LAP_VAR_MIN", "RUIS_STRIPE_STD_MIN", "MIN_GLITCH_DURATION",
+    "GLITCH_GREEN_MIN", "GLITCH_PINK_MIN", "GLITCH_PINK_GREEN_MAX", "GLITCH_OVERSAT_MIN", "GLITCH_HOLD_SEC",
+    "BLACKDETECT_PIC_TH", "BLACKDETECT_MIN_DURATION", "FREEZE_NOISE", "FREEZE_MIN_DURATION",
+    "TONE_BAND_RATIO_MIN", "TONE_MIN_RMS", "TONE_MIN_DURATION", "TONE_GAP_MAX",
+)
+
+# blackdetect/freezedetect zien elk frame op volle resolutie; de tijdlijn heeft
+# alleen de glitch-thumbnails. Hun events uit de analyse (meta "filter_events")
+# blijven bij --reevaluate staan, tenzij een van hun eigen drempels overschreven is.
+FILTER_EVENT_SETTINGS = {
+    "BLACK": ("BLACKDETECT_PIC_TH", "BLACKDETECT_MIN_DURATION"),
+    "FREEZE": ("FREEZE_NOISE", "FREEZE_MIN_DURATION"),
+}
+
+_FEATURES = threading.local()
+
+
+class FeatureTimeline:
+    """
+    Kenmerken per sample van één video, in kolommen per soort (FEATURE_COLUMNS):
+    'glitch' voor elk beoordeeld glitch-frame, 'ruis' voor elk ruis-sample en
+    'tone' voor elk audiovenster. ``end_t`` per soort is het einde van de pass
+    (voor segmenten die tot het einde doorlopen), ``meta`` de video en de
+    sampling-instellingen bij het vastleggen.
+    """
 
-    cap.release()
-    return results
+    def __init__(self, meta=None):
+        self.meta = dict(meta or {})
+        self.end_t = {}
+        self._chunks = {kind: [] for kind in FEATURE_COLUMNS}
+
+    def add(self, kind, **columns):
+        # altijd kopiëren: de batch-buffers worden hergebruikt
+        self._chunks[kind].append({name: np.array(columns[name], np.float64 if name == "t" else np.float32)
+                                   for name in FEATURE_COLUMNS[kind]})
+
+    def set_end(self, kind, end_t):
+        self.end_t[kind] = max(float(end_t), self.end_t.get(kind, 0.0))
+
+    def merge(self, other):
+        """Tijdlijn van een ander tijdsbereik erbij (zie detect_video_events_parallel)."""
+        for kind, chunks in other._chunks.items():
+            self._chunks[kind] += chunks
+        for kind, end_t in other.end_t.items():
+            self.set_end(kind, end_t)
+        for key, value in other.meta.items():
+            self.meta.setdefault(key, value)
+
+    def columns(self, kind):
+        """Alle samples van één soort op tijd gesorteerd → {kolom: array}, of None."""
+        chunks = self._chunks.get(kind)
+        if not chunks:
+            return None
+        if len(chunks) == 1:
+            return dict(chunks[0])       # geladen tijdlijn: de memory-mapped arrays zelf, geen kopie
+        cols = {name: np.concatenate([c[name] for c in chunks]) for name in FEATURE_COLUMNS[kind]}
+        if len(chunks) > 1:
+            order = np.argsort(cols["t"], kind="stable")
+            cols = {name: values[order] for name, values in cols.items()}
+        return cols
+
+    def save(self, path):
+        """Als map: meta.json plus één .npy per kolom (``<soort>.<kolom>.npy``)."""
+        meta = dict(self.meta, end_t=self.end_t, version=FEATURE_TIMELINE_VERSION)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        old = f"{path}.{os.getpid()}.old"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for kind in FEATURE_COLUMNS:
+            cols = self.columns(kind)
+            if cols is None or not len(cols["t"]):
+                continue
+            for name, values in cols.items():
+                np.save(os.path.join(tmp, f"{kind}.{name}.npy"), np.ascontiguousarray(values))
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as fh:
+            json.dump(meta, fh)
+        # nooit een half geschreven tijdlijn; open memmaps van de oude blijven geldig
+        if os.path.isdir(path):
+            os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Tijdlijn-map terug. ``mmap``: de kolommen als memory-mapped arrays —
+        het besturingssysteem leest alleen de pagina's die echt gebruikt worden.
+        """
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta.get("version") != FEATURE_TIMELINE_VERSION:
+            raise ValueError(f"{path}: tijdlijn-versie {meta.get('version')}, "
+                             f"verwacht {FEATURE_TIMELINE_VERSION}")
+        timeline = cls(meta)
+        timeline.end_t = timeline.meta.pop("end_t", {})
+        for kind, names in FEATURE_COLUMNS.items():
+            if os.path.exists(os.path.join(path, f"{kind}.t.npy")):
+                timeline._chunks[kind].append({
+                    name: np.load(os.path.join(path, f"{kind}.{name}.npy"), mmap_mode="r" if mmap else None)
+                    for name in names})
+        return timeline
+
+    def sample_count(self) -> int:
+        return sum(len(c["t"]) for chunks in self._chunks.values() for c in chunks)
+
+
+def _current_timeline():
+    """Lopende kenmerken-tijdlijn van deze thread (of None)."""
+    return getattr(_FEATURES, "timeline", None)
+
+@contextmanager
+def collect_features(meta=None):
+    """``with collect_features() as timeline:`` → de detectors leggen hun kenmerken vast."""
+    previous = _current_timeline()
+    _FEATURES.timeline = timeline = FeatureTimeline(meta)
+    try:
+        yield timeline
+    finally:
+        _FEATURES.timeline = previous
+
+def feature_path(filepath, folder=None) -> str:
+    return os.path.join(folder or FEATURE_DIR, os.path.basename(filepath) + ".features")
+
+
+def _replay(times, flags, tracker, end_t):
+    """Alleen de overgangen naar de tracker (zoals detect_1khz_tone) → segmenten."""
+    flags = np.asarray(flags, dtype=bool)
+    changes = np.flatnonzero(np.diff(np.concatenate(([False], flags)).astype(np.int8)))
+    for i in changes:
+        tracker.update(bool(flags[i]), float(times[i]))
+    return tracker.finish(end_t)
+
+
+def reevaluate_timeline(timeline, overrides=()):
+    """
+    Events uit een opgeslagen tijdlijn met de huidige drempels (RUIS_*,
+    GLITCH_*, BLACKDETECT_PIC_TH, FREEZE_*, TONE_*, minimale duren).
+    Zelfde volgorde als analyze_file: zwart, glitch, freeze, ruis, toon.
+    Zwart en freeze komen uit de analyse zelf, behalve als een van hun
+    drempels in ``overrides`` (de namen uit --set) staat; zie FILTER_EVENT_SETTINGS.
+    """
+    info = {"fps": timeline.meta.get("fps") or 0.0}
+    black, glitch, freeze, ruis, tone = [], [], [], [], []
+    stored = timeline.meta.get("filter_events")
+    keep = {kind for kind, names in FILTER_EVENT_SETTINGS.items()
+            if stored is not None and not set(names) & set(overrides)}
+
+    cols = timeline.columns("glitch")
+    if cols is not None:
+        end_t = timeline.end_t.get("glitch", float(cols["t"][-1]))
+        means = np.stack([cols["b"], cols["g"], cols["r"]], axis=1)
+        det = GlitchDetector()
+        det.info = info
+        glitch = det.to_events(_replay(cols["t"], glitch_flags(means),
+                                       _SegmentTracker(0.0, hold=GLITCH_HOLD_SEC), end_t))
+
+        det = BlackDetector()
+        det.info = info
+        black = det.to_events(_replay(cols["t"], cols["black"] >= BLACKDETECT_PIC_TH, _SegmentTracker(0.0), end_t))
+
+        # bevroren vanaf het vorige frame (zie freeze_flags). Geen vorig frame (begin van een bereik): de toestand loopt door.
+        diff = cols["diff"].astype(np.float64)
+        same = freeze_flags(diff)
+        for i in np.flatnonzero(np.isnan(diff)):
+            same[i] = same[i - 1] if i > 0 else False
+        times = np.where(same, np.concatenate((cols["t"][:1], cols["t"][:-1])), cols["t"])
+        det = FreezeDetector()
+        det.info = info
+        freeze = det.to_events(_replay(times, same, _SegmentTracker(FREEZE_MIN_DURATION), end_t))
+
+    if keep:
+        fps = info["fps"]
+        filtered = [Event(e["type"], e["start"], e["end"], e["details"], fps)
+                    for e in stored if e["type"] in keep]
+        if "BLACK" in keep:
+            black = [e for e in filtered if e.type == "BLACK"]
+        if "FREEZE" in keep:
+            freeze = [e for e in filtered if e.type == "FREEZE"]
+
+    cols = timeline.columns("ruis")
+    if cols is not None:
+        end_t = timeline.end_t.get("ruis", float(cols["t"][-1]))
+        det = RuisDetector(sat_max=RUIS_SAT_MAX, lap_var_min=RUIS_LAP_VAR_MIN,
+                           stripe_std_min=RUIS_STRIPE_STD_MIN, min_duration=MIN_GLITCH_DURATION)
+        det.info = info
+        flags = ruis_flags(cols["sat"], cols["lap_var"], cols["stripe_std"])
+        ruis = det.to_events(_replay(cols["t"], flags, _SegmentTracker(0.0), end_t))
+
+    cols = timeline.columns("tone")
+    if cols is not None:
+        end_t = timeline.end_t.get("tone", float(cols["t"][-1]))
+        track = _SegmentTracker(TONE_MIN_DURATION, hold=TONE_GAP_MAX)
+        tone = [_tone_event(seg) for seg in _replay(cols["t"], tone_flags(cols["band_ratio"], cols["rms"]),
+                                                     track, end_t)]
+    return black + glitch + freeze + ruis + tone
+
+
+# =======================
+#   KENMERKEN-OPSLAG
+# =======================
+# Het archief van tijdlijnen als één doorzoekbare opslag: FEATURE_DIR met per
+# video een tijdlijn-map (.npy-kolommen, memory-mapped te lezen) en een
+# SQLite-index (FEATURE_INDEX) met de video's en hun events. Vragen als
+# "welke banden hebben meer dan 5% ruis" of "alle bevroren stukken langer dan
+# 30 s" gaan alleen over de index; vragen over de kenmerken zelf (scan) lezen
+# de kolommen per video via mmap, dus nooit het hele archief in het geheugen.
+# De events in de index zijn die van de laatste analyse of --reevaluate.
+
+_FEATURE_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    filename TEXT NOT NULL UNIQUE,
+    timeline TEXT NOT NULL,
+    video_duration REAL,
+    samples INTEGER,
+    indexed_at TEXT NOT NULL,
+    settings TEXT
+);
+CREATE TABLE IF NOT EXISTS events (
+    video_id INTEGER NOT NULL REFERENCES videos (id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    start REAL NOT NULL,
+    "end" REAL NOT NULL,
+    duration REAL NOT NULL,
+    details TEXT,
+    start_frame INTEGER,
+    end_frame INTEGER,
+    PRIMARY KEY (video_id, seq)
+);
+CREATE INDEX IF NOT EXISTS events_type_duration ON events (type, duration);
+"""
+
+_FEATURE_EVENT_FIELDS = ("type", "start", "end", "duration", "details", "start_frame", "end_frame")
+
+
+class FeatureStore:
+    """
+    Tijdlijnen + SQLite-index in ``folder`` (standaard FEATURE_DIR).
+
+    Net als ResultStore opent elke aanroep een eigen verbinding (WAL), zodat
+    de worker-processen van een batch tegelijk kunnen indexeren.
+    """
+
+    def __init__(self, folder=FEATURE_DIR):
+        self.folder = folder
+        self.path = os.path.join(folder, FEATURE_INDEX)
+        os.makedirs(folder, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_FEATURE_INDEX_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA foreign_keys=ON")
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    # ---- schrijven ----
+
+    def add(self, timeline, events) -> int:
+        """Tijdlijn opslaan en met zijn events indexeren → video-id."""
+        filename = timeline.meta["filename"]
+        timeline.save(feature_path(filename, self.folder))
+        return self._index(timeline, events)
+
+    def _index(self, timeline, events) -> int:
+        filename = timeline.meta["filename"]
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO videos (filename, timeline, video_duration, samples, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (filename) DO UPDATE SET timeline = excluded.timeline, "
+                "video_duration = excluded.video_duration, samples = excluded.samples, "
+                "indexed_at = excluded.indexed_at",
+                (filename, os.path.basename(feature_path(filename)), timeline.meta.get("video_duration"),
+                 timeline.sample_count(), time.strftime("%Y-%m-%dT%H:%M:%S")))
+            video_id = db.execute("SELECT id FROM videos WHERE filename = ?", (filename,)).fetchone()[0]
+            self._replace_events(db, video_id, events)
+        return video_id
+
+    @staticmethod
+    def _replace_events(db, video_id, events):
+        db.execute("DELETE FROM events WHERE video_id = ?", (video_id,))
+        db.executemany(
+            'INSERT INTO events (video_id, seq, type, start, "end", duration, details, start_frame, end_frame) '
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(video_id, i, *(e.to_json()[k] for k in _FEATURE_EVENT_FIELDS)) for i, e in enumerate(events)])
+        db.execute("UPDATE videos SET settings = ? WHERE id = ?", (json.dumps(detector_settings()), video_id))
+
+    def set_events(self, filename, events):
+        """Events van één video vervangen (na --reevaluate met andere drempels)."""
+        with self._connect() as db:
+            row = db.execute("SELECT id FROM videos WHERE filename = ?", (filename,)).fetchone()
+            if row is None:
+                raise KeyError(filename)
+            self._replace_events(db, row[0], events)
+
+    def reindex(self):
+        """Index gelijktrekken met de map: nieuwe tijdlijnen opnemen (events met
+        de huidige drempels), verdwenen weghalen."""
+        known = {row["timeline"] for row in self.videos()}
+        for name in sorted(os.listdir(self.folder), key=natural_sort_key):
+            path = os.path.join(self.folder, name)
+            if name.endswith(".features") and name not in known:
+                try:
+                    timeline = FeatureTimeline.load(path)
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"❌ {name}: {e}", flush=True)
+                    continue
+                timeline.meta.setdefault("filename", name[:-len(".features")])
+                self._index(timeline, reevaluate_timeline(timeline))
+        with self._connect() as db:
+            for row in db.execute("SELECT id, timeline FROM videos").fetchall():
+                if not os.path.isdir(os.path.join(self.folder, row["timeline"])):
+                    db.execute("DELETE FROM videos WHERE id = ?", (row["id"],))
+
+    # ---- lezen ----
+
+    def videos(self):
+        """Alle geïndexeerde video's (natuurlijk gesorteerd), met aantal events."""
+        with self._connect() as db:
+            rows = [dict(r) for r in db.execute(
+                "SELECT v.*, COUNT(e.seq) AS events FROM videos v "
+                "LEFT JOIN events e ON e.video_id = v.id GROUP BY v.id")]
+        return sorted(rows, key=lambda r: natural_sort_key(r["filename"]))
+
+    def timeline(self, filename, mmap=True):
+        """De tijdlijn van één video (standaard memory-mapped)."""
+        return FeatureTimeline.load(feature_path(filename, self.folder), mmap=mmap)
+
+    def events(self, event_type=None, min_duration=0.0, filename=None):
+        """Events uit de index, bv. ``events("FREEZE", 30)`` → alle freezes van meer dan 30 s."""
+        clauses, args = ["e.duration >= ?"], [float(min_duration)]
+        for column, value in (("e.type", event_type), ("v.filename", filename)):
+            if value:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        with self._connect() as db:
+            rows = [dict(r) for r in db.execute(
+                "SELECT v.filename, " + ", ".join(f'e."{k}"' for k in _FEATURE_EVENT_FIELDS)
+                + " FROM events e JOIN videos v ON v.id = e.video_id WHERE " + " AND ".join(clauses)
+                + " ORDER BY v.filename, e.start", args)]
+        return sorted(rows, key=lambda r: natural_sort_key(r["filename"]))
+
+    def coverage(self, event_type=None, min_percent=0.0):
+        """
+        Per video het deel van de band met events van ``event_type`` (zonder
+        type: alle types, overlap één keer geteld, zoals damage_percent) →
+        [{filename, video_duration, events, seconds, percent}] met percent ≥ ``min_percent``.
+        """
+        with self._connect() as db:
+            videos = db.execute("SELECT id, filename, video_duration FROM videos").fetchall()
+            out = []
+            for v in videos:
+                where, args = "video_id = ?", [v["id"]]
+                if event_type:
+                    where += " AND type = ?"
+                    args.append(event_type)
+                spans = db.execute(f'SELECT start, "end" FROM events WHERE {where}', args).fetchall()
+                seconds = sum(e - s for s, e in merge_intervals([tuple(r) for r in spans]))
+                duration = v["video_duration"] or 0.0
+                percent = seconds / duration * 100.0 if duration > 0 else 0.0
+                if percent >= min_percent:
+                    out.append({"filename": v["filename"], "video_duration": duration, "events": len(spans),
+                                "seconds": seconds, "percent": percent})
+        return sorted(out, key=lambda r: natural_sort_key(r["filename"]))
+
+    def scan(self, kind, column, min_value=None, max_value=None):
+        """
+        Per video hoeveel samples van kenmerk ``kind.column`` binnen
+        [min_value, max_value] vallen, en hoeveel seconden dat beslaat (elk
+        sample telt tot het volgende). Leest één video tegelijk via mmap.
+        """
+        if column not in FEATURE_COLUMNS.get(kind, ()):
+            raise KeyError(f"{kind}.{column}")
+        out = []
+        for v in self.videos():
+            try:
+                timeline = self.timeline(v["filename"])
+            except (OSError, ValueError) as e:
+                print(f"❌ {v['filename']}: {e}", flush=True)
+                continue
+            cols = timeline.columns(kind)
+            if cols is None:
+                continue
+            t, values = cols["t"], cols[column]
+            mask = np.ones(len(t), dtype=bool)
+            if min_value is not None:
+                mask &= values >= min_value
+            if max_value is not None:
+                mask &= values <= max_value
+            spans = np.diff(t, append=max(timeline.end_t.get(kind, 0.0), float(t[-1])))
+            out.append({"filename": v["filename"], "samples": len(t), "matches": int(mask.sum()),
+                        "seconds": float(spans[mask].sum()),
+                        "percent": float(mask.mean() * 100.0) if len(t) else 0.0})
+        return out
+
+
+# =======================
+#     RESULT CACHE
+# =======================
+HASH_CHUNK = 1024 * 1024
+
+def file_sha256(filepath: str) -> str:
+    """Inhoud-hash van een bestand (in blokken, dus ook voor tapes van vele GB)."""
+    h = hashlib.sha256()
+    with open(filepath, "rb") as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def detector_settings() -> dict:
+    """Huidige waarden van DETECTOR_SETTINGS (ook als ze runtime aangepast zijn)."""
+    g = globals()
+    return {name: g[name] for name in DETECTOR_SETTINGS}
+
+def settings_fingerprint() -> str:
+    blob = json.dumps(detector_settings(), sort_keys=True)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+def result_cache_key(content_hash: str) -> str:
+    return f"{content_hash}-{settings_fingerprint()}"
+
+
+class ResultCache:
+    """
+    Persistente resultaten-cache op schijf, één JSON-bestand per sleutel.
+
+    LRU op basis van mtime: een hit 'raakt' het bestand aan, en na elke put
+    worden de oudste bestanden verwijderd tot de map onder max_bytes zit.
+    Schrijven gaat via een tijdelijk bestand + os.replace, dus meerdere
+    threads/processen kunnen dezelfde map delen.
+    """
+
+    def __init__(self, folder=RESULT_CACHE_DIR, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.folder, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as fh:
+                value = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value):
+        os.makedirs(self.folder, exist_ok=True)
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(value, fh)
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self):
+        with self._lock:
+            entries = []
+            try:
+                with os.scandir(self.folder) as it:
+                    for entry in it:
+                        if entry.name.endswith(".json"):
+                            st = entry.stat()
+                            entries.append((st.st_mtime, st.st_size, entry.path))
+            except OSError:
+                return
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+
+# =======================
+#     RESULT STORE
+# =======================
+# Server-side geschiedenis van de web-app. Anders dan de cache (sleutel:
+# inhoud + instellingen, LRU) bewaart dit élke analyse: per upload één rij in
+# ``analyses`` met de samenvatting, de events in ``events``. Geïndexeerd op
+# bestandsnaam, hash, job en datum; lezen gaat per pagina.
+
+_STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT,
+    filename TEXT NOT NULL,
+    content_hash TEXT,
+    created_at TEXT NOT NULL,
+    uploaded_at TEXT,
+    video_duration REAL,
+    video_hms TEXT,
+    total_sec INTEGER,
+    total_hms TEXT,
+    covered_sec INTEGER,
+    covered_hms TEXT,
+    damage_percent REAL,
+    errors_count INTEGER,
+    cached INTEGER NOT NULL DEFAULT 0,
+    metrics TEXT
+);
+CREATE INDEX IF NOT EXISTS analyses_filename ON analyses (filename);
+CREATE INDEX IF NOT EXISTS analyses_hash ON analyses (content_hash);
+CREATE INDEX IF NOT EXISTS analyses_job ON analyses (job_id);
+CREATE INDEX IF NOT EXISTS analyses_created ON analyses (created_at);
+CREATE TABLE IF NOT EXISTS events (
+    analysis_id INTEGER NOT NULL REFERENCES analyses (id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    start REAL NOT NULL,
+    "end" REAL NOT NULL,
+    duration REAL NOT NULL,
+    details TEXT,
+    start_frame INTEGER,
+    end_frame INTEGER,
+    PRIMARY KEY (analysis_id, seq)
+);
+"""
+
+_EVENT_FIELDS = ("type", "start", "end", "duration", "details", "start_frame", "end_frame")
+
+_SUMMARY_FIELDS = ("video_duration", "video_hms", "total_sec", "total_hms", "covered_sec",
+                   "covered_hms", "damage_percent", "errors_count")
+
+
+class ResultStore:
+    """
+    Analyses + events in één SQLite-bestand.
+
+    Elke aanroep opent een eigen verbinding (WAL), dus job-threads en
+    request-threads kunnen tegelijk schrijven en lezen.
+    """
+
+    def __init__(self, path=RESULT_DB):
+        self.path = path
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_STORE_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA foreign_keys=ON")
+        try:
+            with db:                      # commit, of rollback bij een fout
+                yield db
+        finally:
+            db.close()
+
+    def save(self, result, filename, job_id=None, content_hash=None) -> int:
+        """Eén analyse (dict zoals analyze_one die geeft) → id."""
+        with self._connect() as db:
+            cur = db.execute(
+                "INSERT INTO analyses (job_id, filename, content_hash, created_at, uploaded_at, "
+                + ", ".join(_SUMMARY_FIELDS) + ", cached, metrics) VALUES ("
+                + ", ".join("?" * (7 + len(_SUMMARY_FIELDS))) + ")",
+                (job_id, filename, content_hash, time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 result.get("uploaded_at"), *(result.get(k) for k in _SUMMARY_FIELDS),
+                 int(bool(result.get("cached"))), json.dumps(result.get("metrics", []))))
+            analysis_id = cur.lastrowid
+            db.executemany(
+                'INSERT INTO events (analysis_id, seq, type, start, "end", duration, details, '
+                "start_frame, end_frame) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(analysis_id, i, *(e.get(k) for k in _EVENT_FIELDS))
+                 for i, e in enumerate(result.get("events", []))])
+        return analysis_id
+
+    @staticmethod
+    def _where(job_id=None, filename=None, content_hash=None):
+        clauses, args = [], []
+        for column, value in (("job_id", job_id), ("filename", filename), ("content_hash", content_hash)):
+            if value:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), args
+
+    def page(self, page=1, per_page=10, job_id=None, filename=None, content_hash=None):
+        """Eén pagina analyses (nieuwste eerst) met hun events → (items, total)."""
+        where, args = self._where(job_id, filename, content_hash)
+        page = max(1, int(page))
+        with self._connect() as db:
+            total = db.execute("SELECT COUNT(*) FROM analyses" + where, args).fetchone()[0]
+            rows = db.execute("SELECT * FROM analyses" + where + " ORDER BY id DESC LIMIT ? OFFSET ?",
+                              args + [per_page, (page - 1) * per_page]).fetchall()
+            items = [self._item(db, row) for row in rows]
+        return items, total
+
+    def get(self, analysis_id):
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM analyses WHERE id = ?", (analysis_id,)).fetchone()
+            return self._item(db, row) if row is not None else None
+
+    @staticmethod
+    def _item(db, row):
+        item = dict(row)
+        item["cached"] = bool(item["cached"])
+        item["metrics"] = json.loads(item["metrics"] or "[]")
+        item["events"] = [dict(e) for e in db.execute(
+            "SELECT " + ", ".join(f'"{k}"' for k in _EVENT_FIELDS)
+            + " FROM events WHERE analysis_id = ? ORDER BY seq",
+            (item["id"],))]
+        return item
+
+    def delete(self, analysis_id) -> bool:
+        with self._connect() as db:
+            return db.execute("DELETE FROM analyses WHERE id = ?", (analysis_id,)).rowcount > 0
 
 
 # =======================
 #     MAIN PIPELINE
 # =======================
-def main():
-    # Laten we de csv voorbereiden
+def analyze_file(filepath, progress=None, range_workers=1, triage=False, features=False):
+    """Alle detectors op één video → (video_duration, all_results, metrics).
+
+    ``range_workers`` > 1 verdeelt de video-pass over zoveel processen
+    (zie detect_video_events_parallel); ``triage`` draait de precieze
+    video-pass alleen rond verdachte stukken (zie triage_video_events).
+    ``metrics``: één dict per detector-aanroep (zie metered); met triage
+    draagt de video-stage ook scanned_sec en skipped_fraction.
+    ``features``: de kenmerken-tijdlijn met de events opslaan in FEATURE_DIR
+    (zie FeatureTimeline en FeatureStore).
+    """
+    if features and triage:
+        raise ValueError("een kenmerken-tijdlijn kan niet met triage (die slaat stukken over)")
+    video_duration = get_video_duration_seconds(filepath)
+    meta = {
+        "filename": os.path.basename(filepath),
+        "video_duration": video_duration,
+        "settings": {name: globals()[name] for name in (
+            "GLITCH_ANALYSIS_HEIGHT", "GLITCH_SAMPLE_FPS", "RUIS_FPS_SAMPLE", "BLACKDETECT_PIX_TH",
+            "TONE_HZ", "HZ_TOLERANCE", "TONE_SAMPLE_RATE", "TONE_FRAME_SEC", "DECODE_SCALER")},
+    }
+
+    all_results = []
+    with collect_metrics() as metrics, (collect_features(meta) if features else nullcontext()) as timeline:
+        if triage:
+            events, stats = triage_video_events(filepath, progress=progress)
+            all_results += events
+            print(f"   ℹ️ triage: {stats['scanned_sec']:.0f}s van {stats['duration']:.0f}s bekeken "
+                  f"({len(stats['windows'])} vensters)", flush=True)
+        elif range_workers != 1:
+            all_results += detect_video_events_parallel(filepath, progress=progress, workers=range_workers)
+        else:
+            all_results += detect_video_events(filepath, progress=progress)   # zwart, kleurglitches, freezes, ruis/strepen
+        all_results += detect_1khz_tone(filepath, progress=progress)      # 1 kHz
+    if timeline is not None:
+        timeline.meta["filter_events"] = [e.to_json() for e in all_results if e.type in FILTER_EVENT_SETTINGS]
+        FeatureStore(FEATURE_DIR).add(timeline, all_results)
+    return video_duration, all_results, metrics
+
+
+def analyze_growing_file(growing, progress=None, on_event=None, cancel=None):
+    """
+    Als analyze_file, maar op een upload die nog binnenkomt (zie GrowingFile):
+    de video-pass en de toondetectie lezen elk de staart van het bestand, dus
+    ze lopen gelijk op met de upload. Klaar zodra de upload klaar is en beide
+    passes de rest verwerkt hebben. Een afgebroken upload → RuntimeError.
+    """
+    all_results = []
+    tone = {}
+    sink = getattr(_METRICS, "sink", None)
+
+    def tone_pass():
+        # zelfde meting als de aanroeper, vanuit deze thread
+        _METRICS.sink = sink
+        try:
+            tone["results"] = detect_1khz_tone(growing.path, progress=progress, on_event=on_event,
+                                               cancel=cancel, growing=growing)
+        except BaseException as e:
+            tone["error"] = e
+
+    with collect_metrics() as metrics:
+        sink = metrics
+        thread = threading.Thread(target=tone_pass, daemon=True)
+        thread.start()
+        try:
+            all_results += detect_video_events(growing.path, progress=progress, on_event=on_event,
+                                               cancel=cancel, growing=growing)
+        finally:
+            thread.join()
+    if "error" in tone:
+        raise tone["error"]
+    if growing.failed:
+        raise RuntimeError(f"upload van {growing.name} afgebroken")
+    all_results += tone["results"]
+    return get_video_duration_seconds(growing.path), all_results, metrics
+
+
+def _analyze_file_safe(filepath, range_workers=1, triage=False, features=False):
+    """Voor de process pool: een fout in één video mag de batch niet stoppen."""
+    try:
+        return analyze_file(filepath, range_workers=range_workers, triage=triage, features=features), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _iter_batch_results(filepaths, workers, triage=False, features=False):
+    """
+    Levert (index, result, error) op zodra een video klaar is.
+
+    Crasht een worker-proces (bv. segfault in OpenCV), dan is de hele pool
+    kapot: de getroffen video's worden daarna één voor één in een eigen
+    proces opnieuw geprobeerd, zodat alleen de echte boosdoener faalt.
+    """
+    broken = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_analyze_file_safe, fp, 1, triage, features): i for i, fp in enumerate(filepaths)}
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                res, err = fut.result()
+            except BrokenProcessPool:
+                broken.append(i)
+                continue
+            except Exception as e:
+                res, err = None, f"{type(e).__name__}: {e}"
+            yield i, res, err
+
+    for i in broken:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            try:
+                res, err = pool.submit(_analyze_file_safe, filepaths[i], 1, triage, features).result()
+            except BrokenProcessPool:
+                res, err = None, "worker process crashed"
+        yield i, res, err
+
+
+EVENTS_CSV_HEADER = ['video_file', 'type', 'start_time', 'end_time', 'duration_sec', 'details']
+SUMMARY_CSV_HEADER = ['video_file', 'video_duration_sec', 'video_duration_mmss',
+                      'errors_count', 'errors_total_sec', 'errors_total_mmss', 'damage_percent']
+# sidecar: waar de tijd per video heen gaat (frame_detector_sec = Python-tijd per frame-detector;
+# scanned_sec/skipped_fraction alleen bij --triage, anders leeg)
+METRICS_CSV_HEADER = ['video_file', 'stage', 'wall_sec', 'cpu_sec', 'frames', 'bytes_read',
+                      'peak_rss_mb', 'frame_detector_sec', 'scanned_sec', 'skipped_fraction']
+
+
+def format_frame_sec(frame_sec) -> str:
+    """{'glitch': 1.2, 'ruis': 0.4} → 'glitch=1.200;ruis=0.400' (voor CSV)."""
+    return ";".join(f"{name}={sec:.3f}" for name, sec in sorted(frame_sec.items()))
+
+
+def _write_metrics_rows(metrics_writer, filename, metrics):
+    for m in metrics:
+        metrics_writer.writerow([
+            filename, m["stage"], m["wall_sec"], m["cpu_sec"], m["frames"],
+            m["bytes_read"], m["peak_rss_mb"], format_frame_sec(m["frame_sec"]),
+            m.get("scanned_sec", ""), m.get("skipped_fraction", "")
+        ])
+
+
+def _write_video_rows(events_writer, summary_writer, filename, video_duration, all_results):
+    print(f"▶️ Verwerken: {filename}")
+    if all_results:
+        print(f"📄 Resultaten: {len(all_results)} fouten gevonden")
+
+        total_defect_sec = 0.0
+        for r in all_results:
+            total_defect_sec += r.duration
+            start_hms, end_hms = to_hms(r.start), to_hms(r.end)
+            print(f"🧾 {r.type} → {start_hms} → {end_hms} ({r.duration:.2f} sec)")
+            events_writer.writerow([
+                filename, r.type, start_hms, end_hms,
+                round(r.duration, 2), r.details
+            ])
+
+        # Formaten voor CSV (mm:ss) 
+        total_mmss = seconds_to_mmss(total_defect_sec)
+        dur_mmss = seconds_to_mmss(video_duration) if video_duration > 0 else "00:00"
+
+        # Nieuwe formaten voor afdrukken (hh:mm:ss)
+
+        total_hms = to_hms(total_defect_sec)
+        video_hms = to_hms(video_duration) if video_duration > 0 else "00:00:00"
+
+        # ===  BELANGRIJK: we berekenen de dekking van de tijdlijn (samengevoegde intervallen) ===
+        intervals = [(r.start, r.end) for r in all_results]
+        merged = merge_intervals(intervals)
+        covered_sec = sum(e - s for s, e in merged)
+
+        damage_percent = (covered_sec / video_duration * 100.0) if video_duration > 0 else 0.0
+
+        # Eindregel: som van de duur + % volgens dekking
+        print(
+            f"📊 Totaal: {len(all_results)} fouten, totaalduur {total_hms} "
+            f"(= {int(round(total_defect_sec))} sec) — Video {video_hms}; "
+            f"Beschadiging: {damage_percent:.2f}%"
+        )
+
+        # CSV-samenvatting zonder de structuur te wijzigen
+        summary_writer.writerow([
+            filename,
+            round(video_duration, 2),
+            dur_mmss,
+            len(all_results),
+            round(total_defect_sec, 2),
+            total_mmss,
+            round(damage_percent, 2)
+        ])
+    else:
+        print("📄 Geen fouten gevonden.")
+        dur_mmss = seconds_to_mmss(video_duration) if video_duration > 0 else "00:00"
+        summary_writer.writerow([
+            filename,
+            round(video_duration, 2),
+            dur_mmss,
+            0, 0.0, "00:00", 0.0
+        ])
+
+
+# =======================
+#      HOT FOLDER
+# =======================
+# Langlopende modus (--watch): de capture-stations zetten de hele dag
+# bestanden in VIDEO_FOLDER. Nieuwe bestanden gaan, zodra ze niet meer
+# groeien, naar een process pool; de resultaten worden achteraan de CSV's
+# bijgeschreven en in een ledger vastgelegd, zodat een herstart ze overslaat.
+
+class Ledger:
+    """Verwerkte bestanden als JSON-regels (naam, grootte, mtime, status)."""
+
+    def __init__(self, path=WATCH_LEDGER):
+        self.path = path
+        self.keys = set()
+        try:
+            with open(path, encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        self.keys.add(json.loads(line)["key"])
+                    except (ValueError, KeyError, TypeError):
+                        pass          # half geschreven regel na een crash
+        except OSError:
+            pass
+
+    @staticmethod
+    def key(filepath, st=None) -> str:
+        # dezelfde naam met andere inhoud (opnieuw gecaptured) telt als nieuw
+        st = st or os.stat(filepath)
+        return f"{os.path.basename(filepath)}|{st.st_size}|{int(st.st_mtime)}"
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    def add(self, key, status, error=None):
+        entry = {"key": key, "status": status, "at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        if error:
+            entry["error"] = error
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(entry) + "\n")
+        self.keys.add(key)
+
+
+class FolderWatcher:
+    """
+    Vindt nieuwe video's in een map en geeft ze pas door als grootte en mtime
+    ``stable_sec`` lang gelijk bleven. inotify (als inotify_simple er is)
+    maakt alleen eerder wakker; de map wordt hoe dan ook elke ``poll_sec``
+    gescand, want op netwerkshares komen er geen inotify-events.
+    """
+
+    def __init__(self, folder, stable_sec=WATCH_STABLE_SEC, poll_sec=WATCH_POLL_SEC):
+        self.folder = folder
+        self.stable_sec = stable_sec
+        self.poll_sec = poll_sec
+        self.pending = {}         # pad → (grootte, mtime, stabiel sinds)
+        self.handed_out = {}      # pad → (grootte, mtime) bij het doorgeven
+        self.inotify = None
+        if INotify is not None:
+            try:
+                self.inotify = INotify()
+                self.inotify.add_watch(folder, inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO
+                                       | inotify_flags.CREATE | inotify_flags.MODIFY)
+            except OSError:
+                self.inotify = None
+
+    def poll(self):
+        """Scant de map → lijst van paden die nu stabiel zijn."""
+        now = time.monotonic()
+        ready = []
+        try:
+            names = [f for f in os.listdir(self.folder) if f.lower().endswith(VIDEO_EXTS)]
+        except OSError:
+            return ready
+        present = set()
+        for name in sorted(names, key=natural_sort_key):
+            path = os.path.join(self.folder, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue              # net verwijderd of hernoemd
+            present.add(path)
+            sig = (st.st_size, st.st_mtime)
+            if self.handed_out.get(path) == sig:
+                continue
+            prev = self.pending.get(path)
+            if prev is None or prev[:2] != sig:
+                self.pending[path] = (sig[0], sig[1], now)
+            elif st.st_size > 0 and now - prev[2] >= self.stable_sec:
+                del self.pending[path]
+                self.handed_out[path] = sig
+                ready.append(path)
+        for path in list(self.pending):
+            if path not in present:
+                del self.pending[path]
+        return ready
+
+    def wait(self):
+        """Slaapt tot de volgende scan; met inotify eerder bij een wijziging in de map."""
+        timeout = self.poll_sec
+        if self.pending:
+            # niet langer dan nodig: het eerstvolgende bestand dat stabiel wordt
+            now = time.monotonic()
+            timeout = min(timeout, max(0.1, min(p[2] + self.stable_sec - now for p in self.pending.values())))
+        if self.inotify is not None:
+            self.inotify.read(timeout=int(timeout * 1000))
+        else:
+            time.sleep(timeout)
+
+
+def _open_report(path, header):
+    """CSV in append-modus; de kop alleen in een nieuw (leeg) bestand."""
+    fh = open(path, mode='a', newline='')
+    writer = csv.writer(fh)
+    if fh.tell() == 0:
+        writer.writerow(header)
+    return fh, writer
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def watch_folder(folder=VIDEO_FOLDER, workers=1, range_workers=1, triage=False,
+                 stable_sec=WATCH_STABLE_SEC, poll_sec=WATCH_POLL_SEC, ledger_path=WATCH_LEDGER,
+                 features=False):
+    """Hot folder: blijft draaien tot Ctrl+C / SIGTERM. Wat dan nog liep staat
+    niet in de ledger en wordt bij de volgende start opnieuw geanalyseerd."""
+    os.makedirs(folder, exist_ok=True)
+    ledger = Ledger(ledger_path)
+    watcher = FolderWatcher(folder, stable_sec, poll_sec)
+    signal.signal(signal.SIGTERM, _raise_interrupt)
+    mode = ("inotify + polling" if watcher.inotify is not None
+            else "polling; inotify_simple niet beschikbaar" if INotify is None else "polling")
+    print(f"👀 Hot folder {folder} ({mode}, stabiel na {stable_sec} s, {workers} worker(s)); "
+          f"{len(ledger.keys)} bestand(en) al verwerkt", flush=True)
+
+    files = [_open_report(OUTPUT_CSV_EVENTS, EVENTS_CSV_HEADER),
+             _open_report(OUTPUT_CSV_SUMMARY, SUMMARY_CSV_HEADER),
+             _open_report(OUTPUT_CSV_METRICS, METRICS_CSV_HEADER)]
+    (events_csv, events_writer), (summary_csv, summary_writer), (metrics_csv, metrics_writer) = files
+    pool = ProcessPoolExecutor(max_workers=workers)
+    running = {}                  # future → (pad, ledger-sleutel, eigen pool of None)
+    waiting = []                  # (pad, ledger-sleutel) nog niet ingediend
+    retry = []                    # (pad, ledger-sleutel) uit een gecrashte pool
+    try:
+        while True:
+            for path in watcher.poll():
+                try:
+                    key = Ledger.key(path)
+                except OSError:
+                    continue
+                if key in ledger:
+                    continue
+                print(f"📥 {os.path.basename(path)} in de wachtrij", flush=True)
+                waiting.append((path, key))
+
+            broken = False
+            for fut in [f for f in running if f.done()]:
+                path, key, own_pool = running.pop(fut)
+                filename = os.path.basename(path)
+                if own_pool is not None:
+                    own_pool.shutdown(wait=False)
+                try:
+                    res, err = fut.result()
+                except BrokenProcessPool:
+                    if own_pool is None:
+                        # welk bestand de crash veroorzaakte is niet te zeggen: elk
+                        # getroffen bestand opnieuw, één voor één in een eigen
+                        # proces (zoals _iter_batch_results)
+                        broken = True
+                        retry.append((path, key))
+                        continue
+                    res, err = None, "worker process crashed"
+                except Exception as e:
+                    res, err = None, f"{type(e).__name__}: {e}"
+                if err:
+                    print(f"❌ {filename}: {err}", flush=True)
+                    ledger.add(key, "failed", err)
+                    continue
+                _write_video_rows(events_writer, summary_writer, filename, *res[:2])
+                _write_metrics_rows(metrics_writer, filename, res[2])
+                for fh, _ in files:
+                    fh.flush()
+                ledger.add(key, "done")
+            if broken:
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = ProcessPoolExecutor(max_workers=workers)
+
+            # na een crash (vaak geheugen) niets parallel: eerst de getroffen
+            # bestanden één voor één, pas daarna weer nieuwe via de pool
+            if retry or any(own_pool is not None for _, _, own_pool in running.values()):
+                if retry and not running:
+                    path, key = retry.pop(0)
+                    own_pool = ProcessPoolExecutor(max_workers=1)
+                    running[own_pool.submit(_analyze_file_safe, path, range_workers, triage, features)] = \
+                        (path, key, own_pool)
+            else:
+                for path, key in waiting:
+                    running[pool.submit(_analyze_file_safe, path, range_workers, triage, features)] = \
+                        (path, key, None)
+                waiting.clear()
+
+            watcher.wait()
+    except KeyboardInterrupt:
+        print(f"\n⏹ Gestopt; {len(running) + len(retry) + len(waiting)} lopende of wachtende analyse(s) "
+              f"worden bij de volgende start opnieuw gedaan.", flush=True)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        for _, _, own_pool in running.values():
+            if own_pool is not None:
+                own_pool.shutdown(wait=False, cancel_futures=True)
+        for fh, _ in files:
+            fh.close()
+
+
+def reevaluate_folder(folder=FEATURE_DIR, overrides=()):
+    """Alle tijdlijnen in ``folder`` opnieuw beoordelen → events- en samenvattings-CSV.
+    De nieuwe events komen ook in de index (zie FeatureStore), zodat --query ze ziet.
+    ``overrides``: de met --set gewijzigde instellingen (zie reevaluate_timeline)."""
+    store = FeatureStore(folder)
+    store.reindex()
+    videos = store.videos()
+    if not videos:
+        print(f"⚠️ geen tijdlijnen in {folder}; eerst analyseren met --features", flush=True)
+        return
     with open(OUTPUT_CSV_EVENTS, mode='w', newline='') as events_csv, \
          open(OUTPUT_CSV_SUMMARY, mode='w', newline='') as summary_csv:
+        events_writer = csv.writer(events_csv)
+        summary_writer = csv.writer(summary_csv)
+        events_writer.writerow(EVENTS_CSV_HEADER)
+        summary_writer.writerow(SUMMARY_CSV_HEADER)
+        for video in videos:
+            filename = video["filename"]
+            t0 = time.perf_counter()
+            try:
+                timeline = store.timeline(filename)
+                events = reevaluate_timeline(timeline, overrides)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"❌ {filename}: {e}", flush=True)
+                continue
+            ms = (time.perf_counter() - t0) * 1000.0
+            store.set_events(filename, events)
+            print(f"\n⚡ {filename}: opnieuw beoordeeld in {ms:.1f} ms", flush=True)
+            _write_video_rows(events_writer, summary_writer, filename,
+                              float(timeline.meta.get("video_duration") or 0.0), events)
+    print(f"\n✅ Done! Detailed CSV: {OUTPUT_CSV_EVENTS}\n✅ Video summary: {OUTPUT_CSV_SUMMARY}", flush=True)
+
+
+def query_store(query, folder=FEATURE_DIR, event_type=None, min_percent=0.0, min_duration=0.0,
+                column=None, min_value=None, max_value=None, out=None):
+    """Eén vraag aan de kenmerken-opslag → CSV op ``out`` (standaard stdout)."""
+    store = FeatureStore(folder)
+    writer = csv.writer(out or sys.stdout)
+    if query == "videos":
+        writer.writerow(["Filename", "Video Duration (sec)", "Samples", "Events", "Indexed At"])
+        for v in store.videos():
+            writer.writerow([v["filename"], round(v["video_duration"] or 0.0, 2), v["samples"],
+                             v["events"], v["indexed_at"]])
+    elif query == "coverage":
+        writer.writerow(["Filename", "Video Duration (sec)", "Events", "Covered (sec)", "Covered (%)"])
+        for r in store.coverage(event_type, min_percent):
+            writer.writerow([r["filename"], round(r["video_duration"], 2), r["events"],
+                             round(r["seconds"], 2), round(r["percent"], 2)])
+    elif query == "events":
+        writer.writerow(EVENTS_CSV_HEADER)
+        for e in store.events(event_type, min_duration):
+            writer.writerow([e["filename"], e["type"], to_hms(e["start"]), to_hms(e["end"]),
+                             round(e["duration"], 2), e["details"]])
+    elif query == "features":
+        kind, _, name = (column or "").partition(".")
+        writer.writerow(["Filename", "Samples", "Matches", "Matches (sec)", "Matches (%)"])
+        for r in store.scan(kind, name, min_value, max_value):
+            writer.writerow([r["filename"], r["samples"], r["matches"],
+                             round(r["seconds"], 2), round(r["percent"], 2)])
+    else:
+        raise ValueError(f"onbekende vraag: {query}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Zwartruimte & visuele ruis: analyse van VIDEO_FOLDER")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="aantal video's tegelijk in een process pool (0 = alle cores)")
+    parser.add_argument("--range-workers", type=int, default=RANGE_WORKERS,
+                        help="één video in tijdsbereiken over zoveel processen verdelen "
+                             "(alleen met --workers 1; 0 = alle cores)")
+    parser.add_argument("--triage", action="store_true",
+                        help="snelle sweep: grove scan, precieze detectors alleen rond verdachte stukken")
+    parser.add_argument("--watch", action="store_true",
+                        help="hot folder: blijven draaien en nieuwe bestanden analyseren zodra ze stabiel zijn "
+                             "(resultaten worden aan de CSV's toegevoegd); met inotify_simple (Linux) "
+                             "meteen, anders door de map elke WATCH_POLL_SEC te pollen")
+    parser.add_argument("--stable-sec", type=float, default=WATCH_STABLE_SEC,
+                        help="met --watch: zo lang mag een bestand niet meer veranderen")
+    parser.add_argument("--poll-sec", type=float, default=WATCH_POLL_SEC,
+                        help="met --watch: interval van de mapscan")
+    parser.add_argument("--features", action="store_true",
+                        help=f"per video de kenmerken-tijdlijn bewaren in {FEATURE_DIR} (voor --reevaluate)")
+    parser.add_argument("--reevaluate", action="store_true",
+                        help=f"niets decoderen: de tijdlijnen in {FEATURE_DIR} opnieuw beoordelen "
+                             "met de huidige drempels → events- en samenvattings-CSV")
+    parser.add_argument("--set", action="append", default=[], metavar="NAAM=WAARDE",
+                        help="met --reevaluate: drempel overschrijven, bv. RUIS_SAT_MAX=35 "
+                             f"({', '.join(REEVALUATE_SETTINGS)})")
+    parser.add_argument("--query", choices=("videos", "coverage", "events", "features"),
+                        help=f"vraag aan de index in {FEATURE_DIR} (CSV op stdout), bv. "
+                             "--query coverage --type RUIS/STRIPES --min-percent 5 of "
+                             "--query events --type FREEZE --min-duration 30")
+    parser.add_argument("--type", help="met --query coverage/events: alleen dit event-type")
+    parser.add_argument("--min-percent", type=float, default=0.0,
+                        help="met --query coverage: minimaal aandeel van de band (%%)")
+    parser.add_argument("--min-duration", type=float, default=0.0,
+                        help="met --query events: minimale duur (s)")
+    parser.add_argument("--column", metavar="SOORT.KOLOM",
+                        help="met --query features: kenmerk, bv. ruis.lap_var ("
+                             + ", ".join(f"{k}.{c}" for k, cols in FEATURE_COLUMNS.items()
+                                         for c in cols if c != "t") + ")")
+    parser.add_argument("--min", type=float, help="met --query features: ondergrens van het kenmerk")
+    parser.add_argument("--max", type=float, help="met --query features: bovengrens van het kenmerk")
+    args = parser.parse_args(argv)
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    if args.features and args.triage:
+        parser.error("--features kan niet met --triage (die slaat stukken van de video over)")
+    if args.set and not args.reevaluate:
+        parser.error("--set alleen met --reevaluate")
+    for item in args.set:
+        name, _, value = item.partition("=")
+        if name not in REEVALUATE_SETTINGS:
+            parser.error(f"--set {name}: onbekend, kies uit {', '.join(REEVALUATE_SETTINGS)}")
+        try:
+            globals()[name] = float(value)
+        except ValueError:
+            parser.error(f"--set {item}: geen getal")
+
+    if args.query == "features":
+        kind, _, name = (args.column or "").partition(".")
+        if name not in FEATURE_COLUMNS.get(kind, ()) or name == "t":
+            parser.error("--query features vraagt --column SOORT.KOLOM, bv. ruis.lap_var")
+
+    if args.reevaluate:
+        reevaluate_folder(FEATURE_DIR, [item.partition("=")[0] for item in args.set])
+        return
+
+    if args.query:
+        query_store(args.query, FEATURE_DIR, args.type, args.min_percent, args.min_duration,
+                    args.column, args.min, args.max)
+        return
+
+    if args.watch:
+        watch_folder(VIDEO_FOLDER, workers, args.range_workers if workers <= 1 else 1, args.triage,
+                     stable_sec=args.stable_sec, poll_sec=args.poll_sec, features=args.features)
+        return
+
+    # Laten we de csv voorbereiden
+    with open(OUTPUT_CSV_EVENTS, mode='w', newline='') as events_csv, \
+         open(OUTPUT_CSV_SUMMARY, mode='w', newline='') as summary_csv, \
+         open(OUTPUT_CSV_METRICS, mode='w', newline='') as metrics_csv:
 
         events_writer = csv.writer(events_csv)
         summary_writer = csv.writer(summary_csv)
+        metrics_writer = csv.writer(metrics_csv)
 
-        events_writer.writerow(['video_file', 'type', 'start_time', 'end_time', 'duration_sec', 'details'])
-        summary_writer.writerow(['video_file', 'video_duration_sec', 'video_duration_mmss',
-                                 'errors_count', 'errors_total_sec', 'errors_total_mmss', 'damage_percent'])
+        events_writer.writerow(EVENTS_CSV_HEADER)
+        summary_writer.writerow(SUMMARY_CSV_HEADER)
+        metrics_writer.writerow(METRICS_CSV_HEADER)
 
         # Wachtrij: natuurlijk gesorteerde video’s
 
@@ -421,81 +3522,48 @@ def main():
             [f for f in os.listdir(VIDEO_FOLDER) if f.lower().endswith(VIDEO_EXTS)],
             key=natural_sort_key
         )
-
-        for filename in tqdm(video_files, desc="📦 Videos", unit="file"):
-            filepath = os.path.join(VIDEO_FOLDER, filename)
-            print(f"\n🎨 Start analyse van {filename}...", flush=True)
-
-            # duur van de video
-
-            video_duration = get_video_duration_seconds(filepath)
-
-            # alle resultaten verzamelen
-
-            all_results = []
-            all_results += detect_black_segments(filepath)
-            all_results += detect_glitches(filepath)            # kleurglitches
-            all_results += detect_freezes(filepath)             # freezes
-            all_results += detect_1khz_tone(filepath)           # 1 kHz
-            all_results += detect_ruis_gray_stripes(filepath)   # grijze ruis/strepen 
-
-            print(f"▶️ Verwerken: {filename}")
-            if all_results:
-                print(f"📄 Resultaten: {len(all_results)} fouten gevonden")
-
-                total_defect_sec = 0.0
-                for r in all_results:
-                    total_defect_sec += float(r['duration'])
-                    print(f"🧾 {r['type']} → {r['start']} → {r['end']} ({float(r['duration']):.2f} sec)")
-                    events_writer.writerow([
-                        filename, r["type"], r["start"], r["end"],
-                        round(float(r["duration"]), 2), r["details"]
-                    ])
-
-                # Formaten voor CSV (mm:ss) 
-                total_mmss = seconds_to_mmss(total_defect_sec)
-                dur_mmss = seconds_to_mmss(video_duration) if video_duration > 0 else "00:00"
-
-                # Nieuwe formaten voor afdrukken (hh:mm:ss)
-
-                total_hms = to_hms(total_defect_sec)
-                video_hms = to_hms(video_duration) if video_duration > 0 else "00:00:00"
-
-                # ===  BELANGRIJK: we berekenen de dekking van de tijdlijn (samengevoegde intervallen) ===
-                intervals = [(hms_to_seconds(r['start']), hms_to_seconds(r['end'])) for r in all_results]
-                merged = merge_intervals(intervals)
-                covered_sec = sum(e - s for s, e in merged)
-
-                damage_percent = (covered_sec / video_duration * 100.0) if video_duration > 0 else 0.0
-
-                # Eindregel: som van de duur + % volgens dekking
-                print(
-                    f"📊 Totaal: {len(all_results)} fouten, totaalduur {total_hms} "
-                    f"(= {int(round(total_defect_sec))} sec) — Video {video_hms}; "
-                    f"Beschadiging: {damage_percent:.2f}%"
-                )
-
-                # CSV-samenvatting zonder de structuur te wijzigen
-                summary_writer.writerow([
-                    filename,
-                    round(video_duration, 2),
-                    dur_mmss,
-                    len(all_results),
-                    round(total_defect_sec, 2),
-                    total_mmss,
-                    round(damage_percent, 2)
-                ])
-            else:
-                print("📄 Geen fouten gevonden.")
-                dur_mmss = seconds_to_mmss(video_duration) if video_duration > 0 else "00:00"
-                summary_writer.writerow([
-                    filename,
-                    round(video_duration, 2),
-                    dur_mmss,
-                    0, 0.0, "00:00", 0.0
-                ])
-
-    print(f"\n✅ Done! Detailed CSV: {OUTPUT_CSV_EVENTS}\n✅ Video summary: {OUTPUT_CSV_SUMMARY}", flush=True)
+        filepaths = [os.path.join(VIDEO_FOLDER, f) for f in video_files]
+        failed = []
+
+        if workers <= 1:
+            for filename, filepath in tqdm(list(zip(video_files, filepaths)), desc="📦 Videos", unit="file"):
+                print(f"\n🎨 Start analyse van {filename}...", flush=True)
+                res, err = _analyze_file_safe(filepath, args.range_workers, args.triage, args.features)
+                if err:
+                    print(f"❌ {filename}: {err}", flush=True)
+                    failed.append((filename, err))
+                    continue
+                _write_video_rows(events_writer, summary_writer, filename, *res[:2])
+                _write_metrics_rows(metrics_writer, filename, res[2])
+        else:
+            print(f"\n🚀 Batch: {len(video_files)} video's met {workers} workers", flush=True)
+            # resultaten komen in willekeurige volgorde binnen; we schrijven ze
+            # zodra de natuurlijk gesorteerde reeks tot dat punt compleet is
+            done = {}
+            next_idx = 0
+            for i, res, err in tqdm(_iter_batch_results(filepaths, workers, args.triage, args.features),
+                                    total=len(filepaths), desc="📦 Videos", unit="file"):
+                done[i] = (res, err)
+                while next_idx in done:
+                    res, err = done.pop(next_idx)
+                    filename = video_files[next_idx]
+                    if err:
+                        print(f"❌ {filename}: {err}", flush=True)
+                        failed.append((filename, err))
+                    else:
+                        _write_video_rows(events_writer, summary_writer, filename, *res[:2])
+                        _write_metrics_rows(metrics_writer, filename, res[2])
+                    next_idx += 1
+                events_csv.flush()
+                summary_csv.flush()
+                metrics_csv.flush()
+
+    if failed:
+        print(f"\n⚠️ {len(failed)} video('s) mislukt:", flush=True)
+        for filename, err in failed:
+            print(f"   - {filename}: {err}", flush=True)
+    print(f"\n✅ Done! Detailed CSV: {OUTPUT_CSV_EVENTS}\n✅ Video summary: {OUTPUT_CSV_SUMMARY}"
+          f"\n✅ Metrics: {OUTPUT_CSV_METRICS}", flush=True)
 
 
 
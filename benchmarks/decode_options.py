@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Meet de decode-opties (DECODE_THREADS, DECODE_SCALER, DECODE_KEYFRAMES_ONLY,
+OPENCV_THREADS) op de video-pass (detect_video_events).
+
+    python benchmarks/decode_options.py videos/tape01.avi [meer bestanden…]
+    python benchmarks/decode_options.py --synth /tmp/decode_bench
+
+Met --synth worden eerst drie testbanden van --seconds lang gemaakt zoals
+onze bronnen: DV (PAL, .avi), MPEG-2 (GOP 12, .mpg) en H.264 (GOP 250, .mp4).
+
+Per variant: beste tijd, × realtime, × t.o.v. de standaardinstellingen en of
+de events gelijk zijn aan die van de standaard (keyframes-only is grof en
+wijkt dus bewust af).
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import analyzer_core as core  # noqa: E402
+
+CPUS = os.cpu_count() or 1
+
+# naam → overschreven instellingen in analyzer_core
+VARIANTS = [
+    ("standaard", {}),
+    ("threads=1", {"DECODE_THREADS": 1}),
+    ("scaler=bicubic", {"DECODE_SCALER": "bicubic"}),
+    ("scaler=fast_bilinear", {"DECODE_SCALER": "fast_bilinear"}),
+    ("opencv=1 thread", {"OPENCV_THREADS": 1}),
+    ("keyframes-only", {"DECODE_KEYFRAMES_ONLY": True}),
+]
+if CPUS > 1:
+    VARIANTS.insert(2, (f"threads={CPUS}", {"DECODE_THREADS": CPUS}))
+
+# (bestandsnaam, ffmpeg-uitvoeropties) voor --synth
+SYNTH_TAPES = (
+    ("dv_pal.avi", ["-vf", "scale=720:576,setsar=16/15", "-pix_fmt", "yuv420p", "-c:v", "dvvideo"]),
+    ("mpeg2.mpg", ["-vf", "scale=720:576", "-c:v", "mpeg2video", "-g", "12", "-b:v", "6M"]),
+    ("h264.mp4", ["-vf", "scale=720:576", "-c:v", "libx264", "-g", "250", "-preset", "veryfast"]),
+)
+
+
+def make_synth_tapes(folder, seconds):
+    """Testbeeld met een zwart stuk en een groene glitch (elk 15% van de band), in drie codecs."""
+    os.makedirs(folder, exist_ok=True)
+    source = (f"testsrc2=size=720x576:rate=25:duration={seconds},"
+              f"drawbox=color=black:t=fill:enable='between(t,{seconds * 0.10},{seconds * 0.25})',"
+              f"drawbox=color=0x00FF00:t=fill:enable='between(t,{seconds * 0.50},{seconds * 0.65})'")
+    paths = []
+    for name, opts in SYNTH_TAPES:
+        path = os.path.join(folder, name)
+        if not os.path.exists(path):
+            print(f"   … {name}", flush=True)
+            subprocess.run(["ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+                            "-f", "lavfi", "-i", source, *opts, path], check=True)
+        paths.append(path)
+    return paths
+
+
+def run_variant(filepath, overrides, repeat):
+    saved = {k: getattr(core, k) for k in overrides}
+    try:
+        for k, v in overrides.items():
+            setattr(core, k, v)
+        if "OPENCV_THREADS" in overrides:
+            core.cv2.setNumThreads(overrides["OPENCV_THREADS"])
+        best, events = None, None
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            events = core.detect_video_events(filepath)
+            dt = time.perf_counter() - t0
+            best = dt if best is None else min(best, dt)
+        return best, events
+    finally:
+        for k, v in saved.items():
+            setattr(core, k, v)
+        if "OPENCV_THREADS" in overrides:
+            core.cv2.setNumThreads(-1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark van de decode-opties")
+    parser.add_argument("videos", nargs="*")
+    parser.add_argument("--synth", metavar="MAP", help="maak DV/MPEG-2/H.264-testbanden in deze map")
+    parser.add_argument("--seconds", type=int, default=120,
+                        help="lengte van de testbanden (events zijn pas vanaf 10 s een event)")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    videos = list(args.videos)
+    if args.synth:
+        videos += make_synth_tapes(args.synth, args.seconds)
+    if not videos:
+        parser.error("geef video's op of gebruik --synth")
+
+    print(f"🖥  {CPUS} core(s)")
+    for filepath in videos:
+        duration = core.get_video_duration_seconds(filepath)
+        print(f"\n🎞 {os.path.basename(filepath)} ({duration:.1f} s)")
+        base, base_events = None, None
+        for name, overrides in VARIANTS:
+            best, events = run_variant(filepath, overrides, args.repeat)
+            if base is None:
+                base, base_events = best, events
+            same = f"{len(events)} events, " + ("gelijk" if events == base_events else "afwijkend")
+            print(f"   {name:22s} {best:7.2f} s  ({duration / best:5.1f}× realtime, "
+                  f"{base / best:4.2f}× vs standaard, {same})", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark van alle detectors op synthetische VHS-testbanden met bekende fouten.
+
+    python benchmarks/detectors.py /tmp/vhs_bench
+    python benchmarks/detectors.py /tmp/vhs_bench --lengths 120,600 --sizes 320x240,720x576
+
+Per band (lengte × resolutie) maakt ffmpeg met lavfi-bronnen een testbeeld
+met ruis, met daarin op vaste tijden: zwart, een bevroren beeld, een groene en
+een roze kleurzweem, grijze ruis, grijze strepen en (in het geluid) een
+1 kHz-toon. De ligging daarvan is de 'ground truth'.
+
+Elke meting draait in een eigen Python-proces, zodat de piek-RSS (Python +
+ffmpeg) per detector klopt. Per detector en voor web_app.analyze_one als
+geheel: tijd, frames/s, seconden video per seconde, piek-RSS en precision /
+recall / gemiddelde grensafwijking t.o.v. de ground truth (een event telt als
+gevonden bij IoU ≥ --iou).
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import analyzer_core as core  # noqa: E402
+
+FPS = 25
+SEGMENT_SEC = 12                  # lang genoeg voor elke minimale duur (≤ 10 s)
+TONE_SEC = 12
+
+# soort stuk → lavfi-bron (zonder grootte/duur) en de event-types die erbij horen.
+# Effen stukken staan stil en zijn dus óók een FREEZE.
+SEGMENTS = (
+    ("zwart", "color=c=black", ("BLACK", "FREEZE")),
+    ("bevroren", "testsrc2=duration={frame}:{size_rate},loop=loop={loops}:size=1:start=0", ("FREEZE",)),
+    ("groen", "color=c=0x00FF00", ("GLITCH", "FREEZE")),
+    ("roze", "color=c=0xFF40FF", ("GLITCH", "FREEZE")),
+    ("grijze ruis", "color=c=gray,noise=c0s=80:c0f=t", ("RUIS/STRIPES",)),
+    ("grijze strepen", "color=c=gray,geq=lum='128+70*sin(X/4+T*6)':cb=128:cr=128", ("RUIS/STRIPES",)),
+)
+CLEAN = "testsrc2,noise=alls=12:allf=t"
+
+# naam → (functie in analyzer_core, event-types die hij meldt)
+DETECTORS = (
+    ("black", "detect_black_segments", ("BLACK",)),
+    ("freeze", "detect_freezes", ("FREEZE",)),
+    ("glitch", "detect_glitches", ("GLITCH",)),
+    ("ruis", "detect_ruis_gray_stripes", ("RUIS/STRIPES",)),
+    ("tone", "detect_1khz_tone", ("1KHZ_TONE",)),
+    ("video-pass", "detect_video_events", ("BLACK", "FREEZE", "GLITCH", "RUIS/STRIPES")),
+    ("analyze_one", None, ("BLACK", "FREEZE", "GLITCH", "RUIS/STRIPES", "1KHZ_TONE")),
+)
+
+
+# =======================
+#     TESTBANDEN
+# =======================
+
+def tape_layout(seconds):
+    """Stukken gelijk verdeeld over de band, met schoon beeld ertussen.
+    Geeft ([(soort, start, eind)], (toon_start, toon_eind))."""
+    n = len(SEGMENTS)
+    gap = (seconds - n * SEGMENT_SEC) / (n + 1)
+    if gap < 2:
+        raise ValueError(f"band te kort: minstens {n * SEGMENT_SEC + 2 * (n + 1)} s")
+    # hele frames, anders schuiven de grenzen door afronding in concat
+    gap = int(gap * FPS) / FPS
+    layout = []
+    t = gap
+    for kind, _, _ in SEGMENTS:
+        layout.append((kind, t, t + SEGMENT_SEC))
+        t += SEGMENT_SEC + gap
+    tone_start = round(seconds * 0.4, 1)
+    return layout, (tone_start, tone_start + TONE_SEC)
+
+
+def ground_truth(seconds):
+    layout, (tone_start, tone_end) = tape_layout(seconds)
+    types = {kind: t for kind, _, t in SEGMENTS}
+    truth = [(typ, start, end) for kind, start, end in layout for typ in types[kind]]
+    truth.append(("1KHZ_TONE", tone_start, tone_end))
+    return truth
+
+
+def make_tape(path, seconds, size):
+    """Bouw één band met concat: schoon / stuk / schoon / … / schoon, plus geluid."""
+    layout, (tone_start, tone_end) = tape_layout(seconds)
+    size_rate = f"size={size}:rate={FPS}"
+    sources = {kind: src for kind, src, _ in SEGMENTS}
+
+    pieces = []
+    t = 0.0
+    for kind, start, end in layout:
+        pieces.append((CLEAN, start - t))
+        pieces.append((sources[kind], end - start))
+        t = end
+    pieces.append((CLEAN, seconds - t))
+
+    args, chains = [], []
+    for i, (src, dur) in enumerate(pieces):
+        name, _, rest = src.partition(",")
+        if "{frame}" in src:
+            lavfi = src.format(frame=1.0 / FPS, size_rate=size_rate, loops=int(round(dur * FPS)) - 1)
+        else:
+            sep = ":" if "=" in name else "="
+            lavfi = f"{name}{sep}{size_rate}:duration={dur}" + (f",{rest}" if rest else "")
+        args += ["-f", "lavfi", "-i", lavfi]
+        chains.append(f"[{i}:v]setpts=N/{FPS}/TB,format=yuv420p,setsar=1[v{i}]")
+    concat = "".join(f"[v{i}]" for i in range(len(pieces))) + f"concat=n={len(pieces)}:v=1:a=0[v]"
+    audio = (f"sine=frequency={core.TONE_HZ}:sample_rate=48000:duration={seconds},"
+             f"volume=volume=0:enable='not(between(t,{tone_start},{tone_end}))'")
+    args += ["-f", "lavfi", "-i", audio]
+
+    subprocess.run(["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", *args,
+                    "-filter_complex", ";".join(chains + [concat]),
+                    "-map", "[v]", "-map", f"{len(pieces)}:a",
+                    "-c:v", "libx264", "-preset", "veryfast", "-g", "50", "-pix_fmt", "yuv420p",
+                    "-c:a", "aac", "-t", str(seconds), path], check=True)
+
+
+def make_tapes(folder, lengths, sizes):
+    os.makedirs(folder, exist_ok=True)
+    tapes = []
+    for seconds in lengths:
+        for size in sizes:
+            path = os.path.join(folder, f"vhs_{seconds}s_{size}.mp4")
+            if not os.path.exists(path):
+                print(f"   … {os.path.basename(path)}", flush=True)
+                make_tape(path, seconds, size)
+            tapes.append((path, seconds))
+    return tapes
+
+
+# =======================
+#     METEN
+# =======================
+
+def measure(name, filepath):
+    """Draait in een eigen proces: één detector, tijd, piek-RSS en de events als JSON."""
+    func = dict((n, f) for n, f, _ in DETECTORS)[name]
+    t0 = time.perf_counter()
+    if func is None:
+        import web_app
+        events = web_app.analyze_one(filepath)["events"]
+    else:
+        events = [e.to_json() for e in getattr(core, func)(filepath)]
+    elapsed = time.perf_counter() - t0
+    # ru_maxrss is in KiB (Linux); ffmpeg-kinderen apart, het grootste telt
+    rss_kib = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    spans = [(e["type"], e["start"], e["end"]) for e in events]
+    print(json.dumps({"elapsed": elapsed, "rss_kib": rss_kib, "events": spans}))
+
+
+def run_measurement(name, filepath):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--measure", name, filepath],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _iou(a, b):
+    inter = min(a[1], b[1]) - max(a[0], b[0])
+    union = max(a[1], b[1]) - min(a[0], b[0])
+    return max(0.0, inter) / union if union > 0 else 0.0
+
+
+def score(found, truth, types, min_iou):
+    """Precision, recall en gemiddelde afwijking (s) van begin+eind bij de gevonden events."""
+    found = [f for f in found if f[0] in types]
+    truth = [t for t in truth if t[0] in types]
+    unmatched = list(found)
+    hits, errors = 0, []
+    for typ, start, end in truth:
+        best = max((f for f in unmatched if f[0] == typ),
+                   key=lambda f: _iou((start, end), f[1:]), default=None)
+        if best is not None and _iou((start, end), best[1:]) >= min_iou:
+            unmatched.remove(best)
+            hits += 1
+            errors.append((abs(best[1] - start) + abs(best[2] - end)) / 2)
+    precision = hits / len(found) if found else (1.0 if not truth else 0.0)
+    recall = hits / len(truth) if truth else 1.0
+    return precision, recall, (sum(errors) / len(errors) if errors else None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark van alle detectors op synthetische testbanden")
+    parser.add_argument("folder", nargs="?", default="./benchmark_tapes", help="map voor de testbanden")
+    parser.add_argument("--lengths", default="120,600", help="bandlengtes in seconden, komma-gescheiden")
+    parser.add_argument("--sizes", default="320x240,720x576", help="resoluties, komma-gescheiden")
+    parser.add_argument("--only", help="alleen deze detectors (komma-gescheiden): "
+                                       + ", ".join(n for n, _, _ in DETECTORS))
+    parser.add_argument("--iou", type=float, default=0.5, help="minimale overlap voor een treffer")
+    parser.add_argument("--measure", nargs=2, metavar=("DETECTOR", "VIDEO"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    names = args.only.split(",") if args.only else [n for n, _, _ in DETECTORS]
+    lengths = [int(x) for x in args.lengths.split(",")]
+    sizes = args.sizes.split(",")
+    tapes = make_tapes(args.folder, lengths, sizes)
+
+    for filepath, seconds in tapes:
+        frames = seconds * FPS
+        truth = ground_truth(seconds)
+        print(f"\n🎞 {os.path.basename(filepath)} ({seconds} s, {len(truth)} fouten in de ground truth)")
+        for name, _, types in DETECTORS:
+            if name not in names:
+                continue
+            m = run_measurement(name, filepath)
+            precision, recall, err = score(m["events"], truth, types, args.iou)
+            err_txt = f"±{err:4.1f} s" if err is not None else "   –   "
+            print(f"   {name:12s} {m['elapsed']:7.2f} s  {frames / m['elapsed']:7.0f} fps  "
+                  f"{seconds / m['elapsed']:6.1f}× realtime  {m['rss_kib'] / 1024:6.0f} MB  "
+                  f"P {precision:4.2f}  R {recall:4.2f}  {err_txt}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
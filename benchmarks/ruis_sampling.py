@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Meet de RUIS/STRIPES-sampling: oude seek-lus vs. sequentieel decoderen vs. adaptief.
+
+    python benchmarks/ruis_sampling.py videos/tape01.mkv [meer bestanden…]
+
+Vier varianten, de eerste drie ~RUIS_FPS_SAMPLE frames/sec door dezelfde frame_score:
+  seek     — cap.set(CAP_PROP_POS_FRAMES, i) vóór elke sample (de oude lus)
+  grab     — OpenCV sequentieel, grab() voor overgeslagen frames, retrieve() per sample
+  ffmpeg   — detect_ruis_gray_stripes vast (coarse_sec=0): ffmpeg fps-filter, sequentieel via de pipe
+  adaptief — detect_ruis_gray_stripes standaard: één sample per RUIS_COARSE_SEC, daarna per
+             grens een korte decode tot op het frame (trager, maar de grenzen kloppen exact)
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import cv2
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import analyzer_core as core  # noqa: E402
+
+
+def _step(cap):
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    return fps, frames, max(1, int(round(fps / max(0.1, core.RUIS_FPS_SAMPLE))))
+
+
+def sample_seek(filepath, scorer):
+    cap = cv2.VideoCapture(filepath)
+    fps, frames, step = _step(cap)
+    n = 0
+    for i in range(0, frames, step):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, i)
+        ok, frame = cap.read()
+        if not ok:
+            break
+        scorer.frame_score(frame)
+        n += 1
+    cap.release()
+    return n
+
+
+def sample_grab(filepath, scorer):
+    cap = cv2.VideoCapture(filepath)
+    fps, frames, step = _step(cap)
+    n = 0
+    for i in range(frames):
+        if not cap.grab():
+            break
+        if i % step == 0:
+            ok, frame = cap.retrieve()
+            if not ok:
+                break
+            scorer.frame_score(frame)
+            n += 1
+    cap.release()
+    return n
+
+
+def sample_ffmpeg(filepath, scorer):
+    core.detect_ruis_gray_stripes(filepath, coarse_sec=0)
+    return None
+
+
+def sample_adaptive(filepath, scorer):
+    core.detect_ruis_gray_stripes(filepath)
+    return None
+
+
+VARIANTS = (("seek", sample_seek), ("grab", sample_grab), ("ffmpeg", sample_ffmpeg),
+            ("adaptief", sample_adaptive))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RUIS/STRIPES sampling benchmark")
+    parser.add_argument("videos", nargs="+")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    scorer = core.RuisDetector()
+    for filepath in args.videos:
+        duration = core.get_video_duration_seconds(filepath)
+        print(f"\n🎞 {os.path.basename(filepath)} ({duration:.1f} s)")
+        base = None
+        for name, fn in VARIANTS:
+            best, n = None, None
+            for _ in range(max(1, args.repeat)):
+                t0 = time.perf_counter()
+                n = fn(filepath, scorer)
+                dt = time.perf_counter() - t0
+                best = dt if best is None else min(best, dt)
+            base = base or best
+            samples = f"{n} samples, " if n is not None else ""
+            print(f"   {name:8s} {best:8.2f} s  ({samples}{duration / best:.1f}× realtime, "
+                  f"{base / best:.1f}× vs seek)", flush=True)
+
+
+if __name__ == "__main__":
+    main()
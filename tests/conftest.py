@@ -0,0 +1,5 @@
+import os
+import sys
+
+# analyzer_core en web_app staan plat in de repo-root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,48 @@
+"""FeatureEngine per batch tegen dezelfde OpenCV-bewerkingen per frame."""
+import cv2
+import numpy as np
+import pytest
+
+import analyzer_core as ac
+
+
+def _engine(frames, max_frames=None):
+    engine = ac.FeatureEngine(max_frames=max_frames or len(frames))
+    for t, frame in enumerate(frames):
+        engine.push(float(t), frame)
+    return engine
+
+
+@pytest.mark.parametrize("shape", [(2, 3), (3, 5), (7, 4), (48, 64)])
+def test_lap_var_matches_per_frame_laplacian(shape):
+    rng = np.random.default_rng(sum(shape))
+    frames = rng.integers(0, 256, (6,) + shape + (3,), dtype=np.uint8)
+    expected = []
+    for frame in frames:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        expected.append(cv2.Laplacian(gray, cv2.CV_32F, ksize=3).var())
+    # de randrijen zien in de stapel het buurframe; die moeten per frame kloppen
+    np.testing.assert_allclose(_engine(frames).lap_var(), expected, rtol=1e-5)
+
+
+def test_frame_diff_across_batches():
+    rng = np.random.default_rng(1)
+    frames = rng.integers(0, 256, (5, 8, 10, 3), dtype=np.uint8)
+    gray = [cv2.cvtColor(f, cv2.COLOR_BGR2GRAY) for f in frames]
+    engine = ac.FeatureEngine(max_frames=3)
+    diffs = []
+    for t, frame in enumerate(frames):
+        if engine.push(float(t), frame) or t == len(frames) - 1:
+            diffs += engine.frame_diff().tolist()
+            engine.clear()
+    expected = [np.nan] + [cv2.absdiff(a, b).mean() for a, b in zip(gray[1:], gray[:-1])]
+    np.testing.assert_allclose(diffs, expected)
+
+
+def test_frame_score_reuses_engine():
+    det = ac.RuisDetector()
+    frame = np.full((32, 32, 3), 128, np.uint8)
+    det.frame_score(frame)
+    engine = det._score_engine
+    det.frame_score(frame)
+    assert det._score_engine is engine
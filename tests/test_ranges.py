@@ -0,0 +1,132 @@
+"""Samenvoegen van runs over tijdsbereiken heen (detect_video_events_parallel)."""
+import numpy as np
+import pytest
+
+import analyzer_core as ac
+
+
+def _tracker_runs(flags, times, end_t, hold=0.0):
+    track = ac._SegmentTracker(0.0, hold=hold)
+    for flag, t in zip(flags, times):
+        track.update(bool(flag), float(t))
+    return track.finish(end_t)
+
+
+def test_join_continues_open_run_into_next_range():
+    parts = [([(1.0, 5.0, True)], 0.0), ([(5.0, 7.0, False), (8.0, 9.0, False)], 5.0)]
+    assert ac._join_range_runs(parts) == [(1.0, 7.0, False), (8.0, 9.0, False)]
+
+
+def test_join_closes_open_run_on_first_sample_of_next_range():
+    parts = [([(1.0, 5.0, True)], 0.0), ([(6.0, 7.0, False)], 5.0)]
+    assert ac._join_range_runs(parts) == [(1.0, 5.0, False), (6.0, 7.0, False)]
+
+
+def test_join_skips_empty_ranges_and_keeps_open_end_of_last():
+    parts = [([(1.0, 5.0, True)], 0.0), ([], None), ([(5.0, 9.0, True)], 5.0)]
+    assert ac._join_range_runs(parts) == [(1.0, 9.0, True)]
+
+
+def test_join_hold_bridges_gap_across_boundary():
+    parts = [([(1.0, 4.8, False)], 0.0), ([(5.2, 6.0, False)], 5.0)]
+    assert ac._join_range_runs(parts, hold=0.5) == [(1.0, 6.0, False)]
+    assert ac._join_range_runs(parts, hold=0.3) == [(1.0, 4.8, False), (5.2, 6.0, False)]
+
+
+@pytest.mark.parametrize("hold", [0.0, 0.12])
+@pytest.mark.parametrize("seed", range(5))
+def test_join_equals_sequential_pass(seed, hold):
+    rng = np.random.default_rng(seed)
+    fps = 25.0
+    n = 500
+    # runs van wisselende lengte, geen ruis per frame
+    flags = np.repeat(rng.random(60) < 0.4, rng.integers(1, 16, 60))[:n]
+    n = len(flags)
+    times = np.arange(n) / fps
+    end_t = n / fps
+    sequential = _tracker_runs(flags, times, end_t, hold)
+
+    bounds = sorted(set(rng.integers(1, n, 6).tolist()))
+    parts = []
+    for first, last in zip([0] + bounds, bounds + [n]):
+        runs = _tracker_runs(flags[first:last], times[first:last], last / fps, hold)
+        parts.append((runs, first / fps))
+    assert ac._join_range_runs(parts, hold) == pytest.approx(sequential)
+
+
+@pytest.mark.parametrize("hold", [0.0, 0.12])
+@pytest.mark.parametrize("seed", range(5))
+def test_runs_reported_as_final_survive_the_join(seed, hold):
+    # wat een worker vóór het samenvoegen meldt (_range_task), staat zo ook in het eindresultaat
+    rng = np.random.default_rng(seed)
+    fps = 25.0
+    flags = np.repeat(rng.random(60) < 0.4, rng.integers(1, 16, 60))[:500]
+    n = len(flags)
+    times = np.arange(n) / fps
+    bounds = sorted(set(rng.integers(1, n, 6).tolist()))
+    parts, reported = [], []
+    for first, last in zip([0] + bounds, bounds + [n]):
+        runs = _tracker_runs(flags[first:last], times[first:last], last / fps, hold)
+        parts.append((runs, first / fps))
+        reported += [run[:2] for run in runs
+                     if ac._range_run_is_final(run, first / fps, hold, last / fps, first == 0, last == n)]
+    joined = [run[:2] for run in ac._join_range_runs(parts, hold)]
+    assert reported and all(run in joined for run in reported)
+
+
+def test_segment_tracker_hold_and_min_duration():
+    track = ac._SegmentTracker(1.0, hold=0.5)
+    for t, flag in [(0.0, 1), (0.4, 0), (0.6, 1), (1.2, 1), (1.3, 0), (2.0, 0), (3.0, 1), (3.2, 0), (4.0, 0)]:
+        track.update(bool(flag), t)
+    # gat van 0.2 s overbrugd; het segment op 3.0 is te kort
+    assert track.finish(5.0) == [(0.0, 1.3, False)]
+
+
+def test_segment_tracker_open_at_end():
+    track = ac._SegmentTracker(0.0)
+    track.update(True, 2.0)
+    assert track.finish(3.0) == [(2.0, 3.0, True)]
+
+
+def test_parse_filter_log():
+    assert ac.parse_filter_log("[blackdetect @ 0x1] black_start:3 black_end:6.04 black_duration:3.04") == \
+        {"black_start": 3.0, "black_end": 6.04}
+    assert ac.parse_filter_log("[freezedetect @ 0x2] lavfi.freezedetect.freeze_end: 1.5e+01") == \
+        {"freeze_end": 15.0}
+    assert ac.parse_filter_log("frame=  100 fps=0.0 q=-0.0 size=N/A") == {}
+
+
+def _split_freeze(lines, first_frame, lookahead, end_t, fps=25.0):
+    det = ac.FreezeDetector(split=True)
+    det.start({"fps": fps, "first_frame": first_frame})
+    for line in lines:
+        det.on_log(line)
+    det.info["lookahead"] = lookahead
+    return det.runs(end_t)
+
+
+def test_split_freeze_drops_single_frame_spans_except_at_first_sample():
+    lines = ["lavfi.freezedetect.freeze_start: 4", "lavfi.freezedetect.freeze_end: 4.04",
+             "lavfi.freezedetect.freeze_start: 6", "lavfi.freezedetect.freeze_end: 6.04",
+             "lavfi.freezedetect.freeze_start: 7", "lavfi.freezedetect.freeze_end: 9"]
+    assert _split_freeze(lines, 100, True, 10.0) == [(4.0, 4.04, False), (7.0, 9.0, False)]
+
+
+def test_split_freeze_open_at_range_end():
+    lines = ["lavfi.freezedetect.freeze_start: 8"]
+    assert _split_freeze(lines, 0, True, 10.0) == [(8.0, 10.0, True)]
+    # einde van de video: zoals sequentieel niet gemeld
+    assert _split_freeze(lines, 0, False, 10.0) == []
+
+
+def test_range_detectors_use_given_settings():
+    # forkserver-workers krijgen de instellingen van de aanroeper mee, niet hun eigen standaardwaarden
+    settings = dict(ac.detector_settings(), BLACKDETECT_PIX_TH=0.2, FREEZE_NOISE=0.01,
+                    RUIS_FPS_SAMPLE=3, RUIS_COARSE_SEC=0, GLITCH_GREEN_MIN=99, GLITCH_ANALYSIS_HEIGHT=36)
+    black, glitch, freeze, ruis = ac._range_detectors(0.0, settings)
+    assert "pix_th=0.2" in black.vf and "n=0.01" in freeze.vf
+    assert ruis.fps_sample == 3 and ruis.coarse_sec is None and glitch.max_height == 36
+    ruis = ac._range_detectors(0.0, dict(settings, RUIS_COARSE_SEC=4))[3]
+    assert ruis.coarse_sec == 4 and ruis.fps_sample == 0.25
+    assert ac.glitch_flags([[0, 98, 0]], **glitch.thresholds).tolist() == [False]
+    assert ac.glitch_flags([[0, 98, 0]]).tolist() == [ac.GLITCH_GREEN_MIN < 98]
@@ -0,0 +1,66 @@
+"""Adaptieve ruis-sampling: grof samplen, de grenzen daarna op het frame (RuisDetector.refine)."""
+import numpy as np
+import pytest
+
+import analyzer_core as ac
+
+
+class _Scorer:
+    """Vervangt RuisDetector.frame_score: de vlag staat in het frame zelf."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def frame_score(self, frame):
+        self.calls += 1
+        return bool(frame[0, 0, 0]), 0.0, 0.0, 0.0
+
+
+def _find_edge(flags, first, was_on):
+    scorer = _Scorer()
+    finder = ac._RuisEdgeFinder(scorer, was_on, first, first + len(flags) - 1)
+    frame = np.zeros((2, 2, 3), dtype=np.uint8)
+    for i, flag in enumerate(flags):
+        frame[:] = flag
+        finder.on_frame(first + i, (first + i) / 25.0, frame)
+    finder.runs(0.0)
+    return finder.edge, scorer.calls
+
+
+@pytest.mark.parametrize("n", [2, 7, 127])
+@pytest.mark.parametrize("was_on", [False, True])
+def test_edge_finder_finds_exact_frame(n, was_on):
+    for flip in range(1, n):
+        flags = [was_on if i < flip else not was_on for i in range(n)]
+        edge, calls = _find_edge(flags, 1000, was_on)
+        assert edge == 1000 + flip
+        assert calls <= 2 * np.sqrt(n) + 2
+
+
+def test_edge_finder_takes_last_old_frame():
+    # een kort 'aan' vóór het laatste 'uit'-frame telt niet als begin
+    flags = [False] * 20 + [True] * 3 + [False] * 30 + [True] * 50
+    assert _find_edge(flags, 0, False)[0] == 53
+
+
+def test_edge_finder_without_flip_keeps_coarse_edge():
+    assert _find_edge([True] * 50, 0, False)[0] is None
+    assert _find_edge([False] * 50, 0, False)[0] is None
+
+
+def test_refine_skips_short_runs_and_open_end():
+    det = ac.RuisDetector(coarse_sec=5.0, min_duration=10.0)
+    det.info, det.source = {"fps": 25.0, "frames": 10000}, "band.mpg"
+    det._edge = lambda t, was_on: t - (0.5 if was_on else 1.0)
+    runs = [(10.0, 14.0, False), (20.0, 40.0, False), (50.0, 60.0, True)]
+    # de eerste wordt ook verfijnd nooit 10 s: die blijft zoals hij is
+    assert det.refine(runs) == [(10.0, 14.0, False), (19.0, 39.5, False), (49.0, 60.0, True)]
+
+
+def test_coarse_sampling_not_in_feature_timeline():
+    det = ac.RuisDetector(coarse_sec=20.0, min_duration=10.0)
+    assert det.coarse_sec == 5.0 and det.fps_sample == pytest.approx(0.2)
+    with ac.collect_features():
+        det = ac.RuisDetector(coarse_sec=5.0)
+    assert det.coarse_sec is None and det.fps_sample == ac.RUIS_FPS_SAMPLE
+    assert det.refine([(1.0, 20.0, False)]) == [(1.0, 20.0, False)]
@@ -0,0 +1,159 @@
+"""Hervatbare uploads van de web-app: offset-protocol en het verlopen van verlaten uploads."""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+os.environ.setdefault("RESULT_DB", os.path.join(tempfile.mkdtemp(), "results.sqlite3"))
+os.environ.setdefault("PROGRESSIVE", "0")
+import web_app  # noqa: E402
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    partial = tmp_path / ".partial"
+    partial.mkdir()
+    monkeypatch.setattr(web_app, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(web_app, "PARTIAL_DIR", str(partial))
+    monkeypatch.setattr(web_app, "UPLOADS", {})
+    # geen opruimen/sweeper bij het eerste request van de test-client
+    monkeypatch.setattr(web_app, "_BACKGROUND_STARTED", threading.Event())
+    web_app._BACKGROUND_STARTED.set()
+    added = []
+    monkeypatch.setattr(web_app, "job_add_file", lambda job_id, path, *a, **k: added.append((job_id, path)))
+    web_app.app.config["TESTING"] = True
+    with web_app.app.test_client() as c:
+        c.added = added
+        yield c
+
+
+def _create(client, size, name="band.mp4"):
+    res = client.post("/uploads", json={"name": name, "size": size})
+    assert res.status_code == 201
+    return res.get_json()["uploads"][0]
+
+
+def test_patch_resumes_from_offset(client):
+    up = _create(client, 6)
+    assert client.patch(up["url"], data=b"abc", headers={"Upload-Offset": "0"}).status_code == 204
+    # verkeerde offset → 409 met de juiste
+    res = client.patch(up["url"], data=b"xyz", headers={"Upload-Offset": "0"})
+    assert res.status_code == 409 and res.headers["Upload-Offset"] == "3"
+    assert client.head(up["url"]).headers["Upload-Offset"] == "3"
+    assert client.patch(up["url"], data=b"def", headers={"Upload-Offset": "3"}).status_code == 204
+    path = client.added[-1][1]
+    assert os.path.basename(path) == "band.mp4"
+    with open(path, "rb") as fh:
+        assert fh.read() == b"abcdef"
+    assert client.head(up["url"]).status_code == 404
+
+
+def test_same_name_gets_own_path_per_upload(client):
+    first, second = _create(client, 1), _create(client, 1)
+    client.patch(first["url"], data=b"a", headers={"Upload-Offset": "0"})
+    client.patch(second["url"], data=b"b", headers={"Upload-Offset": "0"})
+    (_, path_a), (_, path_b) = client.added
+    assert path_a != path_b
+    with open(path_a, "rb") as a, open(path_b, "rb") as b:
+        assert (a.read(), b.read()) == (b"a", b"b")
+
+
+def test_job_files_removed_when_job_ends(tmp_path, monkeypatch):
+    monkeypatch.setattr(web_app, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(web_app, "analyze_one", lambda path, **kw: {"events": []})
+    monkeypatch.setattr(web_app, "_record_metrics", lambda *a, **k: None)
+    job_id = web_app.create_job(["band.mp4"])
+    path = web_app._upload_path(job_id, 0, "band.mp4")
+    open(path, "wb").close()
+    web_app.job_add_file(job_id, path)
+    for _ in range(100):
+        if web_app.JOBS[job_id]["status"] in web_app.JOB_FINISHED:
+            break
+        time.sleep(0.05)
+    assert web_app.JOBS[job_id]["status"] == "done"
+    assert not os.path.exists(os.path.join(str(tmp_path), job_id))
+
+
+def test_patch_beyond_length_is_rejected(client):
+    up = _create(client, 2)
+    assert client.patch(up["url"], data=b"abc", headers={"Upload-Offset": "0"}).status_code == 413
+
+
+def test_abandoned_upload_expires(client):
+    up = _create(client, 10)
+    client.patch(up["url"], data=b"abc", headers={"Upload-Offset": "0"})
+    partial = os.path.join(web_app.PARTIAL_DIR, up["id"])
+    assert web_app._expire_uploads() == 0
+    assert web_app._expire_uploads(time.monotonic() + web_app.UPLOAD_TTL_SEC + 1) == 1
+    assert not os.path.exists(partial)
+    assert client.added[-1][1] is None            # de job meldt het bestand als mislukt
+    assert client.patch(up["url"], data=b"d", headers={"Upload-Offset": "3"}).status_code == 404
+
+
+def test_import_starts_no_background_work():
+    code = ("import threading, web_app; "
+            "assert not web_app._BACKGROUND_STARTED.is_set(); "
+            "assert 'upload-sweeper' not in [t.name for t in threading.enumerate()]")
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert subprocess.run([sys.executable, "-c", code], env=env).returncode == 0
+
+
+def test_orphan_partials_removed(client):
+    orphan = os.path.join(web_app.PARTIAL_DIR, "weg")
+    open(orphan, "wb").close()
+    up = _create(client, 10)
+    web_app._remove_orphan_partials()
+    assert not os.path.exists(orphan)
+    assert os.path.exists(os.path.join(web_app.PARTIAL_DIR, up["id"]))
+
+
+def test_progressive_start_runs_on_executor(client, monkeypatch):
+    monkeypatch.setattr(web_app, "PROGRESSIVE", True)
+    monkeypatch.setattr(web_app.core, "PROGRESSIVE_MIN_BYTES", 2)
+    probed = []
+    added = threading.Event()
+
+    def is_streamable(path, name=None):
+        probed.append(threading.current_thread().name)
+        return True
+    monkeypatch.setattr(web_app.core, "is_streamable", is_streamable)
+    monkeypatch.setattr(web_app, "job_add_file", lambda *a, **k: added.set())
+
+    up = _create(client, 6, "band.ts")
+    assert client.patch(up["url"], data=b"abc", headers={"Upload-Offset": "0"}).status_code == 204
+    assert added.wait(5)
+    # de kop lezen gebeurt niet in de request-thread
+    assert probed and probed[0].startswith("analyze")
+    entry = web_app.UPLOADS[up["id"]]
+    growing = entry["growing"]
+    assert client.patch(up["url"], data=b"def", headers={"Upload-Offset": "3"}).status_code == 204
+    assert growing.complete.is_set() and growing.path == entry["path"]
+    growing.close()
+
+
+def test_job_waiting_for_upload_holds_no_executor_thread(tmp_path, monkeypatch):
+    monkeypatch.setattr(web_app, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(web_app, "analyze_one", lambda path, **kw: {"events": []})
+    monkeypatch.setattr(web_app, "_record_metrics", lambda *a, **k: None)
+    job_id = web_app.create_job(["a.mp4", "b.mp4"])
+    job = web_app.JOBS[job_id]
+    for index, name in enumerate(("a.mp4", "b.mp4")):
+        path = web_app._upload_path(job_id, index, name)
+        open(path, "wb").close()
+        web_app.job_add_file(job_id, path)
+        for _ in range(100):
+            if job["done_files"] > index:
+                break
+            time.sleep(0.05)
+        if index == 0:
+            # tweede bestand nog onderweg: de job wacht, maar zonder werkeenheid op de executor
+            assert job["status"] == "running" and not job["running"]
+            barrier = threading.Barrier(web_app.JOB_WORKERS, timeout=5)
+            futures = [web_app._executor.submit(barrier.wait) for _ in range(web_app.JOB_WORKERS)]
+            for fut in futures:
+                fut.result(timeout=10)          # alle executor-threads zijn vrij
+    assert job["status"] == "done" and job["done_files"] == 2
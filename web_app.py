@@ -1,9 +1,19 @@
 # web_app.py — Frontend zonder autoscan, met spinner en % voortgang (pseudo), PRG, verwijderen en CSV
 # Start:: python web_app.py → http://127.0.0.1:5009
+# Gunicorn: jobs leven in het geheugen van het proces → één worker met threads,
+#   bv. gunicorn -w 1 --threads 8 web_app:app
 
 import os
+import json
+import hashlib
+import time
+import uuid
+import shutil
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from flask import Flask, request, redirect, url_for, render_template_string, flash, session
+from flask import Flask, request, redirect, url_for, render_template_string, flash, session, jsonify, abort, Response
 from werkzeug.utils import secure_filename
 
 # --- veilige import analyzer_core ---
@@ -18,24 +28,67 @@ except Exception as e:
     raise RuntimeError("Het is niet gelukt om analyzer_core.py te importeren naast web_app.py") from e
 
 REQUIRED = [
-    "get_video_duration_seconds","detect_black_segments","detect_glitches",
+    "get_video_duration_seconds","detect_video_events","detect_video_events_parallel","detect_black_segments","detect_glitches",
     "detect_freezes","detect_1khz_tone","detect_ruis_gray_stripes",
     "to_hms","hms_to_seconds","merge_intervals",
+    "ResultCache","result_cache_key","collect_metrics","ResultStore",
 ]
 missing = [n for n in REQUIRED if not hasattr(core, n)]
 if missing:
     raise RuntimeError(f"В analyzer_core.py отсутствует: {missing}")
 # --- Einde van de import ---
 
-ALLOWED_EXT = {".mp4", ".mov", ".mkv", ".avi", ".m4v"}
-UPLOAD_DIR = os.path.join(BASE_DIR, "uploads")
+ALLOWED_EXT = {".mp4", ".mov", ".mkv", ".avi", ".m4v", ".ts", ".mts", ".m2ts"}
+UPLOAD_DIR = os.path.join(BASE_DIR, "uploads")     # per job een map <job-id>/<index>/<naam>, weg als de job klaar is
 STATIC_DIR = os.path.join(BASE_DIR, "static")
+CACHE_DIR = os.path.join(BASE_DIR, "result_cache")
+PARTIAL_DIR = os.path.join(UPLOAD_DIR, ".partial")   # onafgewerkte uploads (zie /uploads)
+UPLOAD_CHUNK = 1024 * 1024
+UPLOAD_TTL_SEC = 3600                # zo lang geen PATCH → upload verlopen: entry en .partial weg,
+                                     # de job meldt het bestand als mislukt
+UPLOAD_SWEEP_SEC = 60                # zo vaak op verlopen uploads controleren
+# streambare uploads (MPEG-TS, fragmented MP4) al analyseren terwijl ze binnenkomen
+PROGRESSIVE = os.environ.get("PROGRESSIVE", "1") != "0"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+os.makedirs(PARTIAL_DIR, exist_ok=True)
 os.makedirs(STATIC_DIR, exist_ok=True)
 
 app = Flask(__name__, static_folder=STATIC_DIR)
 app.secret_key = "elmaz"  # mijn
 
+# events houden hun tijden in seconden; pas in de HTML wordt het HH:MM:SS
+app.jinja_env.filters["hms"] = core.to_hms
+
+# dezelfde tape opnieuw geüpload → resultaat uit de cache i.p.v. opnieuw analyseren
+RESULT_CACHE = core.ResultCache(CACHE_DIR)
+# alle analyses server-side (SQLite); de sessie onthoudt alleen de laatste job-id
+RESULT_STORE = core.ResultStore(os.environ.get("RESULT_DB", os.path.join(BASE_DIR, "results.sqlite3")))
+RESULTS_PER_PAGE = 10
+
+# --- achtergrond-jobs: /analyze zet uploads in de wachtrij, een pool analyseert ---
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+# één lange video over de cores verdelen die de job-workers overlaten
+RANGE_WORKERS = int(os.environ.get("RANGE_WORKERS", max(1, (os.cpu_count() or 1) // JOB_WORKERS)))
+JOBS_KEEP = 200                      # zoveel afgeronde jobs houden we in het geheugen
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="analyze")
+JOBS = {}
+JOBS_LOCK = threading.Lock()
+UPLOADS = {}                         # upload-id → stand van een hervatbare upload
+UPLOADS_LOCK = threading.Lock()
+
+# aandeel van elke stage in de voortgang van één bestand (stage → (start, gewicht))
+STAGE_SPAN = {"video": (0.0, 0.85), "tone": (0.85, 0.15)}
+JOB_FINISHED = ("done", "error", "cancelled")
+SSE_INTERVAL = 0.5                   # sec tussen twee SSE-updates
+SSE_KEEPALIVE = 15.0                 # sec; commentaarregel zodat proxies de stream openhouden
+
+# --- /metrics: opgetelde detector-metingen sinds de start (Prometheus-tekstformaat) ---
+METRICS_LOCK = threading.Lock()
+METRICS_TOTALS = {}                  # stage → {"calls", "wall_sec", "cpu_sec", "frames", "bytes_read"}
+FRAME_DETECTOR_SEC = {}              # frame-detector → Python-tijd in de video-pass
+ANALYSES = {"analyzed": 0, "cached": 0, "failed": 0}
+PEAK_RSS_MB = [0.0]
+
 PAGE = r"""
 <!doctype html>
 <html lang="nl">
@@ -139,6 +192,8 @@ PAGE = r"""
     <div class="ovl-text">Analyseren… even geduld aub</div>
     <div class="pbar"><div id="ovlbar"></div></div>
     <div class="ovl-pct" id="ovlpct">0%</div>
+    <div class="ovl-text" id="ovlevents"></div>
+    <button type="button" class="btn secondary" id="ovlcancel" style="display:none">Annuleren</button>
   </div>
 </div>
 
@@ -149,12 +204,13 @@ PAGE = r"""
 
   <div class="topbar">
     <div class="muted"> Laad de bestanden hieronder op. Op de hoofdpagina wordt er niets automatisch geanalyseerd.</div>
-    {% if results %}
     <div class="top-actions">
+      <a class="btn secondary" href="{{ url_for('result', all=1) }}">Geschiedenis</a>
+      {% if results %}
       <button class="btn secondary" type="button" onclick="downloadSummaryPage()">Download Summary CSV</button>
       <button class="btn secondary" type="button" onclick="downloadEventsPage()">Download Events CSV</button>
+      {% endif %}
     </div>
-    {% endif %}
   </div>
   <br>
 
@@ -165,7 +221,7 @@ PAGE = r"""
       <div id="drop" class="drop">
         <div class="muted">Sleep & zet hier je video’s neer<br>of</div>
         <label class="btn secondary" for="file">Kies bestanden</label>
-        <input id="file" type="file" name="videos" multiple accept=".mp4,.mov,.mkv,.avi,.m4v">
+        <input id="file" type="file" name="videos" multiple accept=".mp4,.mov,.mkv,.avi,.m4v,.ts,.mts,.m2ts">
         <div id="picked" class="muted" style="margin-top:8px;">Geen bestanden geselecteerd</div>
         <ul id="pickedList" style="list-style:none; padding:0; margin:10px 0 0 0;"></ul>
       </div>
@@ -202,12 +258,14 @@ PAGE = r"""
       <div class="row" style="margin-top:10px;">
         <!-- короткая строка про длительности -->
         <span class="badge">Video: <b>{{ item.video_hms }}</b> — Beschadigd: <b>{{ item.covered_hms }}</b></span>
+        {% if item.cached %}<span class="muted" style="font-size:12px;">uit cache</span>{% endif %}
 
         <span class="row" style="gap:8px; margin-left:auto;">
           <button class="btn secondary" onclick="copySummary(this)" type="button">Copy summary</button>
           <button class="btn secondary" onclick="downloadCSV(this)" type="button">Download CSV</button>
           <form method="post" action="{{ url_for('delete') }}" style="display:inline;">
             <input type="hidden" name="filename" value="{{ item.filename }}">
+            <input type="hidden" name="analysis_id" value="{{ item.id }}">
             <button class="btn danger" type="submit" onclick="return confirm('Verwijderen?')">Verwijderen</button>
           </form>
         </span>
@@ -239,8 +297,8 @@ PAGE = r"""
             {% for ev in item.events %}
             <tr data-type="{{ ev.type }}">
               <td>{{ ev.type }}</td>
-              <td>{{ ev.start }}</td>
-              <td>{{ ev.end }}</td>
+              <td>{{ ev.start|hms }}</td>
+              <td>{{ ev.end|hms }}</td>
               <td>{{ "%.2f"|format(ev.duration) }}</td>
               <td>{{ ev.details }}</td>
             </tr>
@@ -254,6 +312,14 @@ PAGE = r"""
     </div>
     {% endfor %}
   {% endif %}
+
+  {% if pager and pager.pages > 1 %}
+  <div class="card row" style="justify-content:space-between;">
+    {% if pager.prev %}<a class="btn secondary" href="{{ pager.prev }}">← Vorige</a>{% else %}<span></span>{% endif %}
+    <span class="muted">Pagina {{ pager.page }} / {{ pager.pages }} ({{ pager.total }} analyses)</span>
+    {% if pager.next %}<a class="btn secondary" href="{{ pager.next }}">Volgende →</a>{% else %}<span></span>{% endif %}
+  </div>
+  {% endif %}
 </div>
 
 <script>
@@ -267,15 +333,18 @@ PAGE = r"""
   const busy = document.getElementById('busy');
   const overlay = document.getElementById('overlay');
 
-  // overlay progress (псевдо)
+  // overlay voortgang (op basis van de job-status)
   const ovlbar = document.getElementById('ovlbar');
   const ovlpct = document.getElementById('ovlpct');
-  let progTimer = null;
-  let progValue = 0;
+  const ovltext = document.querySelector('.ovl-text');
+  const ovlevents = document.getElementById('ovlevents');
+  const ovlcancel = document.getElementById('ovlcancel');
+  let pollTimer = null;
+  let currentJob = null;
 
   // Хранилище выбранных файлов
   let dt = new DataTransfer();
-  const allowed = new Set(['.mp4','.mov','.mkv','.avi','.m4v']);
+  const allowed = new Set(['.mp4','.mov','.mkv','.avi','.m4v','.ts','.mts','.m2ts']);
 
   function renderPicked() {
     if (dt.files.length === 0) {
@@ -321,34 +390,131 @@ PAGE = r"""
   });
   renderPicked();
 
-  // Показать/скрыть спиннер + псевдо-прогресс вокруг запроса
-  form.addEventListener('submit', ()=>{
+  function setProgress(pct, text) {
+    if (ovlbar) ovlbar.style.width = pct.toFixed(1) + '%';
+    if (ovlpct) ovlpct.textContent = Math.floor(pct) + '%';
+    if (text && ovltext) ovltext.textContent = text;
+  }
+  function showBusy(on) {
+    goBtn.disabled = on;
+    if (busy) busy.style.display = on ? 'inline' : 'none';
+    if (overlay) overlay.style.display = on ? 'flex' : 'none';
+    if (!on && ovlcancel) ovlcancel.style.display = 'none';
+  }
+
+  // Echte voortgang uit de detectors: stage + frames per bestand
+  const STAGE_LABEL = {video: 'beeld', tone: '1 kHz toon'};
+  function hms(sec) {
+    const t = Math.round(sec), pad = n => String(n).padStart(2, '0');
+    return `${Math.floor(t / 3600)}:${pad(Math.floor(t / 60) % 60)}:${pad(t % 60)}`;
+  }
+  function renderJob(job) {
+    const finished = ['done', 'error', 'cancelled'].includes(job.status);
+    let text = 'In de wachtrij…';
+    const fp = job.current && job.file_progress[job.current];
+    if (fp) {
+      const unit = fp.stage === 'tone' ? 'vensters' : 'frames';
+      text = `${job.current} (${job.done_files + 1}/${job.total_files}) — ` +
+             `${STAGE_LABEL[fp.stage] || fp.stage}: ${fp.done}/${fp.total || '?'} ${unit}`;
+    }
+    setProgress(finished ? 100 : Math.min(99, job.percent), text);
+    const evs = job.partial_events || [];
+    if (ovlevents) ovlevents.textContent = evs.length
+      ? `Al gevonden: ${evs.length} (laatste: ${evs[evs.length-1].type} @ ${hms(evs[evs.length-1].start)})` : '';
+    if (finished) window.location = `/result?job=${job.job_id}`;
+    return finished;
+  }
+
+  // Terugval zonder EventSource: job-status pollen
+  function pollJob(jobId) {
+    if (pollTimer) clearTimeout(pollTimer);
+    const tick = ()=>{
+      fetch(`/jobs/${jobId}`, {headers: {'Accept': 'application/json'}})
+        .then(r => r.ok ? r.json() : Promise.reject(r.status))
+        .then(job => { if (!renderJob(job)) pollTimer = setTimeout(tick, 1000); })
+        .catch(()=>{ pollTimer = setTimeout(tick, 3000); });
+    };
+    tick();
+  }
+
+  // Server-Sent Events van /jobs/<id>/events, tot de analyse klaar is
+  function watchJob(jobId) {
+    showBusy(true);
+    currentJob = jobId;
+    if (ovlcancel) ovlcancel.style.display = 'inline-block';
+    if (!window.EventSource) { pollJob(jobId); return; }
+    const es = new EventSource(`/jobs/${jobId}/events`);
+    es.onmessage = (e)=>{ renderJob(JSON.parse(e.data)); };
+    es.addEventListener('done', (e)=>{ es.close(); renderJob(JSON.parse(e.data)); });
+    es.onerror = ()=>{ es.close(); pollJob(jobId); };
+  }
+
+  if (ovlcancel) ovlcancel.addEventListener('click', ()=>{
+    if (!currentJob) return;
+    ovlcancel.disabled = true;
+    if (ovltext) ovltext.textContent = 'Annuleren…';
+    fetch(`/jobs/${currentJob}/cancel`, {method: 'POST', headers: {'Accept': 'application/json'}})
+      .finally(()=>{ ovlcancel.disabled = false; });
+  });
+
+  // Hervatbaar uploaden in blokken (/uploads): de analyse van een bestand
+  // begint zodra het laatste blok binnen is, ook als er nog andere uploaden
+  const CHUNK = 8 * 1024 * 1024;
+  const RETRIES = 8;
+  const sleep = (ms)=> new Promise(res => setTimeout(res, ms));
+
+  async function uploadFile(f, up, onBytes) {
+    let offset = 0, failures = 0;
+    while (offset < f.size) {
+      try {
+        const r = await fetch(up.url, {method: 'PATCH', body: f.slice(offset, offset + CHUNK),
+          headers: {'Upload-Offset': String(offset), 'Content-Type': 'application/offset+octet-stream'}});
+        if (r.status !== 204 && r.status !== 409) throw new Error(r.status);
+        offset = parseInt(r.headers.get('Upload-Offset'), 10);
+        failures = 0;
+      } catch (err) {
+        // verbinding weg: even wachten en bij de server navragen waar we waren
+        if (++failures > RETRIES) throw err;
+        await sleep(1000 * failures);
+        try {
+          const h = await fetch(up.url, {method: 'HEAD'});
+          if (h.ok) offset = parseInt(h.headers.get('Upload-Offset'), 10);
+        } catch (_) {}
+      }
+      onBytes(offset);
+    }
+  }
+
+  form.addEventListener('submit', async (e)=>{
+    e.preventDefault();
     file.files = dt.files;            // синхронизируем перед отправкой
-    goBtn.disabled = true;
-    if (busy) busy.style.display = 'inline';
-    if (overlay) overlay.style.display = 'flex';
-
-    // старт псевдо-прогресса: растём до 95%
-    progValue = 0;
-    if (ovlbar) ovlbar.style.width = '0%';
-    if (ovlpct) ovlpct.textContent = '0%';
-    if (progTimer) clearInterval(progTimer);
-    progTimer = setInterval(()=>{
-      const delta = Math.max(0.2, (95 - progValue) * 0.03); // ускорение в начале, замедление к концу
-      progValue = Math.min(95, progValue + delta);
-      if (ovlbar) ovlbar.style.width = progValue.toFixed(1) + '%';
-      if (ovlpct) ovlpct.textContent = Math.floor(progValue) + '%';
-    }, 250);
+    const files = Array.from(dt.files);
+    if (files.length === 0) return;
+    showBusy(true);
+    setProgress(0, 'Uploaden…');
+    try {
+      const r = await fetch('/uploads', {method: 'POST', headers: {'Content-Type': 'application/json', 'Accept': 'application/json'},
+        body: JSON.stringify({files: files.map(f => ({name: f.name, size: f.size}))})});
+      const data = await r.json();
+      if (!data.job_id) { showBusy(false); alert(data.error || 'Niets geüpload.'); return; }
+      currentJob = data.job_id;
+      const total = files.reduce((n, f) => n + f.size, 0) || 1;
+      let before = 0;
+      for (const up of data.uploads) {
+        const f = files[up.index];      // index in de aangevraagde lijst
+        await uploadFile(f, up, (done)=> setProgress(100 * (before + done) / total, `Uploaden: ${f.name}`));
+        before += f.size;
+      }
+      watchJob(data.job_id);
+    } catch (err) {
+      showBusy(false); alert('Upload mislukt.');
+    }
   });
 
-  window.addEventListener('pageshow', ()=>{ // после возврата со страницы результатов
-    if (progTimer) { clearInterval(progTimer); progTimer = null; }
-    // добиваем до 100% и скрываем
-    if (ovlbar) ovlbar.style.width = '100%';
-    if (ovlpct) ovlpct.textContent = '100%';
-    setTimeout(()=>{ if (overlay) overlay.style.display = 'none'; }, 150);
-    goBtn.disabled = false;
-    if (busy) busy.style.display = 'none';
+  window.addEventListener('pageshow', ()=>{ // na terugkeer van de resultatenpagina
+    if (pollTimer) { clearTimeout(pollTimer); pollTimer = null; }
+    showBusy(false);
+    {% if pending_job %}watchJob({{ pending_job|tojson }});{% endif %}
   });
 
 // Filteren van rijen op type gebeurtenis
@@ -448,21 +614,68 @@ PAGE = r"""
 def allowed_file(filename: str) -> bool:
     return os.path.splitext(filename)[1].lower() in ALLOWED_EXT
 
-def analyze_one(filepath: str):
-    """Start detect_* en bereidt data voor de frontend (alleen voor de aangeleverde bestanden)."""
-    video_duration = core.get_video_duration_seconds(filepath)
+def _upload_path(job_id: str, index: int, name: str) -> str:
+    """Eigen pad per bestand van een job: gelijke namen (ook van andere jobs) overschrijven elkaar niet."""
+    folder = os.path.join(UPLOAD_DIR, job_id, str(index))
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, name)
+
+def _remove_job_files(job_id: str):
+    """Uploads van een afgelopen job weg (de resultaten staan in de store/cache)."""
+    shutil.rmtree(os.path.join(UPLOAD_DIR, job_id), ignore_errors=True)
+
+def _remove_upload(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def save_upload(stream, save_path: str) -> str:
+    """Schrijft de upload in blokken weg en berekent onderweg de sha256."""
+    h = hashlib.sha256()
+    with open(save_path, "wb") as out:
+        for chunk in iter(lambda: stream.read(UPLOAD_CHUNK), b""):
+            h.update(chunk)
+            out.write(chunk)
+    return h.hexdigest()
 
-    all_results = []
-    all_results += core.detect_black_segments(filepath)
-    all_results += core.detect_glitches(filepath)
-    all_results += core.detect_freezes(filepath)
-    all_results += core.detect_1khz_tone(filepath)
-    all_results += core.detect_ruis_gray_stripes(filepath)
+def analyze_one(filepath: str, progress=None, content_hash=None, on_event=None, cancel=None, growing=None):
+    """Start detect_* en bereidt data voor de frontend (alleen voor de aangeleverde bestanden).
+    ``progress(stage, done, total)`` wordt doorgegeven aan de detectors; met
+    ``content_hash`` wordt eerst de resultaten-cache geraadpleegd.
+    ``on_event`` krijgt tussentijdse events, ``cancel`` (threading.Event) breekt af.
+    ``growing`` (core.GrowingFile): de upload loopt nog; de hash is pas achteraf
+    bekend, dus geen cache-lookup vooraf, wel het resultaat erin."""
+    key = core.result_cache_key(content_hash) if content_hash else None
+    if key:
+        cached = RESULT_CACHE.get(key)
+        if cached is not None:
+            cached["cached"] = True
+            return cached
 
-    total_defect_sec = float(sum(float(r["duration"]) for r in all_results))
+    res = _analyze_uncached(filepath, progress, on_event, cancel, growing)
+    if growing is not None and growing.content_hash:
+        key = core.result_cache_key(growing.content_hash)
+    if key:
+        RESULT_CACHE.put(key, res)
+    return res
+
+def _analyze_uncached(filepath: str, progress=None, on_event=None, cancel=None, growing=None):
+    if growing is not None:
+        video_duration, all_results, metrics = core.analyze_growing_file(
+            growing, progress=progress, on_event=on_event, cancel=cancel)
+    else:
+        video_duration = core.get_video_duration_seconds(filepath)
+        all_results = []
+        with core.collect_metrics() as metrics:
+            all_results += core.detect_video_events_parallel(filepath, progress=progress, workers=RANGE_WORKERS,
+                                                             on_event=on_event, cancel=cancel)
+            all_results += core.detect_1khz_tone(filepath, progress=progress, on_event=on_event, cancel=cancel)
+
+    total_defect_sec = float(sum(r.duration for r in all_results))
     total_hms = core.to_hms(total_defect_sec)
 
-    intervals = [(core.hms_to_seconds(r["start"]), core.hms_to_seconds(r["end"])) for r in all_results]
+    intervals = [(r.start, r.end) for r in all_results]
     merged = core.merge_intervals(intervals)
     covered_sec = float(sum(e - s for s, e in merged))
     covered_hms = core.to_hms(covered_sec)
@@ -470,13 +683,7 @@ def analyze_one(filepath: str):
     damage_percent = (covered_sec / video_duration * 100.0) if video_duration > 0 else 0.0
     video_hms = core.to_hms(video_duration) if video_duration > 0 else "00:00:00"
 
-    events = [{
-        "type": r["type"],
-        "start": r["start"],
-        "end": r["end"],
-        "duration": float(r["duration"]),
-        "details": r.get("details", "")
-    } for r in all_results]
+    events = [r.to_json() for r in all_results]
 
     return {
         "video_duration": float(video_duration),
@@ -488,6 +695,9 @@ def analyze_one(filepath: str):
         "damage_percent": float(damage_percent),
         "events": events,
         "errors_count": len(events),
+        "cached": False,
+        # per detector-aanroep: wall_sec, cpu_sec, frames, bytes_read, peak_rss_mb, frame_sec
+        "metrics": metrics,
     }
 
 @app.get("/")
@@ -500,69 +710,594 @@ def favicon():
     return redirect("https://meemoo.be/favicon.ico", code=302)
 
 
+def _wants_json() -> bool:
+    return request.accept_mimetypes.best == "application/json"
+
+def _file_fraction(fp) -> float:
+    """Voortgang van één bestand (0..1) uit stage + frames/vensters."""
+    start, weight = STAGE_SPAN.get(fp["stage"], (0.0, 1.0))
+    part = min(1.0, fp["done"] / fp["total"]) if fp["total"] else 0.0
+    return start + weight * part
+
+def _job_status(job) -> dict:
+    total = len(job["files"])
+    fp = job["file_progress"].get(job["current"]) if job["current"] else None
+    running = _file_fraction(fp) if fp else 0.0
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "created_at": job["created_at"],
+        "files": job["files"],
+        "total_files": total,
+        "done_files": job["done_files"],
+        "current": job["current"],
+        "file_progress": dict(job["file_progress"]),
+        "percent": round(100.0 * (job["done_files"] + running) / max(1, total), 1),
+        "errors": job["errors"],
+        # events van het lopende bestand die al vastliggen
+        "partial_events": list(job["partial_events"]),
+    }
+
+def _record_metrics(res=None, failed=False):
+    """Telt één geanalyseerd bestand op bij de totalen voor /metrics."""
+    with METRICS_LOCK:
+        if failed:
+            ANALYSES["failed"] += 1
+            return
+        if res.get("cached"):
+            ANALYSES["cached"] += 1
+            return
+        ANALYSES["analyzed"] += 1
+        for m in res.get("metrics", []):
+            tot = METRICS_TOTALS.setdefault(m["stage"], dict.fromkeys(
+                ("calls", "wall_sec", "cpu_sec", "frames", "bytes_read"), 0))
+            tot["calls"] += 1
+            for key in ("wall_sec", "cpu_sec", "frames", "bytes_read"):
+                tot[key] += m[key]
+            for name, sec in m["frame_sec"].items():
+                FRAME_DETECTOR_SEC[name] = FRAME_DETECTOR_SEC.get(name, 0.0) + sec
+            PEAK_RSS_MB[0] = max(PEAK_RSS_MB[0], m["peak_rss_mb"])
+
+def _prom_metrics() -> str:
+    """Prometheus-tekstformaat (versie 0.0.4)."""
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            label_txt = ",".join(f'{k}="{v}"' for k, v in labels.items())
+            lines.append(f"{name}{{{label_txt}}} {value}" if label_txt else f"{name} {value}")
+
+    with METRICS_LOCK:
+        stages = sorted(METRICS_TOTALS.items())
+        family("zwartruimte_analyses_total", "counter", "Geanalyseerde bestanden per uitkomst.",
+               [({"result": k}, v) for k, v in sorted(ANALYSES.items())])
+        family("zwartruimte_detector_calls_total", "counter", "Aantal detector-aanroepen per stage.",
+               [({"stage": st}, t["calls"]) for st, t in stages])
+        family("zwartruimte_detector_wall_seconds_total", "counter", "Wandtijd per stage.",
+               [({"stage": st}, round(t["wall_sec"], 3)) for st, t in stages])
+        family("zwartruimte_detector_cpu_seconds_total", "counter",
+               "CPU-tijd per stage (thread + ffmpeg/workers).",
+               [({"stage": st}, round(t["cpu_sec"], 3)) for st, t in stages])
+        family("zwartruimte_detector_frames_total", "counter", "Gedecodeerde frames per stage.",
+               [({"stage": st}, t["frames"]) for st, t in stages])
+        family("zwartruimte_detector_read_bytes_total", "counter", "Invoerbytes gelezen door ffmpeg per stage (rchar).",
+               [({"stage": st}, t["bytes_read"]) for st, t in stages])
+        family("zwartruimte_frame_detector_seconds_total", "counter",
+               "Python-tijd per frame-detector in de video-pass.",
+               [({"detector": d}, round(sec, 3)) for d, sec in sorted(FRAME_DETECTOR_SEC.items())])
+        family("zwartruimte_peak_rss_bytes", "gauge", "Hoogste piek-RSS gezien tijdens een analyse.",
+               [({}, int(PEAK_RSS_MB[0] * 1024 * 1024))])
+    with JOBS_LOCK:
+        counts = {}
+        for j in JOBS.values():
+            counts[j["status"]] = counts.get(j["status"], 0) + 1
+    family("zwartruimte_jobs", "gauge", "Jobs in het geheugen per status.",
+           [({"status": st}, n) for st, n in sorted(counts.items())])
+    return "\n".join(lines) + "\n"
+
+def _prune_jobs():
+    # oudste afgeronde jobs opruimen (JOBS is in invoegvolgorde)
+    finished = [jid for jid, j in JOBS.items() if j["status"] in JOB_FINISHED]
+    for jid in finished[:max(0, len(JOBS) - JOBS_KEEP)]:
+        JOBS.pop(jid, None)
+
+def _job_next_file(job_id: str):
+    """Eén werkeenheid op de executor: het volgende aangekomen bestand van de job.
+    Een afgebroken upload komt binnen als (None, bestandsnaam, None); een
+    progressieve upload met zijn core.GrowingFile (de hash volgt daarin).
+    Daarna achteraan opnieuw in de wachtrij als er nog een bestand klaarstaat:
+    een job analyseert zijn bestanden na elkaar, zonder een thread vast te
+    houden terwijl de volgende upload nog binnenkomt, en jobs wisselen elkaar af."""
+    job = JOBS[job_id]
+    with JOBS_LOCK:
+        if job["status"] in JOB_FINISHED:
+            job["running"] = False
+            return
+        path, content_hash, growing = job["pending"].popleft()
+        job["status"] = "running"
+    try:
+        if path is None:
+            job["errors"].append(f"{content_hash}: upload afgebroken")
+        elif not job["cancel"].is_set():
+            _analyze_job_file(job, path, content_hash, growing)
+    finally:
+        if growing is not None:
+            growing.close()
+            # loopt de upload nog, dan is het .partial-bestand van de upload (zie _finish_upload)
+            path = growing.path if growing.complete.is_set() else None
+        if path is not None:
+            _remove_upload(path)
+        with JOBS_LOCK:
+            job["done_files"] += 1
+            more = bool(job["pending"]) and not job["cancel"].is_set()
+            job["running"] = more
+            done = job["done_files"] >= len(job["files"]) or (job["cancel"].is_set() and not more)
+    if more:
+        _executor.submit(_job_next_file, job_id)
+    elif done:
+        _finish_job(job)
+
+def _analyze_job_file(job, path, content_hash, growing):
+    fname = growing.name if growing is not None else os.path.basename(path)
+    job["current"] = fname
+    job["partial_events"] = []
+
+    def on_progress(stage, done, total):
+        job["file_progress"][fname] = {"stage": stage, "done": done, "total": total}
+
+    def on_event(event):
+        job["partial_events"].append(event.to_json())
+
+    try:
+        res = analyze_one(path, progress=on_progress, content_hash=content_hash,
+                          on_event=on_event, cancel=job["cancel"], growing=growing)
+        if growing is not None:
+            content_hash = growing.content_hash
+        _record_metrics(res)
+        res.update({
+            "filename": fname,
+            "uploaded_at": job["created_at"]
+        })
+        res["id"] = RESULT_STORE.save(res, fname, job_id=job["id"], content_hash=content_hash)
+        job["results"].append(res)
+    except core.AnalysisCancelled:
+        pass
+    except Exception as e:
+        _record_metrics(failed=True)
+        job["errors"].append(f"{fname}: {type(e).__name__}: {e}")
+    finally:
+        job["current"] = None
+        job["partial_events"] = []
+
+def _finish_job(job):
+    """Alle bestanden verwerkt (of geannuleerd): eindstatus en de uploads van de job weg.
+    Wat daarna nog binnenkomt gooit job_add_file meteen weg."""
+    with JOBS_LOCK:
+        if job["status"] in JOB_FINISHED:
+            return
+        for path, _, growing in job["pending"]:
+            if growing is not None:
+                growing.close()
+        job["pending"].clear()
+        if job["cancel"].is_set():
+            job["status"] = "cancelled"
+        else:
+            job["status"] = "done" if job["results"] or not job["errors"] else "error"
+    _remove_job_files(job["id"])
+
+def create_job(names) -> str:
+    """Nieuwe job voor deze bestandsnamen; de bestanden volgen via job_add_file."""
+    job_id = uuid.uuid4().hex
+    with JOBS_LOCK:
+        _prune_jobs()
+        JOBS[job_id] = {
+            "id": job_id,
+            "status": "queued",
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "files": [os.path.basename(n) for n in names],
+            "done_files": 0,
+            "current": None,
+            "file_progress": {},
+            "results": [],
+            "errors": [],
+            "partial_events": [],
+            "cancel": threading.Event(),
+            "pending": deque(),           # aangekomen bestanden: (pad, hash, growing)
+            "running": False,             # er staat een _job_next_file van deze job op de executor
+        }
+    return job_id
+
+def job_add_file(job_id: str, path, content_hash=None, growing=None):
+    """Een bestand is binnen (of komt binnen, met ``growing``): bij de job en, als
+    die niets op de executor heeft staan, als werkeenheid erop. Is de job al
+    afgelopen (geannuleerd), dan gaat het bestand meteen weg."""
+    job = JOBS.get(job_id)
+    with JOBS_LOCK:
+        finished = job is None or job["status"] in JOB_FINISHED
+        if not finished:
+            job["pending"].append((path, content_hash, growing))
+            start, job["running"] = not job["running"], True
+    if finished:
+        _remove_job_files(job_id)
+        return
+    if start:
+        _executor.submit(_job_next_file, job_id)
+
+def _get_job_or_404(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        abort(404)
+    return job
+
+# --- hervatbare uploads (tus-achtig): POST maakt de upload aan, PATCH schrijft
+# vanaf Upload-Offset, HEAD geeft de stand terug om na een onderbreking verder te
+# gaan. Geen multipart: de body gaat in blokken rechtstreeks naar schijf, de
+# sha256 loopt mee en het laatste blok zet het bestand in de wachtrij van de job.
+
+@app.post("/uploads")
+def upload_create():
+    """JSON {"files": [{"name", "size"}, …]} (of één {"name", "size"}) → job + één upload per
+    bestand; ``index`` verwijst naar de plaats in de aangevraagde lijst."""
+    data = request.get_json(silent=True) or {}
+    files = data.get("files") or ([data] if data.get("name") else [])
+    wanted, skipped = [], []
+    for index, f in enumerate(files):
+        name = secure_filename(str(f.get("name", "")))
+        try:
+            size = int(f.get("size", -1))
+        except (TypeError, ValueError):
+            size = -1
+        if not name or size < 0 or not allowed_file(name):
+            skipped.append(f.get("name"))
+            continue
+        wanted.append((index, name, size))
+    if not wanted:
+        return jsonify({"error": "Niets om te uploaden.", "skipped": skipped}), 400
+
+    job_id = create_job([name for _, name, _ in wanted])
+    uploads = []
+    for index, name, size in wanted:
+        upload_id = uuid.uuid4().hex
+        up = {
+            "id": upload_id,
+            "job_id": job_id,
+            "name": name,
+            "size": size,
+            "offset": 0,
+            "partial": os.path.join(PARTIAL_DIR, upload_id),
+            "path": _upload_path(job_id, index, name),
+            "sha": hashlib.sha256(),
+            "lock": threading.Lock(),
+            "touched": time.monotonic(),     # laatste PATCH (zie _expire_uploads)
+        }
+        open(up["partial"], "wb").close()
+        with UPLOADS_LOCK:
+            UPLOADS[upload_id] = up
+        uploads.append({"id": upload_id, "index": index, "name": name, "size": size,
+                        "url": url_for("upload_patch", upload_id=upload_id)})
+        if size == 0:
+            _finish_upload(up)
+    return jsonify({
+        "job_id": job_id,
+        "status_url": url_for("job_status", job_id=job_id),
+        "result_url": url_for("job_result", job_id=job_id),
+        "uploads": uploads,
+        "skipped": skipped,
+    }), 201
+
+def _get_upload_or_404(upload_id: str):
+    up = UPLOADS.get(upload_id)
+    if up is None:
+        abort(404)
+    return up
+
+def _offset_headers(up) -> dict:
+    return {"Upload-Offset": str(up["offset"]), "Upload-Length": str(up["size"]),
+            "Cache-Control": "no-store"}
+
+def _finish_upload(up):
+    """Laatste blok binnen: naar het eigen pad in de map van de job en in de wachtrij
+    (of, als de analyse al meeleest, die laten weten dat er niets meer komt)."""
+    save_path = up["path"]
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # weg als de job intussen afgelopen is
+    # samen met _start_progressive: die opent het .partial-bestand alleen zolang de upload in UPLOADS staat
+    with UPLOADS_LOCK:
+        os.replace(up["partial"], save_path)
+        UPLOADS.pop(up["id"], None)
+        growing = up.get("growing")
+    if growing is not None:
+        growing.finish(save_path, up["sha"].hexdigest())
+        job = JOBS.get(up["job_id"])
+        if job is None or job["status"] in JOB_FINISHED:
+            _remove_job_files(up["job_id"])
+    else:
+        job_add_file(up["job_id"], save_path, up["sha"].hexdigest())
+
+def _maybe_start_progressive(up):
+    """Genoeg binnen van een streambare container → analyse start nu al op het groeiende bestand.
+    De kop lezen gebeurt op de job-executor (_start_progressive), niet in de PATCH-handler."""
+    if (not PROGRESSIVE or "growing" in up or up["offset"] >= up["size"]
+            or up["offset"] < core.PROGRESSIVE_MIN_BYTES):
+        return
+    up["growing"] = None                  # maar één keer beslissen
+    _executor.submit(_start_progressive, up)
+
+def _start_progressive(up):
+    """Job-executor: is de upload streambaar, dan de analyse nu al starten. Is hij intussen
+    klaar of afgebroken, dan gaat hij gewoon de normale weg (_finish_upload/_abort_upload)."""
+    if not core.is_streamable(up["partial"], up["name"]):
+        return
+    with UPLOADS_LOCK:
+        if UPLOADS.get(up["id"]) is not up:
+            return
+        up["growing"] = core.GrowingFile(up["partial"], up["name"])
+        job_add_file(up["job_id"], up["partial"], None, growing=up["growing"])
+
+@app.route("/uploads/<upload_id>", methods=["HEAD"])
+def upload_head(upload_id):
+    up = _get_upload_or_404(upload_id)
+    return Response(status=200, headers=_offset_headers(up))
+
+@app.patch("/uploads/<upload_id>")
+def upload_patch(upload_id):
+    """Body = de bytes vanaf Upload-Offset. Klopt de offset niet → 409 met de juiste."""
+    up = _get_upload_or_404(upload_id)
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+    except ValueError:
+        return Response("Upload-Offset ontbreekt", status=400, headers=_offset_headers(up))
+    if not up["lock"].acquire(blocking=False):
+        return Response("upload is al bezig", status=409, headers=_offset_headers(up))
+    try:
+        if UPLOADS.get(upload_id) is not up:
+            abort(404)                    # intussen afgebroken of verlopen
+        if offset != up["offset"]:
+            return Response(status=409, headers=_offset_headers(up))
+        stream = request.stream
+        with open(up["partial"], "r+b") as out:
+            out.seek(offset)
+            # per blok wegschrijven en de offset bijwerken: valt de verbinding
+            # weg, dan blijft alles wat binnen is geldig voor HEAD/hervatten
+            for chunk in iter(lambda: stream.read(UPLOAD_CHUNK), b""):
+                if up["offset"] + len(chunk) > up["size"]:
+                    return Response("meer bytes dan Upload-Length", status=413, headers=_offset_headers(up))
+                out.write(chunk)
+                up["sha"].update(chunk)
+                up["offset"] += len(chunk)
+                up["touched"] = time.monotonic()
+                if "growing" not in up:
+                    out.flush()
+                    _maybe_start_progressive(up)
+        if up["offset"] == up["size"] and UPLOADS.get(upload_id) is up:
+            _finish_upload(up)
+        return Response(status=204, headers=_offset_headers(up))
+    finally:
+        up["lock"].release()
+
+def _abort_upload(up):
+    """Upload weg (entry en .partial); de job meldt dit bestand als mislukt. Met up["lock"]."""
+    with UPLOADS_LOCK:
+        UPLOADS.pop(up["id"], None)
+        growing = up.get("growing")
+    try:
+        os.remove(up["partial"])
+    except OSError:
+        pass
+    if growing is not None:
+        growing.abort()
+    else:
+        job_add_file(up["job_id"], None, up["name"])
+
+@app.delete("/uploads/<upload_id>")
+def upload_delete(upload_id):
+    """Upload afbreken; de job meldt dit bestand als mislukt."""
+    up = _get_upload_or_404(upload_id)
+    with up["lock"]:
+        if UPLOADS.get(upload_id) is up:
+            _abort_upload(up)
+    return Response(status=204)
+
+def _expire_uploads(now=None):
+    """Uploads zonder PATCH in UPLOAD_TTL_SEC afbreken (de client is weg) → aantal."""
+    now = time.monotonic() if now is None else now
+    with UPLOADS_LOCK:
+        stale = [up for up in UPLOADS.values() if now - up["touched"] > UPLOAD_TTL_SEC]
+    expired = 0
+    for up in stale:
+        if not up["lock"].acquire(blocking=False):
+            continue                      # er loopt net een PATCH
+        try:
+            if UPLOADS.get(up["id"]) is up:
+                _abort_upload(up)
+                expired += 1
+        finally:
+            up["lock"].release()
+    return expired
+
+def _remove_orphan_partials():
+    """Bij het starten: .partial-bestanden en job-mappen van een vorig proces
+    (UPLOADS en JOBS leven in het geheugen) weg."""
+    for name in os.listdir(PARTIAL_DIR):
+        if name not in UPLOADS:
+            _remove_upload(os.path.join(PARTIAL_DIR, name))
+    for name in os.listdir(UPLOAD_DIR):
+        if name not in JOBS and len(name) == 32 and os.path.isdir(os.path.join(UPLOAD_DIR, name)):
+            _remove_job_files(name)
+
+def _upload_sweeper():
+    while True:
+        time.sleep(UPLOAD_SWEEP_SEC)
+        try:
+            _expire_uploads()
+        except Exception as e:
+            print(f"⚠️ uploads opruimen: {type(e).__name__}: {e}", flush=True)
+
+_BACKGROUND_STARTED = threading.Event()
+
+def start_background():
+    """Eenmalig bij het starten van de app (python web_app.py of het eerste request
+    onder gunicorn), niet bij een import: oude .partial-bestanden en job-mappen
+    opruimen en de upload-sweeper starten. Benchmarks, tests en de
+    forkserver-workers van de parallelle video-pass importeren dit script alleen."""
+    with UPLOADS_LOCK:
+        if _BACKGROUND_STARTED.is_set():
+            return
+        _BACKGROUND_STARTED.set()
+    _remove_orphan_partials()
+    threading.Thread(target=_upload_sweeper, name="upload-sweeper", daemon=True).start()
+
+@app.before_request
+def _start_background_once():
+    if not _BACKGROUND_STARTED.is_set():
+        start_background()
+
+@app.get("/metrics")
+def metrics():
+    return Response(_prom_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/jobs/<job_id>")
+def job_status(job_id):
+    return jsonify(_job_status(_get_job_or_404(job_id)))
+
+@app.post("/jobs/<job_id>/cancel")
+def job_cancel(job_id):
+    """Lopende analyse afbreken; ffmpeg wordt gestopt, afgewerkte bestanden blijven."""
+    job = _get_job_or_404(job_id)
+    if job["status"] not in JOB_FINISHED:
+        job["cancel"].set()
+        with JOBS_LOCK:
+            idle = not job["running"]
+        if idle:
+            # wacht nog op uploads: niets op de executor dat de job afsluit
+            _finish_job(job)
+    return jsonify(_job_status(job)), 202
+
+@app.get("/jobs/<job_id>/events")
+def job_events(job_id):
+    """Server-Sent Events: job-status met voortgang per bestand, tot de job klaar is."""
+    _get_job_or_404(job_id)
+
+    def stream():
+        last, last_sent = None, time.monotonic()
+        while True:
+            job = JOBS.get(job_id)
+            if job is None:
+                break
+            payload = json.dumps(_job_status(job))
+            if job["status"] in JOB_FINISHED:
+                yield f"event: done\ndata: {payload}\n\n"
+                break
+            if payload != last:
+                yield f"data: {payload}\n\n"
+                last, last_sent = payload, time.monotonic()
+            elif time.monotonic() - last_sent >= SSE_KEEPALIVE:
+                yield ": ping\n\n"
+                last_sent = time.monotonic()
+            time.sleep(SSE_INTERVAL)
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/jobs/<job_id>/result")
+def job_result(job_id):
+    job = _get_job_or_404(job_id)
+    if job["status"] not in JOB_FINISHED:
+        return jsonify(_job_status(job)), 409
+    data = _job_status(job)
+    data["results"] = job["results"]
+    return jsonify(data)
+
 @app.get("/result")
 def result():
-# Resultaten uit de sessie weergeven (PRG)
-    results = session.get('last_results')
-    return render_template_string(PAGE, results=results)
+# Resultaten uit de store weergeven (PRG); met ?job=<id> eerst de job afwachten.
+# Standaard de laatste job uit de sessie; ?all=1, ?file= of ?hash= bladeren door de geschiedenis.
+    job_id = request.args.get("job")
+    if job_id:
+        job = JOBS.get(job_id)
+        if job is None:
+            flash("Onbekende of verlopen analyse.")
+            return redirect(url_for("index"))
+        if job["status"] not in JOB_FINISHED:
+            return render_template_string(PAGE, results=None, pending_job=job_id)
+        if job["status"] == "cancelled":
+            flash("Analyse geannuleerd.")
+        for err in job["errors"]:
+            flash(f"Mislukt: {err}")
+        session['last_job'] = job_id
+        return redirect(url_for("result"))
+
+    filters = {k: request.args.get(k) for k in ("file", "hash") if request.args.get(k)}
+    if request.args.get("all") or filters:
+        query = dict(filters, all=1) if not filters else filters
+        scope = {"filename": filters.get("file"), "content_hash": filters.get("hash")}
+    elif session.get('last_job'):
+        query, scope = {}, {"job_id": session['last_job']}
+    else:
+        return render_template_string(PAGE, results=None)
+
+    page = max(1, request.args.get("page", 1, type=int))
+    results, total = RESULT_STORE.page(page, RESULTS_PER_PAGE, **scope)
+    pages = max(1, -(-total // RESULTS_PER_PAGE))
+    pager = {
+        "page": page, "pages": pages, "total": total,
+        "prev": url_for("result", page=page - 1, **query) if page > 1 else None,
+        "next": url_for("result", page=page + 1, **query) if page < pages else None,
+    }
+    return render_template_string(PAGE, results=results, pager=pager)
 
 @app.post("/analyze")
 def analyze():
     if "videos" not in request.files:
+        if _wants_json():
+            return jsonify({"error": "Geen bestanden ontvangen."}), 400
         flash("Geen bestanden ontvangen.")
         return redirect(url_for("index"))
 
-    files = request.files.getlist("videos")
-    results = []
-    any_saved = False
-
-    for f in files:
+    files = []
+    for f in request.files.getlist("videos"):
         if not f or f.filename == "":
             continue
         if not allowed_file(f.filename):
             flash(f"Overgeslagen: {f.filename} (niet-untersteunde extensie)")
             continue
+        files.append((secure_filename(f.filename), f))
 
-        fname = secure_filename(f.filename)
-        save_path = os.path.join(UPLOAD_DIR, fname)
-        f.save(save_path)
-        any_saved = True
-
-# Alleen het zojuist geüploade bestand analyseren
-        res = analyze_one(save_path)
-        res.update({
-            "filename": fname,
-            "uploaded_at": datetime.now().strftime("%Y-%m-%d %H:%M")
-        })
-        results.append(res)
-
-    if not any_saved:
+    if not files:
+        if _wants_json():
+            return jsonify({"error": "Niets geüpload."}), 400
         flash("Niets geüpload.")
         return redirect(url_for("index"))
 
-# Resultaten in de sessie opslaan en PRG uitvoeren → /result
-    session['last_results'] = results
-    return redirect(url_for("result"))
+# Analyse in de wachtrij zetten; de pagina pollt /jobs/<id>
+    job_id = create_job([fname for fname, _ in files])
+    for index, (fname, f) in enumerate(files):
+        save_path = _upload_path(job_id, index, fname)
+        job_add_file(job_id, save_path, save_upload(f.stream, save_path))
+    if _wants_json():
+        return jsonify({
+            "job_id": job_id,
+            "status_url": url_for("job_status", job_id=job_id),
+            "result_url": url_for("job_result", job_id=job_id),
+        }), 202
+    return redirect(url_for("result", job=job_id))
 
 @app.post("/delete")
 def delete():
-# Bestand verwijderen uit uploads/ en uit de huidige resultaten in de sessie
+# Analyse (kaart) uit de store verwijderen; de upload zelf is al weg zodra de job klaar is
     fname = request.form.get("filename", "")
-    if not fname:
-        flash("Geen bestandsnaam.")
+    analysis_id = request.form.get("analysis_id", type=int)
+    if analysis_id is None:
+        flash("Geen analyse opgegeven.")
         return redirect(url_for("result"))
-    path = os.path.join(UPLOAD_DIR, os.path.basename(fname))
-    if os.path.isfile(path) and allowed_file(path):
-        os.remove(path)
+    if RESULT_STORE.delete(analysis_id):
         flash(f"Verwijderd: {fname}")
     else:
-        flash("Bestand niet gevonden.")
-
-# Resultaten in de sessie bijwerken (kaart verwijderen)
-    if 'last_results' in session and isinstance(session['last_results'], list):
-        session['last_results'] = [r for r in session['last_results'] if r.get('filename') != fname]
+        flash("Analyse niet gevonden.")
 
-    return redirect(url_for("result"))
+    return redirect(request.referrer or url_for("result"))
 
 if __name__ == "__main__":
+    start_background()
     app.run(debug=True, port=5009, threaded=True)